@@ -0,0 +1,78 @@
+"""
+compares the memory and construction cost of a CovidStatBatch against a list of CovidStat instances
+
+usage: PYTHONPATH=main python -m benchmark.batch_memory [rows ...]
+"""
+
+# internal modules
+import classes
+
+# external modules
+import numpy as np
+import sys
+import time
+import tracemalloc
+
+
+def create_batch(rows):
+    """
+    creates a CovidStatBatch of synthetic statistics
+    :param rows: the number of statistics to create
+    :return: the created CovidStatBatch
+    """
+
+    rng = np.random.default_rng(0)
+    recovered = rng.integers(0, 10 ** 6, rows).astype(float)
+    recovered[::7] = np.nan
+
+    return classes.CovidStatBatch(
+        np.arange(rows),
+        np.datetime64("1700-01-01") + np.arange(rows) % 180000,
+        rng.integers(0, 10 ** 7, rows),
+        rng.integers(0, 10 ** 5, rows),
+        recovered
+    )
+
+
+def measure(function, *args):
+    """
+    measures the time and memory a function call allocates for its result
+    :param function: the function to call
+    :param args: the arguments to call it with
+    :return: the seconds elapsed, the bytes retained by the result, and the result as a tuple
+    """
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return elapsed, retained, result
+
+
+def main(sizes):
+    """
+    compares both containers at each size
+    :param sizes: the numbers of statistics to compare
+    :return: None
+    """
+
+    for rows in sizes:
+        source = create_batch(rows)
+        columns = (source.idx, source.date, source.cases, source.deaths, source.column("recovered"))
+
+        batch_secs, _, batch = measure(classes.CovidStatBatch, *columns)
+        stats_secs, stats_bytes, _ = measure(source.to_stats)
+
+        # the batch may share the arrays it was given, so count every array it holds
+        arrays = [batch.idx, batch.date] + [getattr(batch, i) for i in batch.counts] + list(batch.masks.values())
+        batch_bytes = sum(i.nbytes for i in arrays if i is not None)
+
+        print(f"RESULT: rows={rows}, "
+              f"list={stats_secs:.3f}s/{stats_bytes / rows:.0f}B per record, "
+              f"batch={batch_secs:.3f}s/{batch_bytes / rows:.0f}B per record")
+
+
+if __name__ == "__main__":
+    main([int(i) for i in sys.argv[1:]] or [1000, 100000, 1000000])
@@ -0,0 +1,76 @@
+"""
+compares extracting and transforming several countries of a synthetic JHU combined style source by parsing it once
+per country against parsing it once and splitting it by country, then transforming the countries with a pool of
+processes; the DynamoDB load is left out so only the parsing and transforming is timed
+
+usage: PYTHONPATH=main python -m benchmark.country_partition [countries ...]
+"""
+
+# internal modules
+import countries
+import extract
+import load
+import transform
+
+# external modules
+import contextlib
+import io
+import sys
+import tempfile
+import time
+
+from benchmark import synthetic
+from os import path
+from unittest import mock
+
+
+columns = ["Date", "Country/Region", "Confirmed", "Recovered", "Deaths"]
+key = "Country/Region"
+
+
+def main(sizes, days=1000, provinces=4):
+    """
+    extracts and transforms each number of countries both ways
+    :param sizes: the numbers of countries to process
+    :param days: the number of days in the source
+    :param provinces: the number of provinces of every country other than the US
+    :return: None
+    """
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file = path.join(tmp, "combined.csv")
+        df = synthetic.jhu_frame(days, provinces=provinces)
+        df.to_csv(file, index=False)
+        names = df[key].unique().tolist()
+        print(f"INFO: Generated {len(df)} Row(s): {path.getsize(file) / 1024 ** 2:.1f} MiB")
+
+        for size in sizes:
+            wanted = names[:size]
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                for country in wanted:
+                    frame = extract.extract(file, columns, key, country, chunksize=100000)
+                    transform.country_batch(frame, country)
+                per_country = time.perf_counter() - start
+
+                start = time.perf_counter()
+                partitions = extract.partition(extract.extract(file, columns, key, wanted, chunksize=100000), key)
+                for country, frame in partitions.items():
+                    transform.country_batch(frame, country)
+                one_pass = time.perf_counter() - start
+
+                # forked workers inherit the stubbed load
+                start = time.perf_counter()
+                with mock.patch.object(load, "load_batch", lambda dataclass, batch, **kwargs: len(batch)):
+                    partitions = extract.partition(extract.extract(file, columns, key, wanted, chunksize=100000), key)
+                    results, _ = countries.load_countries(partitions, dict())
+                pooled = time.perf_counter() - start
+
+            rows = sum(total for total, _ in results.values())
+            print(f"RESULT: countries={size}, statistics={rows}, parse per country seconds={per_country:.3f}, "
+                  f"one pass seconds={one_pass:.3f}, one pass with process pool seconds={pooled:.3f}")
+
+
+if __name__ == "__main__":
+    main([int(i) for i in sys.argv[1:]] or [1, 10, 50])
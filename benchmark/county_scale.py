@@ -0,0 +1,85 @@
+"""
+measures how the chunked county pipeline scales with the days of a synthetic us-counties.csv style source, by
+timing the extract, transform, serialization and partial rollups, and the peak memory of each run
+
+usage: PYTHONPATH=main python -m benchmark.county_scale [days ...]
+"""
+
+# internal modules
+import extract
+import transform
+
+# external modules
+import contextlib
+import io
+import multiprocessing
+import sys
+import tempfile
+import time
+
+from benchmark import synthetic
+from benchmark.extract_memory import peak_rss
+from os import path
+
+
+columns = ["date", "county", "state", "fips", "cases", "deaths"]
+
+
+def measure(file, chunksize, queue):
+    """
+    processes the source one chunk at a time as the handler does, without writing to DynamoDB
+    :param file: the source to process
+    :param chunksize: the number of rows to read at a time
+    :param queue: the queue to report the rows, seconds, items and peak memory growth in MiB to
+    :return: None
+    """
+
+    before = peak_rss()
+    start = time.perf_counter()
+    rows = 0
+    items = 0
+    partials = list()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for read, chunk in extract.read_chunks(file, columns, None, None, chunksize):
+            batch = transform.county_batch(chunk)
+            items += len(batch.to_items())
+            partials.append(transform.rollup_partial(batch))
+            rows += read
+
+        for level in ("state", "national"):
+            batch = transform.rollup(partials, level)
+            for i in range(0, len(batch), chunksize):
+                items += len(batch[i:i + chunksize].to_items())
+
+    queue.put((rows, time.perf_counter() - start, items, (peak_rss() - before) / 1024))
+
+
+def main(sizes):
+    """
+    runs the chunked pipeline on sources of each number of days, and on the smallest source read whole
+    :param sizes: the numbers of days to generate
+    :return: None
+    """
+
+    context = multiprocessing.get_context("spawn")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for days in sizes:
+            file = path.join(tmp, f"us-counties-{days}.csv")
+            synthetic.county_frame(days).to_csv(file, index=False)
+            size = path.getsize(file) / 1024 ** 2
+
+            for chunksize in (20000,) if days != sizes[0] else (None, 200000, 50000, 20000):
+                queue = context.Queue()
+                process = context.Process(target=measure, args=(file, chunksize or days * 3300, queue))
+                process.start()
+                rows, seconds, items, peak = queue.get()
+                process.join()
+                print(f"RESULT: days={days}, rows={rows}, source={size:.0f} MiB, "
+                      f"chunksize={'whole' if chunksize is None else chunksize}, seconds={seconds:.2f}, "
+                      f"rows/s={rows / seconds:,.0f}, items={items}, peak growth={peak:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main([int(i) for i in sys.argv[1:]] or [100, 300, 1000])
@@ -0,0 +1,65 @@
+"""
+compares the peak memory and bytes of the original indented JSON export against the streaming exports
+
+usage: PYTHONPATH=main python -m benchmark.export_size [rows]
+"""
+
+# internal modules
+import export
+
+# external modules
+import json
+import sys
+import tracemalloc
+
+from benchmark.batch_memory import create_batch
+
+
+def legacy_export(records):
+    """
+    the original encoding of load_json, kept for comparison
+    :param records: the records to encode
+    :return: the number of bytes encoded
+    """
+
+    json_rec = records.to_json()
+    return len(json.dumps(json_rec, default=str, indent=4, sort_keys=True).encode("utf-8"))
+
+
+def streaming_export(records, fmt, compress):
+    """
+    :param records: the records to encode
+    :param fmt: the format to encode with
+    :param compress: True to gzip the records
+    :return: the number of bytes encoded
+    """
+
+    json_exp = export.JsonExport(fmt, compress, spool_size=1024 ** 3)
+    json_exp.write(records)
+    size = json_exp.close()
+    json_exp.buffer.close()
+    return size
+
+
+def main(rows):
+    """
+    measures each export over the same statistics
+    :param rows: the number of statistics to export
+    :return: None
+    """
+
+    batch = create_batch(rows)
+
+    for name, function in (("legacy", lambda: legacy_export(batch)),
+                           ("json", lambda: streaming_export(batch, "json", False)),
+                           ("ndjson", lambda: streaming_export(batch, "ndjson", False)),
+                           ("json.gz", lambda: streaming_export(batch, "json", True))):
+        tracemalloc.start()
+        size = function()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"RESULT: {name}: {size / 1024 ** 2:.1f} MiB uploaded, {peak / 1024 ** 2:.1f} MiB peak")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,94 @@
+"""
+measures the peak memory of extracting the US records from a synthetic JHU combined style source
+
+usage: PYTHONPATH=main python -m benchmark.extract_memory [rows]
+"""
+
+# internal modules
+import extract
+
+# external modules
+import multiprocessing
+import numpy as np
+import pandas as pd
+import sys
+import tempfile
+
+from os import path
+
+
+columns = ["Date", "Country/Region", "Recovered"]
+
+
+def generate(file, rows):
+    """
+    writes a synthetic JHU combined style source
+    :param file: the file to write
+    :param rows: the number of rows to write
+    :return: None
+    """
+
+    countries = np.array(["US"] + [f"Country{i}" for i in range(189)])
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "Date": pd.date_range("2020-01-22", periods=rows // len(countries) + 1).repeat(len(countries))[:rows],
+        "Country/Region": np.resize(countries, rows),
+        "Province/State": np.resize(np.array(["", "Province"]), rows),
+        "Lat": rng.random(rows) * 90,
+        "Long": rng.random(rows) * 180,
+        "Confirmed": rng.integers(0, 10 ** 7, rows),
+        "Recovered": rng.integers(0, 10 ** 6, rows),
+        "Deaths": rng.integers(0, 10 ** 5, rows)
+    })
+    df.to_csv(file, index=False)
+
+
+def measure(file, chunksize, queue):
+    """
+    extracts the US records and reports the peak resident memory growth of the process
+    :param file: the source to extract
+    :param chunksize: the chunksize to extract with, or None to read the whole source at once
+    :param queue: the queue to report the shape and peak memory in MiB to
+    :return: None
+    """
+
+    before = peak_rss()
+    df = extract.extract(file, columns, "Country/Region", "US", chunksize=chunksize)
+    queue.put((df.shape, (peak_rss() - before) / 1024))
+
+
+def peak_rss():
+    """
+    reads the peak resident memory of this process; unlike ru_maxrss it is not inherited across exec
+    :return: the peak resident memory in KiB
+    """
+
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+
+
+def main(rows):
+    """
+    compares the peak memory of whole and chunked extraction
+    :param rows: the number of rows in the synthetic source
+    :return: None
+    """
+
+    context = multiprocessing.get_context("spawn")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file = path.join(tmp, "combined.csv")
+        generate(file, rows)
+        print(f"INFO: Generated {rows} Row(s): {path.getsize(file) / 1024 ** 2:.1f} MiB")
+
+        for chunksize in (None, 100000):
+            queue = context.Queue()
+            process = context.Process(target=measure, args=(file, chunksize, queue))
+            process.start()
+            shape, peak = queue.get()
+            process.join()
+            print(f"RESULT: chunksize={chunksize}, shape={shape}, peak growth={peak:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3000000)
@@ -0,0 +1,91 @@
+"""
+reports the import time of each module imported by index.py on a cold interpreter, to track cold start regressions
+
+usage: PYTHONPATH=main python -m benchmark.import_profile [module ...] [--json results.json]
+"""
+
+# external modules
+import json
+import os
+import subprocess
+import sys
+
+
+def profile(module, depth=3, runs=5):
+    """
+    imports a module in fresh interpreters with -X importtime
+    :param module: the module to import
+    :param depth: the levels of nested imports to keep; 1 keeps only the module itself
+    :param runs: the number of interpreters to take the median from
+    :return: the level, name, and median cumulative microseconds of each import in import order, as tuples
+    """
+
+    order = list()
+    samples = dict()
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True, env=os.environ.copy(), check=True
+        )
+
+        # nested imports are reported before the top level import holding them
+        nested = list()
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+
+            _, cumulative, name = line[len("import time:"):].split("|")
+            # the name is indented by two spaces per level below the top level import
+            level = (len(name) - len(name.lstrip()) + 1) // 2
+            nested.append(((level, name.strip()), int(cumulative)))
+
+            if level > 1:
+                continue
+
+            # only keep the top level import of the module, and the interpreter start up is dropped
+            if name.strip() == module:
+                for key, value in nested:
+                    if key[0] > depth:
+                        continue
+
+                    if key not in samples:
+                        order.append(key)
+
+                    samples.setdefault(key, list()).append(value)
+
+            nested = list()
+
+    # -X importtime reports children before their parent, so reverse into a top down order
+    return [(level, name, sorted(samples[(level, name)])[len(samples[(level, name)]) // 2])
+            for level, name in reversed(order)]
+
+
+def main(modules, output=None):
+    """
+    prints the import cost of each module and the imports below it
+    :param modules: the modules to profile
+    :param output: the JSON file to write the results to, or None
+    :return: None
+    """
+
+    results = dict()
+    for module in modules:
+        costs = profile(module)
+        results[module] = {name: cost for _, name, cost in costs}
+
+        for level, name, cost in costs:
+            print(f"RESULT: {cost / 1000:8.1f} ms  {'  ' * (level - 1)}{name}")
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    json_file = None
+    if "--json" in args:
+        json_file = args.pop(args.index("--json") + 1)
+        args.remove("--json")
+
+    main(args or ["index", "transform", "load"], json_file)
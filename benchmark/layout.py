@@ -0,0 +1,120 @@
+"""
+compares the daily and monthly DynamoDB layouts of CovidStats on a local DynamoDB stand-in, by counting the items
+and write requests of a full refresh, estimating the write capacity units they consume, and timing the load and a
+range read of every day; the stand-in reports a flat capacity per request, so units are estimated from item sizes
+
+usage: PYTHONPATH=main python -m benchmark.layout [days ...]
+"""
+
+# internal modules
+import capacity
+import classes
+import clients
+import load
+import monthly
+import transform
+
+# external modules
+import boto3
+import contextlib
+import io
+import math
+import numpy as np
+import sys
+import time
+
+from benchmark import synthetic
+from moto import mock_aws
+from unittest import mock
+
+
+def create_table(client, table_name, key):
+    """
+    creates a table in the stand-in
+    :param client: the DynamoDB client
+    :param table_name: the table to create
+    :param key: the name of its hash key
+    :return: None
+    """
+
+    client.create_table(
+        TableName=table_name,
+        AttributeDefinitions=[{"AttributeName": key, "AttributeType": "S"}],
+        KeySchema=[{"AttributeName": key, "KeyType": "HASH"}],
+        BillingMode="PAY_PER_REQUEST"
+    )
+
+
+def read_daily(client, dates):
+    """
+    reads every date from the daily layout with batch get item requests of up to 100 keys
+    :param client: the DynamoDB client
+    :param dates: the ISO dates to read
+    :return: the number of items and requests as a tuple
+    """
+
+    items, requests = 0, 0
+    for i in range(0, len(dates), 100):
+        keys = [{"date": {"S": d}} for d in dates[i:i + 100]]
+        items += len(client.batch_get_item(RequestItems={"CovidStats": {"Keys": keys}})["Responses"]["CovidStats"])
+        requests += 1
+
+    return items, requests
+
+
+def main(sizes):
+    """
+    loads a synthetic history of each number of days in both layouts
+    :param sizes: the numbers of days to generate
+    :return: None
+    """
+
+    for days in sizes:
+        nyt = synthetic.nyt_frame(days)
+        batch = transform.to_batch(nyt.assign(Recovered=nyt["deaths"] * 3))
+
+        with mock_aws():
+            client = boto3.client("dynamodb", region_name="us-east-1")
+            create_table(client, classes.CovidStat.table_name, "date")
+            create_table(client, monthly.CovidStatMonths.table_name, "month")
+
+            calls = list()
+            write_batch = load.write_batch
+
+            def counted(table_name, items, bucket=None):
+                calls.append(len(items))
+                return write_batch(table_name, items, bucket)
+
+            layouts = {
+                "daily": (classes.CovidStat, lambda: batch),
+                "monthly": (monthly.CovidStatMonths, lambda: monthly.pack(batch))
+            }
+
+            with mock.patch.dict(clients.cache, {"dynamodb": client}), mock.patch.object(load, "write_batch", counted):
+                for layout, (dataclass, records) in layouts.items():
+                    calls.clear()
+
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        start = time.perf_counter()
+                        packed = records()
+                        loaded = load.load_batch(dataclass, packed, workers=4, publish=False)
+                        seconds = time.perf_counter() - start
+
+                        start = time.perf_counter()
+                        if layout == "daily":
+                            read, gets = read_daily(client, np.datetime_as_string(batch.date).tolist())
+                        else:
+                            read, gets = len(monthly.read(batch.date[0], batch.date[-1])), math.ceil(len(packed) / 100)
+                        read_seconds = time.perf_counter() - start
+
+                    units = sum(capacity.write_units(i) for i in packed.to_items())
+                    print(f"RESULT: days={days}, layout={layout}, items={loaded}, requests={len(calls)}, "
+                          f"write units={units}, load seconds={seconds:.3f}, "
+                          f"read days={read}, read requests={gets}, read seconds={read_seconds:.3f}")
+
+                # the monthly layout reads back every statistic as loaded
+                assert monthly.read(batch.date[0], batch.date[-1]).to_json() == batch.to_json()
+
+
+if __name__ == "__main__":
+    main([int(i) for i in sys.argv[1:]] or [365, 1000, 3000])
@@ -0,0 +1,96 @@
+"""
+compares the indexed N-way merge against chained hash merges for 2 and 5 synthetic daily sources, each
+timed through to_batch since the indexed merge parses the dates the legacy merge leaves to it
+
+usage: PYTHONPATH=main python -m benchmark.merge_speed [rows ...]
+"""
+
+# internal modules
+import classes
+import transform
+
+# external modules
+import contextlib
+import io
+import numpy as np
+import pandas as pd
+import sys
+import time
+
+
+def create_datasets(sources, rows):
+    """
+    creates daily sources in date order, as they are published, each keyed by its own field and missing
+    a different tenth of the days
+    :param sources: the number of sources to create
+    :param rows: the number of days in each source
+    :return: the created Datasets
+    """
+
+    dates = pd.date_range("1700-01-01", periods=rows).strftime("%Y-%m-%d").to_numpy()
+    rng = np.random.default_rng(0)
+
+    datasets = list()
+    for i in range(sources):
+        dataset = classes.Dataset(f"ds{i + 1}")
+        dataset.match_field = f"key{i + 1}"
+        kept = rng.random(rows) >= 0.1
+        dataset.df = pd.DataFrame({
+            dataset.match_field: dates[kept],
+            f"value{i + 1}": rng.integers(0, 10 ** 7, kept.sum())
+        })
+        datasets.append(dataset)
+
+    return datasets
+
+
+def legacy_merge(datasets):
+    """
+    the original string keyed pd.merge, chained once per additional source, kept for comparison
+    :param datasets: the Datasets to merge
+    :return: the merged dataframe
+    """
+
+    tar_df = datasets[0].df
+    left_on = datasets[0].match_field
+
+    for dataset in datasets[1:]:
+        tar_df = pd.merge(tar_df, dataset.df, left_on=left_on, right_on=dataset.match_field)
+
+    tar_df = tar_df.rename(columns={left_on: "date"})
+    print(f"'tar_df':\n{tar_df}")
+    return tar_df
+
+
+def timed(function):
+    """
+    times a function call with its output suppressed
+    :param function: the function to call
+    :return: the seconds elapsed and the result as a tuple
+    """
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = function()
+        return time.perf_counter() - start, result
+
+
+def main(sizes):
+    """
+    times both merges of 2 and 5 sources at each size
+    :param sizes: the numbers of days in each source
+    :return: None
+    """
+
+    for rows in sizes:
+        for sources in (2, 5):
+            datasets = create_datasets(sources, rows)
+            legacy_secs, legacy = timed(lambda: transform.to_batch(legacy_merge(datasets)))
+            indexed_secs, indexed = timed(lambda: transform.to_batch(transform.merge(datasets)))
+            assert len(legacy) == len(indexed)
+            print(f"RESULT: rows={rows}, sources={sources}, legacy={legacy_secs:.3f}s, "
+                  f"indexed={indexed_secs:.3f}s, speedup={legacy_secs / indexed_secs:.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(i) for i in sys.argv[1:]] or [1000, 10000, 100000, 200000])
@@ -0,0 +1,255 @@
+"""
+runs extract, transform and load on synthetic sources against local AWS stand-ins and records the throughput,
+latency and peak memory of every stage to a JSON results file; a previous results file can be compared against
+
+usage: PYTHONPATH=main python -m benchmark.pipeline [--days N] [--countries N] [--provinces N]
+       [--load-rows N] [--output results.json] [--compare previous.json]
+"""
+
+# internal modules
+import classes
+import clients
+import extract
+import load
+import transform
+
+# external modules
+import argparse
+import boto3
+import contextlib
+import io
+import json
+import numpy as np
+import os
+import pandas as pd
+import platform
+import tempfile
+import time
+
+from benchmark import synthetic
+from moto import mock_aws
+from unittest import mock
+
+
+def stage_memory():
+    """
+    resets the peak resident memory of this process, so the next reading covers one stage only
+    :return: the resident memory in KiB, or None if the peak cannot be reset
+    """
+
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+
+        return read_status("VmRSS")
+
+    except OSError:
+        return None
+
+
+def read_status(field):
+    """
+    :param field: the field of /proc/self/status to read
+    :return: the value of the field in KiB
+    """
+
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith(f"{field}:"))
+
+
+def run_stage(results, stage, rows, function, *args, latencies=None):
+    """
+    runs one stage with its output suppressed and appends its measurements to the results
+    :param results: the list of results to append to
+    :param stage: the name of the stage
+    :param rows: the number of rows the stage processes
+    :param function: the function running the stage
+    :param args: the arguments to call it with
+    :param latencies: the list the stage appends the seconds of each of its calls to, or None
+    :return: the result of the function
+    """
+
+    before = stage_memory()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = function(*args)
+        seconds = time.perf_counter() - start
+
+    record = {
+        "stage": stage,
+        "rows": rows,
+        "seconds": round(seconds, 6),
+        "rows_per_sec": round(rows / seconds, 1) if seconds else None,
+        "peak_mib": round(read_status("VmHWM") / 1024, 1) if before is not None else None,
+        "peak_growth_mib": round((read_status("VmHWM") - before) / 1024, 1) if before is not None else None
+    }
+
+    if latencies:
+        record["calls"] = len(latencies)
+        for name, q in (("p50_ms", 50), ("p95_ms", 95), ("p99_ms", 99)):
+            record[name] = round(float(np.percentile(latencies, q)) * 1000, 3)
+
+    results.append(record)
+    print(f"RESULT: {json.dumps(record)}")
+    return result
+
+
+def timed_calls(module, name, latencies):
+    """
+    patches a function of a module to append the seconds of each call to a list
+    :param module: the module holding the function
+    :param name: the name of the function
+    :param latencies: the list to append to
+    :return: the patcher, to be used as a context manager
+    """
+
+    function = getattr(module, name)
+
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    return mock.patch.object(module, name, wrapper)
+
+
+def run(days, countries, provinces, load_rows):
+    """
+    runs every stage once against local AWS stand-ins
+    :param days: the number of days in the synthetic sources
+    :param countries: the number of countries in the synthetic JHU source
+    :param provinces: the number of provinces of every country other than the US in the synthetic JHU source
+    :param load_rows: the number of statistics the loads write, or None for all of them
+    :return: the list of stage results
+    """
+
+    results = list()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = synthetic.write_sources(tmp, days, countries, provinces, states=1, counties=1)
+        jh_rows = days * (1 + (countries - 1) * max(provinces, 1))
+
+        ny_dataset = classes.Dataset("ny_dataset")
+        ny_dataset.match_field = "date"
+        ny_dataset.df = run_stage(
+            results, "extract_nyt", days, extract.extract, files["nyt"], ["date", "cases", "deaths"]
+        )
+
+        jh_dataset = classes.Dataset("jh_dataset")
+        jh_dataset.match_field = "Date"
+        jh_dataset.df = run_stage(
+            results, "extract_jhu", jh_rows, extract.extract, files["jhu"], ["Date", "Country/Region", "Recovered"],
+            "Country/Region", "US", 100000, 32 * 1024 * 1024
+        )
+
+    stats = run_stage(results, "transform", days, transform.transform, ny_dataset, jh_dataset)
+    stats = stats[:load_rows] if load_rows else stats
+    batch = classes.CovidStatBatch(
+        [s.idx for s in stats], [s.date for s in stats],
+        [s.cases for s in stats], [s.deaths for s in stats], [s.recovered for s in stats]
+    )
+
+    with mock_aws():
+        dynamodb = boto3.client("dynamodb", region_name="us-east-1")
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket="covid-stats-benchmark")
+
+        for table in ("CovidStatsAll", "CovidStatsBatch"):
+            dynamodb.create_table(
+                TableName=table,
+                AttributeDefinitions=[{"AttributeName": "date", "AttributeType": "S"}],
+                KeySchema=[{"AttributeName": "date", "KeyType": "HASH"}],
+                BillingMode="PAY_PER_REQUEST"
+            )
+
+        with mock.patch.dict(clients.cache, {"dynamodb": dynamodb, "s3": s3}), \
+                mock.patch.object(load, "s3_bucket_name", "covid-stats-benchmark"), \
+                mock.patch.object(load, "s3_object_path", "Data"), \
+                mock.patch.object(load, "sns_topic_arn", None):
+
+            latencies = list()
+            with mock.patch.object(classes.CovidStat, "table_name", "CovidStatsAll"), \
+                    timed_calls(load, "load_one", latencies):
+                run_stage(results, "load_all", len(stats), load.load_all, classes.CovidStat, stats,
+                          latencies=latencies)
+
+            latencies = list()
+            with mock.patch.object(classes.CovidStat, "table_name", "CovidStatsBatch"), \
+                    timed_calls(load, "write_batch", latencies):
+                run_stage(results, "load_batch", len(batch), load.load_batch, classes.CovidStat, batch,
+                          latencies=latencies)
+
+            run_stage(results, "load_json", len(stats), load.load_json, stats)
+            run_stage(results, "load_json_batch", len(batch), load.load_json, batch)
+
+    return results
+
+
+def compare(results, previous_file):
+    """
+    prints the change in seconds and peak memory of every stage against a previous results file
+    :param results: the stage results of this run
+    :param previous_file: the previous results file
+    :return: None
+    """
+
+    with open(previous_file) as f:
+        previous = {r["stage"]: r for r in json.load(f)["results"]}
+
+    for record in results:
+        before = previous.get(record["stage"])
+        if before is None:
+            print(f"COMPARE: {record['stage']}: not in {previous_file}")
+            continue
+
+        change = (record["seconds"] - before["seconds"]) / before["seconds"] * 100 if before["seconds"] else 0.0
+        print(f"COMPARE: {record['stage']}: seconds {before['seconds']:.3f} -> {record['seconds']:.3f} "
+              f"({change:+.1f}%), peak {before['peak_mib']} -> {record['peak_mib']} MiB")
+
+
+def main():
+    """
+    parses the arguments, runs the stages and writes the results file
+    :return: None
+    """
+
+    parser = argparse.ArgumentParser(description="benchmarks the pipeline on synthetic sources")
+    parser.add_argument("--days", type=int, default=1000)
+    parser.add_argument("--countries", type=int, default=190)
+    parser.add_argument("--provinces", type=int, default=0)
+    parser.add_argument("--load-rows", type=int, default=None)
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", default=None)
+    args = parser.parse_args()
+
+    # the stand-ins accept any credentials, but the clients still require some
+    for name, value in (("AWS_ACCESS_KEY_ID", "testing"), ("AWS_SECRET_ACCESS_KEY", "testing"),
+                        ("AWS_DEFAULT_REGION", "us-east-1")):
+        os.environ.setdefault(name, value)
+
+    results = run(args.days, args.countries, args.provinces, args.load_rows)
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "parameters": vars(args),
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "numpy": np.__version__,
+                "pandas": pd.__version__
+            },
+            "results": results
+        }, f, indent=4)
+
+    print(f"INFO: Wrote {len(results)} Result(s) to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+compares the items per second of the Schema dump serializer, the compiled serializer, and CovidStatBatch.to_items
+
+usage: PYTHONPATH=main python -m benchmark.serialize_speed [rows]
+"""
+
+# internal modules
+import classes
+import serializers
+
+# external modules
+import sys
+import time
+
+from benchmark.batch_memory import create_batch
+from boto3.dynamodb.types import TypeSerializer
+
+
+def schema_items(dataclass, records):
+    """
+    the original serialization of load_one, kept for comparison
+    :param dataclass: the dataclass of the records
+    :param records: the records to serialize
+    :return: the DynamoDB items
+    """
+
+    serializer = TypeSerializer()
+    return [{k: serializer.serialize(v) for k, v in dataclass.Schema().dump(r).items() if v != ""} for r in records]
+
+
+def compiled_items(dataclass, records):
+    """
+    :param dataclass: the dataclass of the records
+    :param records: the records to serialize
+    :return: the DynamoDB items
+    """
+
+    serialize = serializers.get(dataclass)
+    return [serialize(r) for r in records]
+
+
+def main(rows):
+    """
+    times each serializer over the same statistics
+    :param rows: the number of statistics to serialize
+    :return: None
+    """
+
+    batch = create_batch(rows)
+    stats = batch.to_stats()
+
+    results = dict()
+    for name, function in (("schema", lambda: schema_items(classes.CovidStat, stats)),
+                           ("compiled", lambda: compiled_items(classes.CovidStat, stats)),
+                           ("batch", batch.to_items)):
+        start = time.perf_counter()
+        results[name] = function()
+        print(f"RESULT: {name}: {rows / (time.perf_counter() - start):,.0f} items/sec")
+
+    assert results["schema"] == results["compiled"] == results["batch"]
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
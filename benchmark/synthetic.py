@@ -0,0 +1,117 @@
+"""
+generates synthetic sources shaped like the NYT us.csv, the NYT us-counties.csv and the JHU combined CSV
+
+usage: PYTHONPATH=main python -m benchmark.synthetic directory [days] [countries] [provinces] [states] [counties]
+"""
+
+# external modules
+import numpy as np
+import pandas as pd
+import sys
+
+from os import path
+
+
+start_date = "2020-01-21"
+
+
+def nyt_frame(days, seed=0):
+    """
+    creates a NYT us.csv style frame holding one row per day of cumulative counts
+    :param days: the number of days to create
+    :param seed: the seed of the random counts
+    :return: the created dataframe
+    """
+
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "date": pd.date_range(start_date, periods=days).strftime("%Y-%m-%d"),
+        "cases": rng.integers(0, 100000, days).cumsum(),
+        "deaths": rng.integers(0, 2000, days).cumsum()
+    })
+
+
+def jhu_frame(days, countries=190, provinces=0, seed=0):
+    """
+    creates a JHU combined style frame; as in the source, the US has a single row per day while every other
+    country has a row per province, or a single row when there are no provinces
+    :param days: the number of days to create
+    :param countries: the number of countries including the US
+    :param provinces: the number of provinces of every country other than the US
+    :param seed: the seed of the random counts
+    :return: the created dataframe
+    """
+
+    names = [f"Province{j}" for j in range(provinces)] or [""]
+    regions = [("US", "")] + [(f"Country{i}", name) for i in range(1, countries) for name in names]
+
+    rows = days * len(regions)
+    rng = np.random.default_rng(seed)
+    country, province = (np.tile(np.array(column), days) for column in zip(*regions))
+
+    return pd.DataFrame({
+        "Date": pd.date_range(start_date, periods=days).strftime("%Y-%m-%d").repeat(len(regions)),
+        "Country/Region": country,
+        "Province/State": province,
+        "Lat": rng.random(rows) * 90,
+        "Long": rng.random(rows) * 180,
+        "Confirmed": rng.integers(0, 10 ** 7, rows),
+        "Recovered": rng.integers(0, 10 ** 6, rows),
+        "Deaths": rng.integers(0, 10 ** 5, rows)
+    })
+
+
+def county_frame(days, states=55, counties=60, seed=0):
+    """
+    creates a NYT us-counties.csv style frame holding one row per county per day
+    :param days: the number of days to create
+    :param states: the number of states
+    :param counties: the number of counties in every state
+    :param seed: the seed of the random counts
+    :return: the created dataframe
+    """
+
+    places = states * counties
+    rows = days * places
+    rng = np.random.default_rng(seed)
+
+    state = np.arange(places) // counties + 1
+    county = np.arange(places) % counties + 1
+
+    return pd.DataFrame({
+        "date": pd.date_range(start_date, periods=days).strftime("%Y-%m-%d").repeat(places),
+        "county": np.tile(np.char.add("County", county.astype(str)), days),
+        "state": np.tile(np.char.add("State", state.astype(str)), days),
+        "fips": np.tile(np.char.zfill((state * 1000 + county).astype(str), 5), days),
+        "cases": rng.integers(0, 10 ** 5, rows),
+        "deaths": rng.integers(0, 10 ** 3, rows)
+    })
+
+
+def write_sources(directory, days, countries=190, provinces=0, states=55, counties=60):
+    """
+    writes every synthetic source as a CSV file
+    :param directory: the directory to write to
+    :param days: the number of days in every source
+    :param countries: the number of countries in the JHU source
+    :param provinces: the number of provinces of every country other than the US in the JHU source
+    :param states: the number of states in the county source
+    :param counties: the number of counties in every state in the county source
+    :return: the written files by source name as a dict
+    """
+
+    files = {
+        "nyt": path.join(directory, "us.csv"),
+        "jhu": path.join(directory, "time-series-19-covid-combined.csv"),
+        "county": path.join(directory, "us-counties.csv")
+    }
+
+    nyt_frame(days).to_csv(files["nyt"], index=False)
+    jhu_frame(days, countries, provinces).to_csv(files["jhu"], index=False)
+    county_frame(days, states, counties).to_csv(files["county"], index=False)
+    return files
+
+
+if __name__ == "__main__":
+    for name, file in write_sources(sys.argv[1], *[int(i) for i in sys.argv[2:]] or [1000]).items():
+        print(f"INFO: Wrote {name} to {file}: {path.getsize(file) / 1024 ** 2:.1f} MiB")
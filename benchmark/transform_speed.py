@@ -0,0 +1,110 @@
+"""
+compares the vectorized transform against the original row by row transform on synthetic merged rows
+
+usage: PYTHONPATH=main python -m benchmark.transform_speed [rows ...]
+"""
+
+# internal modules
+import classes
+import transform
+
+# external modules
+import contextlib
+import io
+import numpy as np
+import pandas as pd
+import sys
+import time
+
+# the legacy transform derives no rates, so only the fields it sets are compared
+base_fields = ("idx", "date", "cases", "deaths", "recovered")
+
+
+def legacy_transform(ds1):
+    """
+    the original iterrows and dateutil implementation of transform, kept for comparison
+    :param ds1: the Dataset Instance to use
+    :return: created CovidStat instances
+    """
+
+    stats = list()
+    for i, r in ds1.df.iterrows():
+        cs = classes.CovidStat(i)
+        cs.cases = r["cases"] if "cases" in r else None
+        cs.deaths = r["deaths"] if "deaths" in r else None
+        cs.recovered = r["Recovered"] if "Recovered" in r else None
+
+        try:
+            cs.date = transform.parse_date(r["date"]) if "date" in r else None
+
+        except TypeError:
+            continue
+
+        stats.append(cs)
+
+    return stats
+
+
+def create_dataset(rows):
+    """
+    creates a Dataset holding synthetic rows as they are after the merge
+    :param rows: the number of rows to create
+    :return: the created Dataset
+    """
+
+    # dates cycle through the range pandas can represent
+    dates = pd.date_range("1700-01-01", "2200-12-31").strftime("%Y-%m-%d").to_numpy()
+    rng = np.random.default_rng(0)
+
+    dataset = classes.Dataset("merged")
+    dataset.df = pd.DataFrame({
+        "date": np.resize(dates, rows),
+        "cases": rng.integers(0, 10 ** 7, rows),
+        "deaths": rng.integers(0, 10 ** 5, rows),
+        "Recovered": rng.integers(0, 10 ** 6, rows)
+    })
+    return dataset
+
+
+def timed(function, *args):
+    """
+    times a function call with its output suppressed
+    :param function: the function to call
+    :param args: the arguments to call it with
+    :return: the seconds elapsed and the result as a tuple
+    """
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = function(*args)
+        return time.perf_counter() - start, result
+
+
+def base(stat):
+    """
+    :param stat: the CovidStat to compare
+    :return: the fields of the CovidStat set by both transforms
+    """
+
+    json = stat.to_json()
+    return {name: json[name] for name in base_fields}
+
+
+def main(sizes):
+    """
+    times both transforms at each size
+    :param sizes: the numbers of merged rows to time
+    :return: None
+    """
+
+    for rows in sizes:
+        dataset = create_dataset(rows)
+        legacy_secs, legacy = timed(legacy_transform, dataset)
+        vector_secs, vector = timed(transform.transform, dataset, None)
+        assert [base(s) for s in legacy[:100]] == [base(s) for s in vector[:100]]
+        print(f"RESULT: rows={rows}, legacy={legacy_secs:.3f}s, vectorized={vector_secs:.3f}s, "
+              f"speedup={legacy_secs / vector_secs:.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(i) for i in sys.argv[1:]] or [1000, 100000, 1000000])
@@ -1,66 +1,456 @@
 
 import classes
 import extract
-import load
-import transform
+import metrics
+import registry
+import stream
+import time
+import uuid
+
+from concurrent.futures import CancelledError, ThreadPoolExecutor, TimeoutError
+from datetime import date, timedelta
+from os import environ, path
+
+# cache initialization
+cache_dir = environ.get("CACHE_DIR")
+print(f"'cache_dir': {cache_dir}")
+
+# stage cache initialization; results are kept alongside the source cache unless configured
+stage_cache_dir = environ.get("STAGE_CACHE_DIR") or (path.join(cache_dir, "stages") if cache_dir else None)
+stage_cache_bytes = int(environ.get("STAGE_CACHE_BYTES", 64 * 1024 * 1024))
+print(f"'stage_cache_dir': {stage_cache_dir}")
+print(f"'stage_cache_bytes': {stage_cache_bytes}")
+
+# extract initialization
+extract_timeout = float(environ["EXTRACT_TIMEOUT"]) if environ.get("EXTRACT_TIMEOUT") else None
+print(f"'extract_timeout': {extract_timeout}")
+
+# delta initialization
+full_refresh = environ.get("FULL_REFRESH", "").lower() == "true"
+print(f"'full_refresh': {full_refresh}")
+
+# pipeline initialization; with a depth the stages overlap, holding at most depth chunks in between
+pipeline_depth = int(environ.get("PIPELINE_DEPTH", "0"))
+print(f"'pipeline_depth': {pipeline_depth}")
+
+# county initialization; the county dataset is processed by county_handler, in its own Lambda function, or
+# after handler when run locally and enabled, optionally limited to recent days
+county_enabled = environ.get("COUNTY_ENABLED", "").lower() == "true"
+county_days = int(environ["COUNTY_DAYS"]) if environ.get("COUNTY_DAYS") else None
+county_rollups = [r for r in environ.get("COUNTY_ROLLUPS", "state,national").split(",") if r]
+print(f"'county_enabled': {county_enabled}")
+print(f"'county_days': {county_days}")
+print(f"'county_rollups': {county_rollups}")
 
 
 def handler(event, context):
     """
-    entry point for Lambda function
+    entry point for Lambda function; the measures of every stage are printed as one record once it returns
     :param event: the Lambda event
     :param context: the Lambda context
     :return: None
     """
 
-    print(f"'event': {event}")
-    print(f"'context': {context}")
+    metrics.reset()
+
+    try:
+        # the countries are left to the next run once the deadline has stopped the load
+        partitions = dict()
+        stopped = process(event, context, partitions)
+
+        if partitions and not stopped:
+            process_countries(partitions, context, bool(event and event.get("full_refresh")))
+
+    finally:
+        metrics.current.emit()
+
+
+def process(event, context, partitions=None):
+    """
+    extracts, transforms and loads the datasets
+    :param event: the Lambda event
+    :param context: the Lambda context
+    :param partitions: a dict to add the records of each country of 'COUNTRIES' to when their source was modified,
+        or None to not split the countries
+    :return: True if the load was stopped by the deadline, otherwise False
+    """
+
+    if metrics.enabled("DEBUG"):
+        print(f"'event': {event}")
+        print(f"'context': {context}")
 
     # -----------------------------------------------------
     # EXTRACT
 
-    # define ny_dataset
-    ny_dataset = classes.Dataset("ny_dataset")
-    ny_dataset.headers_all = ["date", "cases", "deaths"]
-    ny_dataset.headers_key = ny_dataset.headers_all
-    ny_dataset.match_field = "date"
-    ny_dataset.source_url = "https://raw.githubusercontent.com/nytimes/covid-19-data/master/us.csv"
-
-    # extract and print ny_dataset
-    ny_dataset.df = extract.extract(ny_dataset.source_url)
-    print(f"'ny_dataset.df':\n{ny_dataset.df}")
-
-    # define jh_dataset
-    jh_dataset = classes.Dataset("jh_dataset")
-    jh_dataset.headers_all = [
-        "Date", "Country/Region", "Province/State", "Lat", "Long", "Confirmed", "Recovered", "Deaths"
-    ]
-    jh_dataset.headers_key = ["Date", "Country/Region", "Recovered"]
-    jh_dataset.match_field = "Date"
-    jh_dataset.source_url = \
-        "https://raw.githubusercontent.com/datasets/covid-19/master/data/time-series-19-covid-combined.csv"
-
-    # extract and print jh_dataset
-    jh_dataset.df = extract.extract(jh_dataset.source_url, jh_dataset.headers_key, "Country/Region", "US")
-    print(f"'jh_dataset.df':\n{jh_dataset.df}")
+    import countries
+
+    # define the datasets described by the registry; the first is the primary
+    datasets = registry.load_datasets()
+    refresh = full_refresh or bool(event and event.get("full_refresh"))
+
+    # the countries are split from the records of a dataset extracted for the merge, so its source is parsed once
+    country_source = countries.source_dataset(datasets) if partitions is not None else None
+    original = countries.widen(country_source) if country_source is not None else None
+
+    # extract and print the datasets concurrently
+    extract.extract_all(datasets, cache_dir, extract_timeout)
+
+    if country_source is not None:
+        split = countries.narrow(country_source, original)
+        if split and (country_source.modified or refresh):
+            partitions.update(split)
+
+        elif split is not None:
+            print(f"INFO: {country_source.name} not modified since the last run, skipping countries")
+
+    if metrics.enabled("DEBUG"):
+        for dataset in datasets:
+            print(f"'{dataset.name}.df':\n{dataset.df}")
+
+    # skip transform and load when no source has changed since the last run; an unfinished load forgets the cached
+    # sources, so the next run reads them again and resumes from its checkpoint
+    if not any(dataset.modified for dataset in datasets):
+        print("INFO: Source(s) not modified since the last run, skipping transform and load")
+        return False
 
     # -----------------------------------------------------
     # TRANSFORM
 
-    # transform the datasets into CovidStat Instances
-    covid_stats = transform.transform(ny_dataset, jh_dataset)
+    # the remaining stages are only imported once a source has changed
+    import cache
+    import checkpoint
+    import delta
+    import load
+    import transform
+    import validate
+
+    # a warm container reuses the stages of a run with identical source content and transform code
+    stage_cache = cache.StageCache(stage_cache_dir, stage_cache_bytes) if stage_cache_dir else None
+    stage_key = cache.stage_key(datasets, [transform, validate, classes]) if stage_cache else None
+    stage = stage_cache.get(stage_key) if stage_cache else None
+
+    if stage is not None and stage["loaded"] and not refresh:
+        print(f"INFO: Stage(s) {stage_key} already loaded, skipping transform and load")
+        metrics.count("stage_cache.loaded")
+        return False
+
+    if stage is not None:
+        print(f"INFO: Stage(s) {stage_key} found in the Stage Cache, skipping transform")
+        metrics.count("stage_cache.hit")
+        covid_stats = stage["covid_stats"]
+
+    else:
+        # transform the datasets into a CovidStatBatch Instance
+        dropped = list()
+        with metrics.stage("merge") as measures:
+            merged = transform.merge(datasets, dropped)
+            measures["rows"] = len(merged)
+
+        # rejected rows are quarantined with the counts of each rule, the clean rows continue to load
+        with metrics.stage("validate") as measures:
+            merged, rejected, report = validate.validate(merged, dropped=dropped)
+            measures["rows"] = len(merged)
+
+        validate.quarantine(rejected, report)
+
+        with metrics.stage("transform") as measures:
+            covid_stats = transform.to_batch(merged)
+            measures["rows"] = len(covid_stats)
+
+        stage = {"merged": merged, "covid_stats": covid_stats, "loaded": False}
+
+        if stage_cache:
+            stage_cache.put(stage_key, stage)
 
     # print CovidStats
-    print(*covid_stats, sep="\n")
+    if metrics.enabled("DEBUG"):
+        print(*covid_stats, sep="\n")
 
     # -----------------------------------------------------
     # LOAD
 
-    # load CovidStat instances into the CovidStats DynamoDB table
-    load.load_all(classes.CovidStat, covid_stats)
+    # the monthly layout rewrites each month holding a change as a single item
+    if load.dynamodb_layout == "monthly":
+        import monthly
+        dataclass = monthly.CovidStatMonths
+
+    else:
+        dataclass = classes.CovidStat
+
+    # only load the statistics that are new or changed since the last run, unless a full refresh is requested; each
+    # layout keeps its own snapshot, so switching layouts loads every statistic into the table of the new one
+    with metrics.stage("delta") as measures:
+        snapshot = dict() if refresh else delta.read_snapshot(dataclass.table_name)
+        prints = delta.fingerprints(covid_stats)
+        changes = delta.changed(prints, snapshot)
+        measures["rows"] = int(changes.sum())
+    print(f"INFO: {changes.sum()}/{len(covid_stats)} Record(s) new or changed")
+
+    records = monthly.pack(covid_stats, changes) if load.dynamodb_layout == "monthly" else covid_stats[changes]
+
+    # a load stopped by the deadline or an error resumes from its checkpoint while the statistics are unchanged
+    state = checkpoint.read_checkpoint()
+    fingerprint = checkpoint.fingerprint(prints[changes], load.dynamodb_layout)
+    start = checkpoint.resume(state, fingerprint)
+    run_id = state["run_id"] if start else getattr(context, "aws_request_id", None) or uuid.uuid4().hex
+    if start:
+        print(f"INFO: Resuming run {run_id} from Record {start}/{len(records)}")
+        metrics.count("checkpoint.resumed", start)
+
+    # the pipelined mode writes the S3 exports while the DynamoDB load runs; neither mode starts an export past
+    # the deadline, which is left to the run that finishes the load
+    deadline = checkpoint.deadline(context)
+    exporter = None
+    if pipeline_depth:
+        executor = ThreadPoolExecutor(max_workers=1)
+        exporter = executor.submit(export, covid_stats, None if refresh else changes, deadline)
+        executor.shutdown(wait=False)
+
+    # load CovidStatBatch instance into the CovidStats DynamoDB table
+    progress = dict()
+    load.load_batch(dataclass, records[start:], deadline=deadline, progress=progress)
+    loaded = start + progress["done"] == len(records)
+
+    if loaded:
+        delta.write_snapshot(prints[changes], snapshot, dataclass.table_name)
+        if state is not None:
+            checkpoint.clear_checkpoint()
+
+    else:
+        checkpoint.write_checkpoint(run_id, fingerprint, start + progress["done"])
+        extract.forget(datasets, cache_dir)
+
+    # the pipelined export is only waited on until the deadline, keeping the reserve of the checkpoint
+    exported = False
+    if exporter is not None:
+        if progress["stopped"]:
+            exporter.cancel()
+
+        try:
+            exported = exporter.result(timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+        except (CancelledError, TimeoutError):
+            print("WARN: Export unfinished by the deadline, leaving it to the next run")
+
+    elif not progress["stopped"]:
+        exported = export(covid_stats, None if refresh else changes, deadline)
+
+    # an identical rerun in this container can exit once every stage has been loaded and exported
+    if stage_cache and loaded and exported:
+        stage["loaded"] = True
+        stage_cache.put(stage_key, stage)
+
+    return progress["stopped"]
+
+
+def export(covid_stats, changes, deadline=None):
+    """
+    writes the statistics to S3 as JSON, and as Parquet when enabled
+    :param covid_stats: the CovidStatBatch holding every statistic
+    :param changes: a boolean mask of the statistics changed by this run, or None to rewrite every partition
+    :param deadline: the time.monotonic() after which no export is started, or None to write every export
+    :return: True if every export was started, False if the deadline stopped them
+    """
+
+    import load
+
+    if deadline is not None and time.monotonic() > deadline:
+        print("WARN: Deadline reached, skipping the exports")
+        return False
+
     load.load_json(covid_stats)
 
+    if not load.s3_object_parquet:
+        return True
+
+    if deadline is not None and time.monotonic() > deadline:
+        print("WARN: Deadline reached, skipping the Parquet export")
+        return False
+
+    # a full refresh rewrites every partition, otherwise only the months holding a change or missing from S3
+    load.load_parquet(covid_stats, changes)
+    return True
+
+
+def county_handler(event, context):
+    """
+    entry point for the Lambda function loading the county dataset; reading the whole source takes longer than
+    handler may run, so it is scheduled apart with a timeout of its own
+    :param event: the Lambda event
+    :param context: the Lambda context
+    :return: None
+    """
+
+    metrics.reset()
+
+    try:
+        process_counties(context)
+
+    finally:
+        metrics.current.emit()
+
+
+def process_counties(context=None):
+    """
+    extracts, transforms and loads the county dataset one chunk at a time, so only a chunk and the partial sums
+    of the rollups are held in memory however large the dataset grows; the source is skipped while it has not been
+    modified since it was last loaded in full, and no chunk is started past the deadline of the Lambda context
+    :param context: the Lambda context, or None when run locally
+    :return: the number of records written
+    """
+
+    import checkpoint
+    import load
+    import transform
+
+    dataset = registry.load_county_dataset()
+    if dataset is None:
+        print("WARN: No 'county_dataset' in the registry, skipping counties")
+        return 0
+
+    try:
+        source, validators = extract.open_source(dataset, cache_dir, extract_timeout)
+
+    except OSError as e:
+        print(f"ERROR: {dataset.name} could not be extracted: {e}")
+        load.publish_message("CGC0920: Data Load Failure", f"FAILURE! {dataset.name} could not be extracted: {e}")
+        return 0
+
+    if not dataset.modified:
+        print(f"INFO: {dataset.name} not modified since it was last loaded, skipping counties")
+        return 0
+
+    since = date.today() - timedelta(days=county_days) if county_days else None
+    deadline = checkpoint.deadline(context)
+    chunksize = dataset.chunksize or 20000
+    partials = list()
+    extracted = True
+    stopped = False
+    cnt = 0
+    total = 0
+
+    def county_batches():
+        """
+        :return: a generator of the transformed chunks of the county dataset
+        """
+        chunks = extract.read_chunks(source, dataset.headers_key, dataset.filter_key, dataset.filter_val, chunksize)
+
+        for _, chunk in chunks:
+            with metrics.stage("transform.county") as measures:
+                batch = transform.county_batch(chunk, since)
+                measures["rows"] = len(batch)
+
+            yield batch
+
+    # in the pipelined mode the next chunks are extracted and transformed while a chunk loads
+    batches = stream.prefetch(county_batches(), pipeline_depth)
+
+    try:
+        for batch in batches:
+            if deadline is not None and time.monotonic() >= deadline:
+                stopped = True
+                break
+
+            if county_rollups:
+                partials.append(transform.rollup_partial(batch))
+
+            progress = dict()
+            cnt += load.load_batch(classes.CountyCovidStat, batch, publish=False, deadline=deadline, progress=progress)
+            total += len(batch)
+
+            if progress["stopped"]:
+                stopped = True
+                break
+
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {dataset.name} could not be extracted: {e}")
+        extracted = False
+
+    finally:
+        # the producer is stopped before the source it reads from is closed
+        batches.close()
+        if hasattr(source, "close"):
+            source.close()
+
+    if stopped:
+        print(f"WARN: STOPPED! {dataset.name} was not loaded in full before the deadline")
+        extracted = False
+
+    # the rollups of an incomplete extract would overwrite complete sums with partial ones
+    for level in county_rollups if extracted else []:
+        batch = transform.rollup(partials, level)
+
+        # the items of a whole rollup can outgrow the chunks, so they are loaded a chunk at a time as well
+        for i in range(0, len(batch), chunksize):
+            cnt += load.load_batch(classes.CountyCovidStat, batch[i:i + chunksize], publish=False)
+
+        total += len(batch)
+
+    message = f"Loaded {cnt}/{total} County Record(s) into {classes.CountyCovidStat.table_name}"
+
+    # only a source loaded in full is skipped by the next run until it is modified
+    if extracted and cnt == total:
+        extract.write_validators(cache_dir, validators)
+        print(f"INFO: SUCCESS! {message}")
+        load.publish_message("CGC0920: Data Load Success", f"SUCCESS! {message}")
+
+    else:
+        print(f"ERROR: FAILURE! {message}")
+        load.publish_message("CGC0920: Data Load Failure", f"FAILURE! {message}")
+
+    return cnt
+
+
+def process_countries(partitions, context=None, refresh=False):
+    """
+    transforms and loads the countries split from their source in parallel, so adding a country costs its output
+    rather than another parse of the whole source; only the statistics new or changed since the last run are loaded
+    :param partitions: a dict of the records of each country, as split by process
+    :param context: the Lambda context, or None when run locally
+    :param refresh: True to load every statistic, rather than only the new or changed ones
+    :return: the number of records written
+    """
+
+    import checkpoint
+    import countries
+    import delta
+    import load
+
+    table_name = classes.CountryCovidStat.table_name
+    snapshot = dict() if refresh or full_refresh else delta.read_snapshot(table_name)
+    results = dict()
+    transformed = True
+
+    try:
+        with metrics.stage("countries") as measures:
+            results, loaded = countries.load_countries(partitions, snapshot, deadline=checkpoint.deadline(context))
+            measures["rows"] = sum(cnt for _, cnt in results.values())
+
+        # a country left unfinished is loaded by the next run that finds its source modified
+        delta.write_snapshot(loaded, snapshot, table_name)
+
+    except (OSError, ValueError) as e:
+        print(f"ERROR: Countries could not be transformed: {e}")
+        transformed = False
+
+    cnt = sum(cnt for _, cnt in results.values())
+    total = sum(total for total, _ in results.values())
+    message = f"Loaded {cnt}/{total} Record(s) of {len(results)} Country(s) into {table_name}"
+
+    if transformed and cnt == total:
+        print(f"INFO: SUCCESS! {message}")
+        load.publish_message("CGC0920: Data Load Success", f"SUCCESS! {message}")
+
+    else:
+        print(f"ERROR: FAILURE! {message}")
+        load.publish_message("CGC0920: Data Load Failure", f"FAILURE! {message}")
+
+    return cnt
+
 
 # Local Only
 if __name__ == "__main__":
     handler(None, None)
+
+    if county_enabled:
+        county_handler(None, None)
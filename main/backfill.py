@@ -0,0 +1,310 @@
+# -------------------------------
+# internal modules
+import classes
+import extract
+import load
+import metrics
+import monthly
+import registry
+import throttle
+import transform
+import validate
+
+# -------------------------------
+# external modules
+import argparse
+import json
+import numpy as np
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from os import environ
+
+# global initialization
+backfill_workers = int(environ.get("BACKFILL_WORKERS", "4"))
+backfill_shard_days = int(environ.get("BACKFILL_SHARD_DAYS", "30"))
+print(f"'backfill_workers': {backfill_workers}")
+print(f"'backfill_shard_days': {backfill_shard_days}")
+
+
+def plan(start, end, shard_days=None):
+    """
+    splits a date range into shards of consecutive days
+    :param start: the first date to load, as a date or an ISO string
+    :param end: the last date to load, as a date or an ISO string
+    :param shard_days: the number of days in each shard, or None to use 'BACKFILL_SHARD_DAYS'
+    :return: the shards as dicts of their 'shard' number and inclusive 'start' and 'end' ISO dates
+    """
+
+    start, end = to_date(start), to_date(end)
+    shard_days = shard_days or backfill_shard_days
+
+    if end < start:
+        raise ValueError(f"'end' {end} is before 'start' {start}")
+
+    shards = list()
+    first = start
+    while first <= end:
+        last = min(first + timedelta(days=shard_days - 1), end)
+        shards.append({"shard": len(shards), "start": first.isoformat(), "end": last.isoformat()})
+        first = last + timedelta(days=1)
+
+    return shards
+
+
+def select(batch, shard):
+    """
+    :param batch: the CovidStatBatch holding every statistic
+    :param shard: the shard to select
+    :return: the CovidStatBatch of the statistics dated within the shard
+    """
+
+    return batch[within(batch, shard)]
+
+
+def within(batch, shard):
+    """
+    :param batch: the CovidStatBatch holding every statistic
+    :param shard: the shard to match
+    :return: a boolean mask of the statistics dated within the shard
+    """
+
+    return (batch.date >= np.datetime64(shard["start"])) & (batch.date <= np.datetime64(shard["end"]))
+
+
+def layout_dataclass():
+    """
+    :return: the dataclass of the 'DYNAMODB_LAYOUT' the daily runs load, so a backfill fills the same table
+    """
+
+    return monthly.CovidStatMonths if load.dynamodb_layout == "monthly" else classes.CovidStat
+
+
+def shard_records(batch, shard):
+    """
+    :param batch: the CovidStatBatch holding every statistic
+    :param shard: the shard to select
+    :return: the records of the shard in the 'DYNAMODB_LAYOUT'; the monthly layout packs every month the shard
+        touches whole, so shards sharing a month write the same item
+    """
+
+    if load.dynamodb_layout == "monthly":
+        return monthly.pack(batch, within(batch, shard))
+
+    return select(batch, shard)
+
+
+def write_rate(shards=1):
+    """
+    :param shards: the number of shards loaded at once against the table
+    :return: the write capacity units per second of each shard, or None to not limit the writes
+    """
+
+    rate = load.dynamodb_write_rate or load.table_write_rate(layout_dataclass().table_name)
+    return rate / max(1, shards) if rate else None
+
+
+def load_shard(batch, shard, bucket=None):
+    """
+    loads the statistics of one shard; a shard is loaded whole or reported as failed, so it can be retried alone
+    :param batch: the CovidStatBatch holding every statistic
+    :param shard: the shard to load
+    :param bucket: the TokenBucket shared by the shards loaded at once, or None to limit the shard alone
+    :return: the summary of the shard as a dict, with its 'status', 'records', 'loaded', 'seconds' and 'error'
+    """
+
+    start = time.perf_counter()
+    part = shard_records(batch, shard)
+    summary = dict(shard, records=len(part), loaded=0, error=None)
+
+    try:
+        summary["loaded"] = load.load_batch(layout_dataclass(), part, workers=1, publish=False, bucket=bucket)
+
+    except Exception as e:
+        summary["error"] = str(e)
+
+    if summary["error"] is None and summary["loaded"] < summary["records"]:
+        summary["error"] = f"{summary['records'] - summary['loaded']} Record(s) not loaded"
+
+    summary["status"] = "SUCCESS" if summary["error"] is None else "FAILURE"
+    summary["seconds"] = round(time.perf_counter() - start, 3)
+    return summary
+
+
+def backfill(batch, shards, workers=None):
+    """
+    loads shards concurrently; the shards share the batch, so threads are used rather than processes
+    :param batch: the CovidStatBatch holding every statistic
+    :param shards: the shards to load
+    :param workers: the number of shards to load at once, or None to use 'BACKFILL_WORKERS'
+    :return: the summary of each shard, in the order of the shards
+    """
+
+    # the shards write to the same table, so they share one limit of its capacity rather than each taking all of it
+    rate = write_rate()
+    bucket = throttle.TokenBucket(rate) if rate else None
+
+    with ThreadPoolExecutor(max_workers=max(1, workers or backfill_workers)) as executor:
+        summaries = list(executor.map(lambda s: load_shard(batch, s, bucket), shards))
+
+    failed = [s["shard"] for s in summaries if s["status"] != "SUCCESS"]
+    loaded = sum(s["loaded"] for s in summaries)
+    records = sum(s["records"] for s in summaries)
+
+    message = f"Backfilled {loaded}/{records} Record(s) in {len(shards) - len(failed)}/{len(shards)} Shard(s)"
+    if failed:
+        print(f"ERROR: FAILURE! {message}, failed Shard(s): {failed}")
+        load.publish_message("CGC0920: Data Backfill Failure", f"FAILURE! {message}\nFailed Shard(s): {failed}")
+
+    else:
+        print(f"INFO: SUCCESS! {message}")
+        load.publish_message("CGC0920: Data Backfill Success", f"SUCCESS! {message}")
+
+    return summaries
+
+
+def retry_shards(summaries):
+    """
+    :param summaries: the summaries of an earlier backfill
+    :return: the shards of the summaries that did not succeed
+    """
+
+    return [{k: s[k] for k in ("shard", "start", "end")} for s in summaries if s.get("status") != "SUCCESS"]
+
+
+def merge_summaries(summaries, retried):
+    """
+    :param summaries: the summaries of an earlier backfill
+    :param retried: the summaries of the shards retried since
+    :return: the summaries with those of the retried shards replaced
+    """
+
+    by_shard = {s["shard"]: s for s in retried}
+    return [by_shard.get(s["shard"], s) for s in summaries]
+
+
+def read_summary(summary_file):
+    """
+    :param summary_file: the JSON summary file to read
+    :return: the summary of each shard
+    """
+
+    with open(summary_file) as f:
+        return json.load(f)["shards"]
+
+
+def write_summary(summary_file, summaries):
+    """
+    :param summary_file: the JSON summary file to write
+    :param summaries: the summary of each shard
+    :return: None
+    """
+
+    with open(summary_file, "w") as f:
+        json.dump({"shards": summaries}, f, indent=4)
+
+
+def plan_events(shards):
+    """
+    :param shards: the shards to fan out
+    :return: the event of a Lambda invocation of this module's handler for each shard, with the number of shards
+        invoked at once, which share the capacity of the table
+    """
+
+    return [{"backfill": shard, "shards": len(shards)} for shard in shards]
+
+
+def transform_all(cache_dir=None, timeout=None):
+    """
+    extracts and transforms the datasets of the registry into the statistics to backfill from
+    :param cache_dir: the directory to cache sources in, or None to always download
+    :param timeout: the seconds each Dataset may take to extract, or None to wait indefinitely
+    :return: the CovidStatBatch holding every statistic
+    """
+
+    datasets = registry.load_datasets()
+    extract.extract_all(datasets, cache_dir, timeout)
+
+    # the daily runs quarantine the rejected rows, a backfill only leaves them out
+    dropped = list()
+    merged, _, _ = validate.validate(transform.merge(datasets, dropped), dropped=dropped)
+    return transform.to_batch(merged)
+
+
+def handler(event, context):
+    """
+    entry point for a Lambda invocation loading the shard of its event, as planned by plan_events
+    :param event: the Lambda event holding the 'backfill' shard
+    :param context: the Lambda context
+    :return: the summary of the shard
+    """
+
+    if metrics.enabled("DEBUG"):
+        print(f"'event': {event}")
+        print(f"'context': {context}")
+
+    # each invocation limits its shard to its part of the table's capacity, as the fanned out shards run at once
+    rate = write_rate(event.get("shards", 1))
+    bucket = throttle.TokenBucket(rate) if rate else None
+
+    summary = load_shard(transform_all(environ.get("CACHE_DIR")), event["backfill"], bucket)
+    print(f"{'INFO' if summary['status'] == 'SUCCESS' else 'ERROR'}: {json.dumps(summary)}")
+    return summary
+
+
+def to_date(value):
+    """
+    :param value: a date or an ISO string
+    :return: the date
+    """
+
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def main():
+    """
+    parses the arguments, then plans, loads or retries the shards and writes their summary
+
+    usage: python backfill.py --start 2020-01-21 --end 2020-12-31 [--workers 4] [--shard-days 30]
+           [--summary backfill-summary.json] [--retry] [--plan]
+
+    --retry only reloads the shards the summary records as failed, and --plan prints a Lambda event per shard
+    instead of loading, for fanning the backfill out over invocations of this module's handler
+    :return: None
+    """
+
+    parser = argparse.ArgumentParser(description="backfills a date range of statistics into DynamoDB")
+    parser.add_argument("--start")
+    parser.add_argument("--end")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--shard-days", type=int, default=None)
+    parser.add_argument("--summary", default="backfill-summary.json")
+    parser.add_argument("--retry", action="store_true")
+    parser.add_argument("--plan", action="store_true")
+    args = parser.parse_args()
+
+    if args.retry:
+        summaries = read_summary(args.summary)
+        shards = retry_shards(summaries)
+        print(f"INFO: Retrying {len(shards)} failed Shard(s) of {args.summary}")
+
+    else:
+        if args.start is None or args.end is None:
+            parser.error("--start and --end are required unless retrying")
+
+        summaries = list()
+        shards = plan(args.start, args.end, args.shard_days)
+
+    if args.plan:
+        print(json.dumps(plan_events(shards), indent=4))
+        return
+
+    if shards:
+        retried = backfill(transform_all(environ.get("CACHE_DIR")), shards, args.workers)
+        write_summary(args.summary, merge_summaries(summaries, retried) if args.retry else retried)
+        print(f"INFO: Wrote the summary of {len(retried)} Shard(s) to {args.summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import pandas as pd
+
+from os import path
+
+
+class StageCache:
+    """class to store the results of pipeline stages as files, evicting the least recently used beyond a size"""
+
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024):
+        """
+        initializes a StageCache instance
+        :param directory: the directory to store the results in; it is created if missing
+        :param max_bytes: the total bytes the results may use before the least recently used are evicted
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def file(self, key):
+        """
+        :param key: the key of a result
+        :return: the file storing the result
+        """
+        return path.join(self.directory, f"{key}.pkl")
+
+    def get(self, key):
+        """
+        reads a result, marking it as recently used
+        :param key: the key of the result
+        :return: the result, or None if it is not cached
+        """
+        file = self.file(key)
+
+        try:
+            with open(file, "rb") as f:
+                result = pickle.load(f)
+
+        except FileNotFoundError:
+            return None
+
+        except (pickle.UnpicklingError, EOFError, AttributeError) as e:
+            print(f"WARN: Discarding unreadable Stage Cache entry {key}: {e}")
+            os.remove(file)
+            return None
+
+        os.utime(file)
+        return result
+
+    def put(self, key, result):
+        """
+        writes a result atomically, then evicts the least recently used results beyond the size
+        :param key: the key of the result
+        :param result: the result to write
+        :return: None
+        """
+        handle, temp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+
+        with os.fdopen(handle, "wb") as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(temp, self.file(key))
+        self.evict()
+
+    def evict(self):
+        """
+        removes the least recently used results until the rest fit within the size
+        :return: the keys of the removed results
+        """
+        entries = list()
+        for name in os.listdir(self.directory):
+            if name.endswith(".pkl"):
+                stat = os.stat(path.join(self.directory, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        removed = list()
+
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+
+            os.remove(path.join(self.directory, name))
+            total -= size
+            removed.append(name[:-len(".pkl")])
+
+        return removed
+
+
+def stage_key(datasets, modules):
+    """
+    hashes the content of the extracted datasets together with the code of the modules that transform them
+    :param datasets: the Dataset instances to hash; a missing df is hashed as missing
+    :param modules: the modules whose source is the version of the transform
+    :return: the key as a hex string
+    """
+
+    digest = hashlib.sha256()
+
+    for module in modules:
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+
+    for dataset in datasets:
+        digest.update(f"{dataset.name}|{dataset.match_field}|{dataset.columns}|".encode("utf-8"))
+
+        if dataset.df is None:
+            digest.update(b"<missing>")
+            continue
+
+        digest.update("|".join(map(str, dataset.df.columns)).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(dataset.df, index=True).to_numpy().tobytes())
+
+    return digest.hexdigest()
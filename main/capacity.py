@@ -0,0 +1,199 @@
+# -------------------------------
+# internal modules
+import metrics
+
+# -------------------------------
+# external modules
+import argparse
+import json
+import math
+import time
+
+from contextlib import contextmanager
+from os import environ
+
+# profiling records the latency of every request and the size of every item written to the run record
+profile_enabled = environ.get("CAPACITY_PROFILE", "").lower() == "true"
+print(f"'profile_enabled': {profile_enabled}")
+
+# a write capacity unit covers 1KB of an item, a strongly consistent read capacity unit 4KB
+write_unit_bytes = 1024
+read_unit_bytes = 4096
+
+
+def item_size(item):
+    """
+    estimates the size of a DynamoDB item as it is billed: the length of every attribute name and value, numbers
+    taking a byte per two significant digits plus one
+    :param item: the item to measure, as DynamoDB attribute values
+    :return: the size of the item in bytes
+    """
+
+    return sum(len(name.encode()) + value_size(value) for name, value in item.items())
+
+
+def value_size(value):
+    """
+    :param value: a DynamoDB attribute value
+    :return: the size of the value in bytes
+    """
+
+    (kind, data), = value.items()
+
+    if kind == "S":
+        return len(data.encode())
+
+    if kind == "N":
+        digits = data.lstrip("-").replace(".", "").strip("0") or "0"
+        return math.ceil(len(digits) / 2) + 1
+
+    if kind == "B":
+        return len(data)
+
+    if kind in ("SS", "NS", "BS"):
+        return sum(value_size({kind[0]: i}) for i in data)
+
+    if kind == "L":
+        return 3 + sum(1 + value_size(i) for i in data)
+
+    if kind == "M":
+        return 3 + sum(1 + len(k.encode()) + value_size(v) for k, v in data.items())
+
+    # BOOL and NULL
+    return 1
+
+
+def write_units(item):
+    """
+    :param item: the item to write
+    :return: the write capacity units of writing the item
+    """
+
+    return max(1, math.ceil(item_size(item) / write_unit_bytes))
+
+
+def read_units(item, consistent=False):
+    """
+    :param item: the item to read
+    :param consistent: True for a strongly consistent read, which costs twice an eventually consistent one
+    :return: the read capacity units of reading the item
+    """
+
+    units = max(1, math.ceil(item_size(item) / read_unit_bytes))
+    return units if consistent else units / 2
+
+
+@contextmanager
+def request(operation):
+    """
+    times a request to AWS when profiling
+    :param operation: the name of the operation, such as 'dynamodb.batch_write_item'
+    :return: the context manager timing the request
+    """
+
+    if not profile_enabled:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+
+    finally:
+        metrics.observe(f"{operation}.ms", (time.perf_counter() - start) * 1000)
+
+
+def profile_items(items):
+    """
+    records the size and estimated write units of items about to be written when profiling
+    :param items: the serialized items
+    :return: None
+    """
+
+    if not profile_enabled:
+        return
+
+    for item in items:
+        size = item_size(item)
+        metrics.observe("dynamodb.item.bytes", size)
+        metrics.count("dynamodb.estimated_capacity", max(1, math.ceil(size / write_unit_bytes)))
+
+
+def estimate(batches, rate=None):
+    """
+    estimates the cost of writing batches of serialized items without calling AWS
+    :param batches: the batches of items to write, as written by load.write_batches
+    :param rate: the write capacity units per second to estimate the time at, or None to skip it
+    :return: the items, requests, bytes, largest item, write capacity units, seconds at the rate, and the read
+        capacity units of reading every item once with eventual consistency, as a dict
+    """
+
+    result = {"items": 0, "requests": 0, "bytes": 0, "max_item_bytes": 0, "write_units": 0, "read_units": 0}
+
+    for batch in batches:
+        sizes = [item_size(item) for item in batch]
+        result["items"] += len(sizes)
+        result["requests"] += 1
+        result["bytes"] += sum(sizes)
+        result["max_item_bytes"] = max([result["max_item_bytes"]] + sizes)
+        result["write_units"] += sum(max(1, math.ceil(s / write_unit_bytes)) for s in sizes)
+        result["read_units"] += sum(max(1, math.ceil(s / read_unit_bytes)) for s in sizes) / 2
+
+    result["seconds"] = result["write_units"] / rate if rate else None
+    return result
+
+
+def dry_run(dataclass, records, rate=None):
+    """
+    serializes records as load.load_batch does and estimates the cost of writing them, without calling AWS
+    :param dataclass: the dataclass to write
+    :param records: the records to write, as a list or a CovidStatBatch
+    :param rate: the write capacity units per second to estimate the time at, or None to skip it
+    :return: the estimate, see estimate, with the table written to
+    """
+
+    import load
+
+    counts = {"duplicates": 0}
+    result = estimate(load.serialize_batches(dataclass, records, counts), rate)
+    result["table"] = dataclass.table_name
+    return result
+
+
+def main():
+    """
+    estimates what a full load of the datasets of the registry costs in a layout, without writing to AWS
+
+    usage: python capacity.py [--layout daily|monthly] [--rate 5] [--start 2020-01-21] [--end 2020-12-31]
+
+    the estimate is of the code as it is, so running it before and after a schema change shows what it costs
+    :return: None
+    """
+
+    parser = argparse.ArgumentParser(description="estimate the DynamoDB capacity a full load consumes")
+    parser.add_argument("--layout", choices=("daily", "monthly"), default="daily", help="the DynamoDB layout")
+    parser.add_argument("--rate", type=float, help="the write capacity units per second to estimate the time at")
+    parser.add_argument("--start", help="the first date to estimate, as YYYY-MM-DD")
+    parser.add_argument("--end", help="the last date to estimate, as YYYY-MM-DD")
+    args = parser.parse_args()
+
+    import backfill
+    import classes
+
+    batch = backfill.transform_all(environ.get("CACHE_DIR"))
+    if args.start or args.end:
+        batch = backfill.select(batch, {"start": args.start or str(batch.date.min()),
+                                        "end": args.end or str(batch.date.max())})
+
+    if args.layout == "monthly":
+        import monthly
+        result = dry_run(monthly.CovidStatMonths, monthly.pack(batch), args.rate)
+
+    else:
+        result = dry_run(classes.CovidStat, batch, args.rate)
+
+    print(json.dumps(result, indent=4))
+
+
+if __name__ == "__main__":
+    main()
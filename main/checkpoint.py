@@ -0,0 +1,147 @@
+# -------------------------------
+# internal modules
+import clients
+
+# -------------------------------
+# external modules
+import hashlib
+import json
+import time
+
+from datetime import datetime, timezone
+from os import environ
+
+# the milliseconds kept back from the Lambda deadline to stop the writes and record the checkpoint
+load_reserve_ms = int(environ.get("LOAD_RESERVE_MS", "3000"))
+print(f"'load_reserve_ms': {load_reserve_ms}")
+
+checkpoint_name = "CovidStats.checkpoint.json"
+
+
+def fingerprint(prints, layout="daily"):
+    """
+    hashes the fingerprints of the statistics to load, so a checkpoint is only resumed for the same input
+    :param prints: the fingerprints of the statistics to load, as returned by delta.fingerprints
+    :param layout: the DynamoDB layout the records are loaded in, as the checkpoint counts its records
+    :return: the hex digest of the input
+    """
+
+    digest = hashlib.sha256(layout.encode())
+    digest.update("\n".join(prints.index).encode())
+    digest.update("\n".join(prints.to_numpy(dtype=str)).encode())
+    return digest.hexdigest()
+
+
+def deadline(context, reserve_ms=None):
+    """
+    finds the time to stop starting writes by, leaving time to record the checkpoint before the Lambda times out
+    :param context: the Lambda context, or None when run locally
+    :param reserve_ms: the milliseconds to keep back, or None to use 'LOAD_RESERVE_MS'
+    :return: the time.monotonic() to stop by, or None without a deadline
+    """
+
+    if not hasattr(context, "get_remaining_time_in_millis"):
+        return None
+
+    remaining = context.get_remaining_time_in_millis() - (load_reserve_ms if reserve_ms is None else reserve_ms)
+    return time.monotonic() + max(0, remaining) / 1000
+
+
+def resume(state, input_fingerprint):
+    """
+    finds the record to resume a load from
+    :param state: the checkpoint as returned by read_checkpoint, or None
+    :param input_fingerprint: the fingerprint of the statistics to load
+    :return: the number of leading records already written; 0 unless the checkpoint is of the same input
+    """
+
+    if state is None or state.get("fingerprint") != input_fingerprint:
+        return 0
+
+    return state["records"]
+
+
+def read_checkpoint():
+    """
+    reads the checkpoint of an unfinished load from S3
+    :return: the checkpoint as a dict of run_id, fingerprint, records, and updated; None if there is none
+    """
+
+    # the S3 stages are only imported once a checkpoint is read or written, as deadline is used without them
+    import load
+    from botocore.exceptions import ClientError
+
+    if not load.s3_bucket_name:
+        return None
+
+    try:
+        response = clients.client("s3").get_object(Bucket=load.s3_bucket_name, Key=checkpoint_key())
+        return json.loads(response["Body"].read())
+
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "NoSuchKey":
+            print(f"ERROR: {str(e)}")
+
+        return None
+
+
+def write_checkpoint(run_id, input_fingerprint, records):
+    """
+    writes the checkpoint of an unfinished load to S3
+    :param run_id: the id of the run that started the load
+    :param input_fingerprint: the fingerprint of the statistics to load
+    :param records: the number of leading records written
+    :return: the checkpoint written, or None if it could not be written
+    """
+
+    import load
+    from botocore.exceptions import ClientError
+
+    if not load.s3_bucket_name:
+        print("WARN: S3 Bucket not initialized, the load will restart on the next run!")
+        return None
+
+    state = {
+        "run_id": run_id,
+        "fingerprint": input_fingerprint,
+        "records": records,
+        "updated": datetime.now(timezone.utc).isoformat()
+    }
+
+    try:
+        clients.client("s3").put_object(Bucket=load.s3_bucket_name, Key=checkpoint_key(), Body=json.dumps(state))
+        print(f"INFO: Checkpoint of run {run_id} at Record {records}")
+        return state
+
+    except ClientError as e:
+        print(f"ERROR: {str(e)}")
+        return None
+
+
+def clear_checkpoint():
+    """
+    removes the checkpoint once its load has finished
+    :return: None
+    """
+
+    import load
+    from botocore.exceptions import ClientError
+
+    if not load.s3_bucket_name:
+        return
+
+    try:
+        clients.client("s3").delete_object(Bucket=load.s3_bucket_name, Key=checkpoint_key())
+
+    except ClientError as e:
+        print(f"ERROR: {str(e)}")
+
+
+def checkpoint_key():
+    """
+    :return: the S3 key of the checkpoint
+    """
+
+    import load
+
+    return f"{load.s3_object_path}/{checkpoint_name}" if load.s3_object_path else checkpoint_name
@@ -1,18 +1,30 @@
 import marshmallow_dataclass
 import marshmallow
+import numpy as np
+
+# derived rates are stored as numbers of 4 decimal places; DynamoDB takes them as Decimal rather than float
+Rate = marshmallow_dataclass.NewType("Rate", float, marshmallow.fields.Decimal, places=4)
 
 
 @marshmallow_dataclass.dataclass
 class CovidStat:
-    """class to store a COVID-19 Statistic"""
+    """class to store a COVID-19 Statistic, with the daily counts and rates derived from its cumulative counts"""
 
     table_name = "CovidStats"
+    key_fields = ("date",)
 
     idx: int
     cases: int
     date: marshmallow_dataclass.NewType("date", str, marshmallow.fields.Date)
     deaths: int
     recovered: int
+    new_cases: int = None
+    new_deaths: int = None
+    new_cases_avg7: Rate = None
+    new_cases_avg14: Rate = None
+    new_deaths_avg7: Rate = None
+    new_deaths_avg14: Rate = None
+    growth_rate: Rate = None
 
     def __init__(self, idx):
         """
@@ -30,7 +42,14 @@ class CovidStat:
             "date": self.date,
             "cases": self.cases,
             "deaths": self.deaths,
-            "recovered": self.recovered
+            "recovered": self.recovered,
+            "new_cases": self.new_cases,
+            "new_deaths": self.new_deaths,
+            "new_cases_avg7": self.new_cases_avg7,
+            "new_cases_avg14": self.new_cases_avg14,
+            "new_deaths_avg7": self.new_deaths_avg7,
+            "new_deaths_avg14": self.new_deaths_avg14,
+            "growth_rate": self.growth_rate
         }
 
     def to_string(self):
@@ -46,6 +65,537 @@ class CovidStat:
                f"]"
 
 
+class CovidStatBatch:
+    """class to store many COVID-19 Statistics as columns"""
+
+    table_name = CovidStat.table_name
+    counts = ("cases", "deaths", "recovered", "new_cases", "new_deaths")
+    labels = ()
+    rates = ("new_cases_avg7", "new_cases_avg14", "new_deaths_avg7", "new_deaths_avg14", "growth_rate")
+
+    def __init__(self, idx, date=None, cases=None, deaths=None, recovered=None, derived=None):
+        """
+        initializes a CovidStatBatch instance
+        :param idx: the idx of each statistic
+        :param date: the date of each statistic, or None if unknown
+        :param cases: the cases of each statistic, or None if unknown
+        :param deaths: the deaths of each statistic, or None if unknown
+        :param recovered: the recovered of each statistic, or None if unknown
+        :param derived: a dict of the new counts and rates of each statistic, missing names are unknown
+        """
+        self.idx = np.asarray(idx, dtype=np.int64)
+        self.date = np.full(len(self.idx), np.datetime64("NaT"), dtype="datetime64[D]") if date is None \
+            else np.asarray(date, dtype="datetime64[D]")
+
+        derived = derived or dict()
+
+        # missing counts are stored as 0 and flagged in the matching mask; a mask of None has no missing counts
+        self.masks = dict()
+        for name, values in zip(self.counts, (cases, deaths, recovered) + tuple(map(derived.get, self.counts[3:]))):
+            values, self.masks[name] = nullable(values, len(self.idx))
+            setattr(self, name, values)
+
+        # missing rates are stored as NaN
+        for name in self.rates:
+            values = derived.get(name)
+            setattr(self, name, np.full(len(self.idx), np.nan) if values is None
+                    else np.asarray(values, dtype=np.float64))
+
+    def __getitem__(self, key):
+        """
+        :param key: a position, or a slice, mask, or positions to select
+        :return: a CovidStatView for a position, otherwise a CovidStatBatch of the selected statistics
+        """
+        if isinstance(key, (int, np.integer)):
+            if not -len(self) <= key < len(self):
+                raise IndexError(f"CovidStatBatch index out of range: {key}")
+
+            return CovidStatView(self, int(key) % len(self))
+
+        batch = type(self).__new__(type(self))
+        batch.idx = self.idx[key]
+        batch.date = self.date[key]
+        batch.masks = {name: None if mask is None else mask[key] for name, mask in self.masks.items()}
+        for name in self.counts + self.labels + self.rates:
+            setattr(batch, name, getattr(self, name)[key])
+
+        return batch
+
+    def __iter__(self):
+        """
+        :return: a CovidStatView for each statistic
+        """
+        return (CovidStatView(self, i) for i in range(len(self)))
+
+    def __len__(self):
+        """
+        :return: the number of statistics
+        """
+        return len(self.idx)
+
+    def column(self, name):
+        """
+        :param name: the name of the count to provide
+        :return: the values of the count as a list, with None where missing
+        """
+        values = getattr(self, name)
+        mask = self.masks[name]
+        if mask is None:
+            return values.tolist()
+
+        values = values.astype(object)
+        values[mask] = None
+        return values.tolist()
+
+    def rate(self, name):
+        """
+        :param name: the name of the rate to provide
+        :return: the values of the rate as a list, with None where missing
+        """
+        values = getattr(self, name)
+        missing = ~np.isfinite(values)
+        if not missing.any():
+            return values.tolist()
+
+        values = values.astype(object)
+        values[missing] = None
+        return values.tolist()
+
+    def to_items(self):
+        """
+        :return: this CovidStatBatch instance as DynamoDB items
+        """
+        columns = {
+            "idx": [{"N": i} for i in self.idx.astype(str).tolist()],
+            "date": [{"S": i} if i != "NaT" else {"NULL": True} for i in np.datetime_as_string(self.date).tolist()]
+        }
+
+        for name in self.labels:
+            columns[name] = [{"NULL": True} if i is None else {"S": i} for i in getattr(self, name).tolist()]
+
+        for name in self.counts:
+            columns[name] = [{"NULL": True} if i is None else {"N": str(i)} for i in self.column(name)]
+
+        for name in self.rates:
+            columns[name] = [{"NULL": True} if i is None else {"N": f"{i:.4f}"} for i in self.rate(name)]
+
+        return [dict(zip(columns, i)) for i in zip(*columns.values())]
+
+    def to_json(self):
+        """
+        :return: this CovidStatBatch instance as JSON
+        """
+        names = ("idx", "date") + self.labels + self.counts + self.rates
+        return [
+            dict(zip(names, row))
+            for row in zip(
+                self.idx.tolist(), self.dates(), *(getattr(self, n).tolist() for n in self.labels),
+                *map(self.column, self.counts), *map(self.rate, self.rates)
+            )
+        ]
+
+    def to_stats(self):
+        """
+        :return: this CovidStatBatch instance as CovidStat instances
+        """
+        stats = list()
+        for record in self.to_json():
+            cs = CovidStat(record.pop("idx"))
+            for name, value in record.items():
+                setattr(cs, name, value)
+
+            stats.append(cs)
+
+        return stats
+
+    def dates(self):
+        """
+        :return: the dates as a list of datetime, with None where missing
+        """
+        return self.date.astype("datetime64[us]").tolist()
+
+    def to_string(self):
+        """
+        :return: this CovidStatBatch instance as a String
+        """
+        return f"CovidStatBatch[size: {len(self)}]"
+
+
+class CovidStatView(CovidStat):
+    """class to view a single statistic of a CovidStatBatch as a CovidStat"""
+
+    def __init__(self, batch, position):
+        """
+        initializes a CovidStatView instance
+        :param batch: the CovidStatBatch to view
+        :param position: the position of the statistic in the batch
+        """
+        self.batch = batch
+        self.position = position
+
+    @property
+    def idx(self):
+        """
+        :return: the idx of the viewed statistic
+        """
+        return int(self.batch.idx[self.position])
+
+    @property
+    def date(self):
+        """
+        :return: the date of the viewed statistic
+        """
+        return self.batch.date[self.position].astype("datetime64[us]").item()
+
+    @property
+    def cases(self):
+        """
+        :return: the cases of the viewed statistic
+        """
+        return self.count("cases")
+
+    @property
+    def deaths(self):
+        """
+        :return: the deaths of the viewed statistic
+        """
+        return self.count("deaths")
+
+    @property
+    def recovered(self):
+        """
+        :return: the recovered of the viewed statistic
+        """
+        return self.count("recovered")
+
+    @property
+    def new_cases(self):
+        """
+        :return: the new cases of the viewed statistic
+        """
+        return self.count("new_cases")
+
+    @property
+    def new_deaths(self):
+        """
+        :return: the new deaths of the viewed statistic
+        """
+        return self.count("new_deaths")
+
+    @property
+    def new_cases_avg7(self):
+        """
+        :return: the 7 day average of the new cases of the viewed statistic
+        """
+        return self.rate("new_cases_avg7")
+
+    @property
+    def new_cases_avg14(self):
+        """
+        :return: the 14 day average of the new cases of the viewed statistic
+        """
+        return self.rate("new_cases_avg14")
+
+    @property
+    def new_deaths_avg7(self):
+        """
+        :return: the 7 day average of the new deaths of the viewed statistic
+        """
+        return self.rate("new_deaths_avg7")
+
+    @property
+    def new_deaths_avg14(self):
+        """
+        :return: the 14 day average of the new deaths of the viewed statistic
+        """
+        return self.rate("new_deaths_avg14")
+
+    @property
+    def growth_rate(self):
+        """
+        :return: the growth rate of the viewed statistic
+        """
+        return self.rate("growth_rate")
+
+    def count(self, name):
+        """
+        :param name: the name of the count to provide
+        :return: the value of the count, or None if missing
+        """
+        mask = self.batch.masks[name]
+        if mask is not None and mask[self.position]:
+            return None
+
+        return int(getattr(self.batch, name)[self.position])
+
+    def rate(self, name):
+        """
+        :param name: the name of the rate to provide
+        :return: the value of the rate, or None if missing
+        """
+        value = float(getattr(self.batch, name)[self.position])
+        return value if np.isfinite(value) else None
+
+
+@marshmallow_dataclass.dataclass
+class CountyCovidStat:
+    """class to store a COVID-19 Statistic of a county, or of a state or the nation rolled up from its counties"""
+
+    table_name = "CountyCovidStats"
+    key_fields = ("fips", "date")
+
+    idx: int
+    cases: int
+    county: str
+    date: marshmallow_dataclass.NewType("date", str, marshmallow.fields.Date)
+    deaths: int
+    fips: str
+    state: str
+
+    def __init__(self, idx):
+        """
+        initializes a CountyCovidStat instance
+        :param idx: the idx to set
+        """
+        self.idx = idx
+
+    def to_json(self):
+        """
+        :return: this CountyCovidStat instance as JSON
+        """
+        return {
+            "idx": self.idx,
+            "date": self.date,
+            "fips": self.fips,
+            "county": self.county,
+            "state": self.state,
+            "cases": self.cases,
+            "deaths": self.deaths
+        }
+
+    def to_string(self):
+        """
+        :return: this CountyCovidStat instance as a String
+        """
+        return f"CountyCovidStat[" \
+               f"idx: {self.idx}, " \
+               f"date: {self.date}, " \
+               f"fips: {self.fips}, " \
+               f"county: {self.county}, " \
+               f"state: {self.state}, " \
+               f"cases: {self.cases}, " \
+               f"deaths: {self.deaths}" \
+               f"]"
+
+
+class CountyCovidStatBatch(CovidStatBatch):
+    """class to store many county COVID-19 Statistics as columns, keyed by fips and date"""
+
+    table_name = CountyCovidStat.table_name
+    counts = ("cases", "deaths")
+    labels = ("fips", "county", "state")
+    rates = ()
+
+    def __init__(self, idx, date, fips, county=None, state=None, cases=None, deaths=None):
+        """
+        initializes a CountyCovidStatBatch instance
+        :param idx: the idx of each statistic
+        :param date: the date of each statistic
+        :param fips: the fips of each statistic; with the date it is the key
+        :param county: the county of each statistic, or None if not a county
+        :param state: the state of each statistic, or None if not a county or state
+        :param cases: the cases of each statistic, or None if unknown
+        :param deaths: the deaths of each statistic, or None if unknown
+        """
+        self.idx = np.asarray(idx, dtype=np.int64)
+        self.date = np.asarray(date, dtype="datetime64[D]")
+
+        # labels are stored as objects, with None where missing
+        for name, values in zip(self.labels, (fips, county, state)):
+            setattr(self, name, np.full(len(self.idx), None, dtype=object) if values is None
+                    else np.asarray(values, dtype=object))
+
+        self.masks = dict()
+        for name, values in zip(self.counts, (cases, deaths)):
+            values, self.masks[name] = nullable(values, len(self.idx))
+            setattr(self, name, values)
+
+    def __getitem__(self, key):
+        """
+        :param key: a position, or a slice, mask, or positions to select
+        :return: a CountyCovidStat for a position, otherwise a CountyCovidStatBatch of the selected statistics
+        """
+        if isinstance(key, (int, np.integer)):
+            if not -len(self) <= key < len(self):
+                raise IndexError(f"CountyCovidStatBatch index out of range: {key}")
+
+            return self[[key]].to_stats()[0]
+
+        return super().__getitem__(key)
+
+    def __iter__(self):
+        """
+        :return: a CountyCovidStat for each statistic
+        """
+        return iter(self.to_stats())
+
+    def to_json(self):
+        """
+        :return: this CountyCovidStatBatch instance as JSON
+        """
+        return [
+            {"idx": i, "date": d, "fips": f, "county": c, "state": s, "cases": ca, "deaths": de}
+            for i, d, f, c, s, ca, de in zip(
+                self.idx.tolist(), self.dates(), *(getattr(self, n).tolist() for n in self.labels),
+                *map(self.column, self.counts)
+            )
+        ]
+
+    def to_stats(self):
+        """
+        :return: this CountyCovidStatBatch instance as CountyCovidStat instances
+        """
+        stats = list()
+        for record in self.to_json():
+            cs = CountyCovidStat(record.pop("idx"))
+            for name, value in record.items():
+                setattr(cs, name, value)
+
+            stats.append(cs)
+
+        return stats
+
+    def to_string(self):
+        """
+        :return: this CountyCovidStatBatch instance as a String
+        """
+        return f"CountyCovidStatBatch[size: {len(self)}]"
+
+
+@marshmallow_dataclass.dataclass
+class CountryCovidStat:
+    """class to store a COVID-19 Statistic of a country, with the daily counts and rates derived from its cumulative
+    counts"""
+
+    table_name = "CountryCovidStats"
+    key_fields = ("country", "date")
+
+    idx: int
+    cases: int
+    country: str
+    date: marshmallow_dataclass.NewType("date", str, marshmallow.fields.Date)
+    deaths: int
+    recovered: int
+    new_cases: int = None
+    new_deaths: int = None
+    new_cases_avg7: Rate = None
+    new_cases_avg14: Rate = None
+    new_deaths_avg7: Rate = None
+    new_deaths_avg14: Rate = None
+    growth_rate: Rate = None
+
+    def __init__(self, idx):
+        """
+        initializes a CountryCovidStat instance
+        :param idx: the idx to set
+        """
+        self.idx = idx
+
+    def to_json(self):
+        """
+        :return: this CountryCovidStat instance as JSON
+        """
+        return {
+            "idx": self.idx,
+            "date": self.date,
+            "country": self.country,
+            "cases": self.cases,
+            "deaths": self.deaths,
+            "recovered": self.recovered,
+            "new_cases": self.new_cases,
+            "new_deaths": self.new_deaths,
+            "new_cases_avg7": self.new_cases_avg7,
+            "new_cases_avg14": self.new_cases_avg14,
+            "new_deaths_avg7": self.new_deaths_avg7,
+            "new_deaths_avg14": self.new_deaths_avg14,
+            "growth_rate": self.growth_rate
+        }
+
+    def to_string(self):
+        """
+        :return: this CountryCovidStat instance as a String
+        """
+        return f"CountryCovidStat[" \
+               f"idx: {self.idx}, " \
+               f"date: {self.date}, " \
+               f"country: {self.country}, " \
+               f"cases: {self.cases}, " \
+               f"deaths: {self.deaths}, " \
+               f"recovered: {self.recovered}" \
+               f"]"
+
+
+class CountryCovidStatBatch(CovidStatBatch):
+    """class to store many country COVID-19 Statistics as columns, keyed by country and date"""
+
+    table_name = CountryCovidStat.table_name
+    labels = ("country",)
+
+    def __init__(self, idx, date, country, cases=None, deaths=None, recovered=None, derived=None):
+        """
+        initializes a CountryCovidStatBatch instance
+        :param idx: the idx of each statistic
+        :param date: the date of each statistic
+        :param country: the country of each statistic, or one country for every statistic; with the date it is the key
+        :param cases: the cases of each statistic, or None if unknown
+        :param deaths: the deaths of each statistic, or None if unknown
+        :param recovered: the recovered of each statistic, or None if unknown
+        :param derived: a dict of the new counts and rates of each statistic, missing names are unknown
+        """
+        super().__init__(idx, date, cases, deaths, recovered, derived)
+        self.country = np.full(len(self.idx), country, dtype=object) if country is None or isinstance(country, str) \
+            else np.asarray(country, dtype=object)
+
+    def __getitem__(self, key):
+        """
+        :param key: a position, or a slice, mask, or positions to select
+        :return: a CountryCovidStat for a position, otherwise a CountryCovidStatBatch of the selected statistics
+        """
+        if isinstance(key, (int, np.integer)):
+            if not -len(self) <= key < len(self):
+                raise IndexError(f"CountryCovidStatBatch index out of range: {key}")
+
+            return self[[key]].to_stats()[0]
+
+        return super().__getitem__(key)
+
+    def __iter__(self):
+        """
+        :return: a CountryCovidStat for each statistic
+        """
+        return iter(self.to_stats())
+
+    def to_stats(self):
+        """
+        :return: this CountryCovidStatBatch instance as CountryCovidStat instances
+        """
+        stats = list()
+        for record in self.to_json():
+            cs = CountryCovidStat(record.pop("idx"))
+            for name, value in record.items():
+                setattr(cs, name, value)
+
+            stats.append(cs)
+
+        return stats
+
+    def to_string(self):
+        """
+        :return: this CountryCovidStatBatch instance as a String
+        """
+        return f"CountryCovidStatBatch[size: {len(self)}]"
+
+
 class Dataset:
     """class to track key information for a single set of data"""
 
@@ -53,11 +603,42 @@ class Dataset:
         """initializes a Dataset instance"""
 
         self.name = name
+        self.chunksize = None
+        self.columns = None
         self.df = None
+        self.filter_key = None
+        self.filter_val = None
         self.headers_all = None
         self.headers_key = None
         self.match_field = None
+        self.memory_limit = None
+        self.modified = True
         self.source_url = None
+        self.timeout = None
+
+
+def nullable(values, size):
+    """
+    converts values into int64 values and a mask of the missing values
+    :param values: the values to convert, or None if all are missing
+    :param size: the number of values
+    :return: the int64 values and the mask, or None for the mask if no values are missing, as a tuple
+    """
+
+    if values is None:
+        return np.zeros(size, dtype=np.int64), np.ones(size, dtype=bool)
+
+    values = np.asarray(values)
+    if values.dtype.kind in "iub":
+        return values.astype(np.int64, copy=False), None
+
+    if values.dtype.kind == "f":
+        mask = np.isnan(values)
 
+    else:
+        mask = np.fromiter((v is None or v != v for v in values), dtype=bool, count=len(values))
 
+    if not mask.any():
+        return values.astype(np.int64), None
 
+    return np.where(mask, 0, values).astype(np.int64), mask
@@ -0,0 +1,59 @@
+import threading
+
+from os import environ
+
+
+# clients are created on first use and reused by warm invocations
+cache = dict()
+lock = threading.Lock()
+session = None
+
+max_pool_connections = int(environ.get("AWS_MAX_POOL_CONNECTIONS", "16"))
+
+
+def get_session():
+    """
+    provides the boto3 session shared by every client, importing boto3 on first use
+    :return: the boto3 session
+    """
+
+    global session
+
+    with lock:
+        if session is None:
+            import boto3
+            session = boto3.session.Session()
+
+        return session
+
+
+def client(name):
+    """
+    provides the client of an AWS service, creating it on first use
+    :param name: the name of the service
+    :return: the boto3 client
+    """
+
+    if name not in cache:
+        from botocore.config import Config
+
+        config = Config(max_pool_connections=max_pool_connections, retries={"max_attempts": 5, "mode": "standard"})
+        created = get_session().client(name, config=config)
+
+        with lock:
+            cache.setdefault(name, created)
+
+    return cache[name]
+
+
+def reset():
+    """
+    forgets every client and the session, so the next use creates them again
+    :return: None
+    """
+
+    global session
+
+    with lock:
+        cache.clear()
+        session = None
@@ -0,0 +1,154 @@
+# -------------------------------
+# internal modules
+import classes
+import clients
+import extract
+import metrics
+
+# -------------------------------
+# external modules
+import os
+import pandas as pd
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from os import environ
+
+# the countries to process; none are processed unless listed
+countries = [c.strip() for c in environ.get("COUNTRIES", "").split(",") if c.strip()]
+print(f"'countries': {countries}")
+
+# the dataset the countries are split from; it is extracted for the merge, so its source is parsed once per run
+country_source = environ.get("COUNTRY_SOURCE", "jh_dataset")
+print(f"'country_source': {country_source}")
+
+# the number of countries transformed and loaded at once, each by its own process
+country_workers = int(environ.get("COUNTRY_WORKERS") or os.cpu_count() or 1)
+print(f"'country_workers': {country_workers}")
+
+# the columns of the source the countries are transformed from
+count_headers = ["Confirmed", "Recovered", "Deaths"]
+
+
+def source_dataset(datasets):
+    """
+    :param datasets: the Dataset instances of the registry
+    :return: the Dataset the countries are split from, or None when no countries are listed or it is not registered
+    """
+
+    if not countries:
+        return None
+
+    dataset = next((d for d in datasets if d.name == country_source), None)
+    if dataset is None or dataset.filter_key is None:
+        print(f"WARN: No '{country_source}' filtered by country in the registry, skipping countries")
+        return None
+
+    return dataset
+
+
+def widen(dataset):
+    """
+    widens the extract of a Dataset filtered to one country to the listed countries, with their counts; the
+    records of every country are then retained by the one parse, within the memory_limit of the Dataset
+    :param dataset: the Dataset to widen, filtered on its country column
+    :return: the headers_key and filter_val the Dataset was extracted with, to narrow it back with
+    """
+
+    original = dataset.headers_key, dataset.filter_val
+    dataset.headers_key = list(dict.fromkeys(list(dataset.headers_key) + count_headers))
+    dataset.filter_val = list(dict.fromkeys([dataset.filter_val] + countries))
+    return original
+
+
+def narrow(dataset, original):
+    """
+    splits a widened extract into the records of each country, leaving the Dataset with the records and columns it
+    would have been extracted with alone
+    :param dataset: the extracted Dataset, as widened by widen
+    :param original: the headers_key and filter_val returned by widen
+    :return: a dict of the records of each listed country, or None if the Dataset was not extracted
+    """
+
+    headers_key, filter_val = original
+    dataset.headers_key, dataset.filter_val = headers_key, filter_val
+
+    if dataset.df is None:
+        return None
+
+    partitions = extract.partition(dataset.df, dataset.filter_key)
+
+    own = partitions.get(filter_val, dataset.df.iloc[:0].drop(columns=dataset.filter_key))
+    dataset.df = own.filter([c for c in headers_key if c != dataset.filter_key])
+    return {country: partitions[country] for country in countries if country in partitions}
+
+
+def load_country(country, df, snapshot, deadline=None):
+    """
+    transforms a country and loads its statistics that are new or changed since the snapshot; run by a worker
+    process, so the country is sent over as its records only and its measures are returned rather than recorded
+    :param country: the country of the records
+    :param df: the records of the country, as split by narrow
+    :param snapshot: the fingerprints of the country from the previous run, as a dict of 'country|date' to fingerprint
+    :param deadline: the time.monotonic() after which no batch is started, or None to write every batch
+    :return: the country, the number of statistics to load, the number of records written, and the fingerprints
+        of the statistics loaded, as a tuple; the fingerprints are empty unless every statistic was loaded
+    """
+
+    import delta
+    import load
+    import transform
+
+    batch = transform.country_batch(df, country)
+    prints = delta.fingerprints(batch)
+    prints.index = f"{country}|" + prints.index
+    changes = delta.changed(prints, snapshot)
+
+    cnt = load.load_batch(classes.CountryCovidStat, batch[changes], publish=False, deadline=deadline)
+    loaded = prints[changes] if cnt == changes.sum() else prints.iloc[:0]
+    return country, int(changes.sum()), cnt, loaded.to_dict()
+
+
+def load_countries(partitions, snapshot, workers=None, deadline=None):
+    """
+    transforms and loads the records of every country in parallel, with a pool of processes; where processes
+    cannot be started, such as in Lambda which has no shared memory for their queues, a pool of threads is used
+    :param partitions: a dict of the records of each country, as split by narrow
+    :param snapshot: the fingerprints of the previous run as a dict of 'country|date' to fingerprint
+    :param workers: the number of countries to process at once, or None to use 'COUNTRY_WORKERS'
+    :param deadline: the time.monotonic() after which no batch is started, or None to write every batch
+    :return: a dict of the number of statistics to load and records written of each country, as a tuple, and the
+        fingerprints of the statistics loaded, as a pandas series indexed by 'country|date'
+    """
+
+    workers = min(workers or country_workers, len(partitions)) or 1
+
+    # each country is only sent its own fingerprints
+    snapshots = {country: dict() for country in partitions}
+    for key, value in snapshot.items():
+        country = key.rpartition("|")[0]
+        if country in snapshots:
+            snapshots[country][key] = value
+
+    try:
+        # a process forked from this one must not reuse its connections, so it creates its own clients
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=clients.reset)
+
+    except (NotImplementedError, OSError) as e:
+        print(f"WARN: Process Pool unavailable, loading Countries with Threads: {e}")
+        executor = ThreadPoolExecutor(max_workers=workers)
+
+    results = dict()
+    loaded = dict()
+    with executor:
+        futures = [
+            executor.submit(load_country, country, df, snapshots[country], deadline)
+            for country, df in partitions.items()
+        ]
+
+        for future in futures:
+            country, total, cnt, prints = future.result()
+            results[country] = (total, cnt)
+            loaded.update(prints)
+            metrics.count("countries.records", cnt)
+
+    return results, pd.Series(loaded, dtype=object)
@@ -0,0 +1,102 @@
+# -------------------------------
+# internal modules
+import clients
+import load
+
+# -------------------------------
+# external modules
+import json
+import numpy as np
+import pandas as pd
+
+from botocore.exceptions import ClientError
+
+
+# each table loaded keeps a snapshot of its own, named after it
+snapshot_suffix = ".fingerprints.json"
+
+
+def fingerprints(batch):
+    """
+    hashes the values of each statistic in a CovidStatBatch
+    :param batch: the CovidStatBatch to hash
+    :return: a pandas series of hex fingerprints indexed by date
+    """
+
+    values = dict()
+    for name in batch.counts:
+        values[name] = getattr(batch, name)
+        values[f"{name}_missing"] = batch.masks[name] if batch.masks[name] is not None else False
+    for name in batch.rates:
+        values[name] = getattr(batch, name)
+
+    hashes = pd.util.hash_pandas_object(pd.DataFrame(values), index=False).to_numpy()
+    return pd.Series(np.char.mod("%016x", hashes), index=np.datetime_as_string(batch.date))
+
+
+def changed(prints, snapshot):
+    """
+    finds the statistics that are new or changed since the snapshot; only the last of a duplicate date is kept
+    :param prints: the fingerprints of the statistics
+    :param snapshot: the fingerprints of the previous run as a dict of date to fingerprint
+    :return: a boolean mask of the statistics to load
+    """
+
+    last = ~prints.index.duplicated(keep="last")
+    previous = prints.index.map(snapshot.get).to_numpy(dtype=object)
+    return last & (previous != prints.to_numpy(dtype=object))
+
+
+def read_snapshot(table_name="CovidStats"):
+    """
+    reads the fingerprints of the previous run from S3
+    :param table_name: the table the statistics were loaded into
+    :return: the fingerprints as a dict of date to fingerprint; empty if there are none
+    """
+
+    if not load.s3_bucket_name:
+        print("WARN: S3 Bucket not initialized, every record will be loaded!")
+        return dict()
+
+    try:
+        response = clients.client("s3").get_object(Bucket=load.s3_bucket_name, Key=snapshot_key(table_name))
+        return json.loads(response["Body"].read())
+
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "NoSuchKey":
+            print(f"ERROR: {str(e)}")
+
+        return dict()
+
+
+def write_snapshot(prints, snapshot, table_name="CovidStats"):
+    """
+    writes the fingerprints of this run to S3, on top of the fingerprints of the previous run
+    :param prints: the fingerprints of the statistics loaded
+    :param snapshot: the fingerprints of the previous run as a dict of date to fingerprint
+    :param table_name: the table the statistics were loaded into
+    :return: None
+    """
+
+    if not load.s3_bucket_name:
+        return
+
+    snapshot = {**snapshot, **prints.to_dict()}
+
+    try:
+        clients.client("s3").put_object(
+            Bucket=load.s3_bucket_name, Key=snapshot_key(table_name), Body=json.dumps(snapshot, separators=(",", ":"))
+        )
+
+    except ClientError as e:
+        print(f"ERROR: {str(e)}")
+
+
+def snapshot_key(table_name="CovidStats"):
+    """
+    :param table_name: the table the statistics were loaded into
+    :return: the S3 key of the fingerprints snapshot of the table
+    """
+
+    name = f"{table_name}{snapshot_suffix}"
+    return f"{load.s3_object_path}/{name}" if load.s3_object_path else name
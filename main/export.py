@@ -0,0 +1,177 @@
+import gzip
+import io
+import json
+import numpy as np
+import tempfile
+
+
+class JsonExport:
+    """class to encode records incrementally into a spooled buffer that is uploaded to S3 without a local file"""
+
+    extensions = {"json": ".json", "ndjson": ".ndjson"}
+
+    def __init__(self, fmt="json", compress=False, spool_size=8 * 1024 * 1024, chunk_size=10000):
+        """
+        initializes a JsonExport instance
+        :param fmt: 'json' for a compact JSON array, or 'ndjson' for one JSON object per line
+        :param compress: True to gzip the encoded records
+        :param spool_size: the bytes to hold in memory before spilling to a temporary file
+        :param chunk_size: the number of records to encode at a time
+        """
+        if fmt not in self.extensions:
+            raise ValueError(f"ERROR: Provided 'fmt': {fmt} must be one of {list(self.extensions)}")
+
+        self.fmt = fmt
+        self.compress = compress
+        self.chunk_size = chunk_size
+        self.count = 0
+        self.encoder = json.JSONEncoder(default=str, sort_keys=True, separators=(",", ":"))
+        self.buffer = tempfile.SpooledTemporaryFile(max_size=spool_size)
+        self.stream = gzip.GzipFile(fileobj=self.buffer, mode="wb") if compress else self.buffer
+
+        if fmt == "json":
+            self.stream.write(b"[")
+
+    def file_name(self, name):
+        """
+        :param name: the name of the export without an extension
+        :return: the name with the extension of the format and compression
+        """
+        return f"{name}{self.extensions[self.fmt]}{'.gz' if self.compress else ''}"
+
+    def write(self, records):
+        """
+        encodes records into the buffer a chunk at a time
+        :param records: the records to encode; a CovidStatBatch is converted in bulk per chunk
+        :return: None
+        """
+        if hasattr(records, "to_json"):
+            for i in range(0, len(records), self.chunk_size):
+                self.write_json(records[i:i + self.chunk_size].to_json())
+
+            return
+
+        chunk = list()
+        for record in records:
+            chunk.append(record.to_json())
+
+            if len(chunk) == self.chunk_size:
+                self.write_json(chunk)
+                chunk = list()
+
+        self.write_json(chunk)
+
+    def write_json(self, rows):
+        """
+        encodes rows of JSON into the buffer
+        :param rows: the rows to encode
+        :return: None
+        """
+        if not rows:
+            return
+
+        encoded = [self.encoder.encode(r) for r in rows]
+
+        if self.fmt == "json":
+            text = ("," if self.count else "") + ",".join(encoded)
+
+        else:
+            text = "\n".join(encoded) + "\n"
+
+        self.stream.write(text.encode("utf-8"))
+        self.count += len(rows)
+
+    def close(self):
+        """
+        finishes the encoding and rewinds the buffer for reading
+        :return: the number of bytes encoded
+        """
+        if self.fmt == "json":
+            self.stream.write(b"]")
+
+        if self.compress:
+            self.stream.close()
+
+        size = self.buffer.tell()
+        self.buffer.seek(0)
+        return size
+
+    def upload(self, s3_client, bucket, key):
+        """
+        finishes the encoding and uploads the buffer, using multipart uploads for large buffers
+        :param s3_client: the S3 client to upload with
+        :param bucket: the bucket to upload to
+        :param key: the key to upload to
+        :return: the number of bytes uploaded
+        """
+        size = self.close()
+        content_type = "application/gzip" if self.compress else \
+            "application/json" if self.fmt == "json" else "application/x-ndjson"
+
+        try:
+            s3_client.upload_fileobj(self.buffer, bucket, key, ExtraArgs={"ContentType": content_type})
+
+        finally:
+            self.buffer.close()
+
+        return size
+
+
+def month_partitions(batch, changed=None):
+    """
+    splits a CovidStatBatch into monthly partitions
+    :param batch: the CovidStatBatch to split
+    :param changed: a boolean mask of the statistics changed by this run, or None to provide every partition
+    :return: the year, month, and CovidStatBatch of each partition holding a changed statistic, as tuples
+    """
+
+    months = batch.date.astype("datetime64[M]")
+    touched = np.unique(months if changed is None else months[changed])
+
+    return [
+        (int(str(m)[:4]), int(str(m)[5:7]), batch[months == m])
+        for m in touched if not np.isnat(m)
+    ]
+
+
+def parquet_bytes(batch):
+    """
+    encodes a CovidStatBatch as Parquet; requires pyarrow
+    :param batch: the CovidStatBatch to encode
+    :return: the Parquet file as bytes
+    """
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    columns = {"idx": pa.array(batch.idx), "date": pa.array(batch.date)}
+    for name in batch.counts:
+        columns[name] = pa.array(getattr(batch, name), mask=batch.masks[name])
+    for name in batch.rates:
+        values = getattr(batch, name)
+        columns[name] = pa.array(values, mask=~np.isfinite(values))
+
+    buffer = io.BytesIO()
+    pq.write_table(pa.table(columns), buffer, compression="snappy")
+    return buffer.getvalue()
+
+
+def manifest(bucket, keys, fmt):
+    """
+    creates a manifest in the format of QuickSightManifest.json listing S3 objects
+    :param bucket: the bucket holding the objects
+    :param keys: the keys of the objects
+    :param fmt: the format of the objects
+    :return: the manifest as a dict
+    """
+
+    return {
+        "fileLocations": [
+            {
+                "URIs": [f"https://{bucket}.s3.amazonaws.com/{k}" for k in keys]
+            }
+        ],
+        "globalUploadSettings": {
+            "format": fmt
+        }
+    }
@@ -1,34 +1,392 @@
+import copy
+import hashlib
+import json
+import metrics
 import pandas as pd
+import time
 
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from os import makedirs, path, remove
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
 
-def extract(url, columns=None, filter_key=None, filter_val=None):
+
+def extract(url, columns=None, filter_key=None, filter_val=None, chunksize=None, memory_limit=None):
     """
     extracts data for COVID-19 Statistics from reputable sources
     :param url: the url to download from
     :param columns: the columns to keep, or None to provide all
     :param filter_key: the column to match on and filter records, or None to not filter
-    :param filter_val: the value the filter_key column should be to retain the records, or None to not filter
-    :return: a pandas dataframe of the downloaded source or None
+    :param filter_val: the value, or list of values, the filter_key column should be to retain the records, or None
+        to not filter
+    :param chunksize: the number of rows to read at a time, or None to read the whole source at once
+    :param memory_limit: the bytes the retained records may use when reading in chunks, or None for no limit
+    :return: a pandas dataframe of the downloaded source or None; the filter_key column is dropped, unless filter_val
+        is a list, which leaves the records of each value to be told apart
     """
 
     try:
         # create dataframe
-        df = pd.read_csv(url)
-        print(f"DEBUG: From Source: {df.shape}")
+        if chunksize is not None:
+            df = read_chunked(url, columns, filter_key, filter_val, chunksize, memory_limit)
+
+        else:
+            df = pd.read_csv(url)
+            if metrics.enabled("DEBUG"):
+                print(f"DEBUG: From Source: {df.shape}")
 
         # filter dataframe columns
         if columns is not None:
             df = df.filter(columns)
-            print(f"DEBUG: Filter Column(s) by {columns}: {df.shape}")
+            if metrics.enabled("DEBUG"):
+                print(f"DEBUG: Filter Column(s) by {columns}: {df.shape}")
 
         # filter dataframe records
         if filter_key is not None and filter_val is not None:
-            df = df[df[filter_key] == filter_val]
-            del df[filter_key]
-            print(f"DEBUG: Filter Records(s) by [{filter_key}=={filter_val}]: {df.shape}")
+            df = df[matches(df[filter_key], filter_val)]
+            if not isinstance(filter_val, (list, tuple, set)):
+                del df[filter_key]
+            if metrics.enabled("DEBUG"):
+                print(f"DEBUG: Filter Records(s) by [{filter_key}=={filter_val}]: {df.shape}")
 
         return df
 
     except ValueError as e:
         print(f"ERROR: {e}")
         return None
+
+
+def read_chunked(url, columns, filter_key, filter_val, chunksize, memory_limit):
+    """
+    reads a source in chunks, only parsing the columns needed and only retaining the matching records
+    :param url: the url to download from
+    :param columns: the columns to keep, or None to provide all
+    :param filter_key: the column to match on and filter records, or None to not filter
+    :param filter_val: the value, or list of values, the filter_key column should be to retain the records, or None
+        to not filter
+    :param chunksize: the number of rows to read at a time
+    :param memory_limit: the bytes the retained records may use, or None for no limit
+    :return: a pandas dataframe of the retained records
+    """
+
+    chunks = list()
+    rows = 0
+    size = 0
+
+    for read, chunk in read_chunks(url, columns, filter_key, filter_val, chunksize):
+        rows += read
+        size += chunk.memory_usage(deep=True).sum()
+        if memory_limit is not None and size > memory_limit:
+            raise ValueError(f"Retained Record(s) exceed the memory limit of {memory_limit} byte(s)")
+
+        chunks.append(chunk)
+
+    df = pd.concat(chunks)
+    if metrics.enabled("DEBUG"):
+        print(f"DEBUG: From Source: {(rows, df.shape[1])}, Retained in Chunks of {chunksize}: {df.shape}")
+    return df
+
+
+def read_chunks(url, columns, filter_key, filter_val, chunksize):
+    """
+    reads a source in chunks, only parsing the columns needed and only yielding the matching records; a source
+    too large to retain is processed one chunk at a time
+    :param url: the url to download from
+    :param columns: the columns to keep, or None to provide all
+    :param filter_key: the column to match on and filter records, or None to not filter
+    :param filter_val: the value, or list of values, the filter_key column should be to retain the records, or None
+        to not filter
+    :param chunksize: the number of rows to read at a time
+    :return: a generator of the number of rows read and the dataframe of the matching records, for each chunk
+    """
+
+    filtered = filter_key is not None and filter_val is not None
+
+    # only parse the columns that are kept or filtered on
+    usecols = None
+    if columns is not None:
+        wanted = set(columns) | ({filter_key} if filtered else set())
+        usecols = wanted.__contains__
+
+    for chunk in pd.read_csv(url, usecols=usecols, chunksize=chunksize):
+        rows = len(chunk)
+
+        if filtered:
+            chunk = chunk[matches(chunk[filter_key], filter_val)]
+
+        yield rows, chunk
+
+
+def matches(column, filter_val):
+    """
+    :param column: the Series to match
+    :param filter_val: the value, or list of values, to match
+    :return: a boolean Series of the matching records
+    """
+
+    if isinstance(filter_val, (list, tuple, set)):
+        return column.isin(filter_val)
+
+    return column == filter_val
+
+
+def partition(df, key):
+    """
+    splits a dataframe into a dataframe per value of a column, in a single pass over the records
+    :param df: the dataframe to split
+    :param key: the column to split on; records where it is missing are dropped
+    :return: a dict of the dataframe of each value, without the key column, in order of first appearance
+    """
+
+    return {name: part.drop(columns=key) for name, part in df.groupby(key, sort=False)}
+
+
+def extract_all(datasets, cache_dir=None, timeout=None):
+    """
+    extracts multiple Datasets concurrently; a Dataset that fails or runs past its timeout gets a df of None
+    :param datasets: the Dataset instances to extract; their df and modified fields are set
+    :param cache_dir: the directory to cache sources in, or None to always download
+    :param timeout: the seconds each Dataset without a timeout of its own may take, or None to wait indefinitely
+    :return: the pandas dataframes of the downloaded sources or None, in the order of the datasets
+    """
+
+    start = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=max(1, len(datasets)))
+
+    futures = [executor.submit(extract_copy, d, cache_dir, d.timeout or timeout) for d in datasets]
+
+    for dataset, future in zip(datasets, futures):
+        dataset_timeout = dataset.timeout or timeout
+        remaining = None if dataset_timeout is None else max(0.0, start + dataset_timeout - time.monotonic())
+
+        try:
+            extracted = future.result(timeout=remaining)
+            dataset.df = extracted.df
+            dataset.modified = extracted.modified
+
+        except TimeoutError:
+            print(f"ERROR: {dataset.name} was not extracted within {dataset_timeout}s")
+            dataset.df = None
+            dataset.modified = True
+
+        except Exception as e:
+            print(f"ERROR: {dataset.name} could not be extracted: {e}")
+            dataset.df = None
+            dataset.modified = True
+
+    executor.shutdown(wait=False)
+    return [d.df for d in datasets]
+
+
+def extract_copy(dataset, cache_dir=None, timeout=None):
+    """
+    extracts a copy of a Dataset, so a source that runs past its timeout cannot overwrite the Dataset afterwards
+    :param dataset: the Dataset instance to copy and extract
+    :param cache_dir: the directory to cache sources in, or None to always download
+    :param timeout: the seconds to wait on the source connection, or None to wait indefinitely
+    :return: the extracted copy of the Dataset
+    """
+
+    dataset = copy.copy(dataset)
+
+    with metrics.stage(f"extract.{dataset.name}") as stage:
+        extract_dataset(dataset, cache_dir, timeout)
+        stage["rows"] = len(dataset.df) if dataset.df is not None else 0
+
+    return dataset
+
+
+def extract_dataset(dataset, cache_dir=None, timeout=None):
+    """
+    extracts the data for a Dataset, reusing the cached dataframe when the source has not been modified
+    :param dataset: the Dataset instance to extract; its df and modified fields are set
+    :param cache_dir: the directory to cache sources in, or None to always download
+    :param timeout: the seconds to wait on the source connection, or None to wait indefinitely
+    :return: a pandas dataframe of the downloaded source or None
+    """
+
+    url = dataset.source_url
+    dataset.modified = True
+
+    # local sources are always read in full
+    if not url.startswith(("http://", "https://")):
+        dataset.df = extract(url, *extract_args(dataset))
+        return dataset.df
+
+    # remote sources are always fetched with the timeout, so a stalled source frees its thread and connection;
+    # with the cache disabled they are read in full without validators
+    meta_file, frame_file = cache_files(cache_dir, url) if cache_dir is not None else (None, None)
+    signature = [dataset.headers_key, dataset.filter_key, dataset.filter_val]
+    meta = read_cache_meta(meta_file, frame_file, signature) if cache_dir is not None else None
+
+    try:
+        with urlopen(Request(url, headers=validator_headers(meta)), timeout=timeout) as response:
+            dataset.df = extract(response, *extract_args(dataset))
+            metrics.count(f"extract.{dataset.name}.bytes", int(response.headers.get("Content-Length") or 0))
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+
+    except HTTPError as e:
+        if e.code == 304 and meta is not None:
+            print(f"INFO: Not Modified: {url}")
+            metrics.count(f"extract.{dataset.name}.not_modified")
+            dataset.df = pd.read_pickle(frame_file)
+            dataset.modified = False
+            return dataset.df
+
+        print(f"ERROR: {e}")
+        dataset.df = None
+        return None
+
+    except OSError as e:
+        # URLError, and socket timeouts while reading
+        print(f"ERROR: {e}")
+        dataset.df = None
+        return None
+
+    # cache the parsed dataframe with its validators
+    if cache_dir is not None and dataset.df is not None and (etag or last_modified):
+        makedirs(cache_dir, exist_ok=True)
+        dataset.df.to_pickle(frame_file)
+
+        with open(meta_file, "w") as f:
+            json.dump({"etag": etag, "last_modified": last_modified, "signature": signature, "url": url}, f)
+
+    return dataset.df
+
+
+def open_source(dataset, cache_dir=None, timeout=None):
+    """
+    opens the source of a Dataset too large to retain, sending the validators of the last run that read it in full;
+    the validators are only recorded by write_validators once it has been, so an unfinished run is repeated
+    :param dataset: the Dataset instance to open; its modified field is set
+    :param cache_dir: the directory to keep the validators in, or None to always download
+    :param timeout: the seconds to wait on the source connection, or None to wait indefinitely
+    :return: the response or local path to read the source from and its validators, or None for both when the
+        source has not been modified; a failed request raises its OSError
+    """
+
+    url = dataset.source_url
+    dataset.modified = True
+
+    if not url.startswith(("http://", "https://")):
+        return url, None
+
+    # remote sources are always opened with the timeout; with the cache disabled they have no validators to send
+    signature = [dataset.headers_key, dataset.filter_key, dataset.filter_val]
+    meta = read_cache_meta(cache_files(cache_dir, url)[0], None, signature) if cache_dir is not None else None
+
+    try:
+        response = urlopen(Request(url, headers=validator_headers(meta)), timeout=timeout)
+
+    except HTTPError as e:
+        if e.code == 304 and meta is not None:
+            print(f"INFO: Not Modified: {url}")
+            metrics.count(f"extract.{dataset.name}.not_modified")
+            dataset.modified = False
+            return None, None
+
+        raise e
+
+    validators = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "signature": signature,
+        "url": url
+    }
+    return response, validators
+
+
+def write_validators(cache_dir, validators):
+    """
+    records the validators of a source read in full, so the next run only reads it again once it is modified
+    :param cache_dir: the directory to keep the validators in, or None to not keep them
+    :param validators: the validators returned by open_source, or None if it has none
+    :return: None
+    """
+
+    if cache_dir is None or validators is None or not (validators["etag"] or validators["last_modified"]):
+        return
+
+    makedirs(cache_dir, exist_ok=True)
+    meta_file, _ = cache_files(cache_dir, validators["url"])
+    with open(meta_file, "w") as f:
+        json.dump(validators, f)
+
+
+def forget(datasets, cache_dir=None):
+    """
+    removes the cached validators of the datasets, so the next run reads their sources again as modified
+    :param datasets: the Dataset instances to forget
+    :param cache_dir: the directory sources are cached in, or None if they are not cached
+    :return: None
+    """
+
+    if cache_dir is None:
+        return
+
+    for dataset in datasets:
+        meta_file, _ = cache_files(cache_dir, dataset.source_url)
+        if path.isfile(meta_file):
+            remove(meta_file)
+
+
+def validator_headers(meta):
+    """
+    :param meta: the cached metadata of a source, or None
+    :return: the conditional request headers sending its validators, if any
+    """
+
+    headers = dict()
+    if meta is not None and meta["etag"]:
+        headers["If-None-Match"] = meta["etag"]
+
+    if meta is not None and meta["last_modified"]:
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    return headers
+
+
+def extract_args(dataset):
+    """
+    finds the arguments to extract a Dataset with
+    :param dataset: the Dataset instance to extract
+    :return: the columns, filter_key, filter_val, chunksize, and memory_limit as a tuple
+    """
+
+    return dataset.headers_key, dataset.filter_key, dataset.filter_val, dataset.chunksize, dataset.memory_limit
+
+
+def cache_files(cache_dir, url):
+    """
+    finds the cache files for a source url
+    :param cache_dir: the directory sources are cached in
+    :param url: the url of the source
+    :return: the metadata file and dataframe file paths as a tuple
+    """
+
+    name = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return path.join(cache_dir, f"{name}.json"), path.join(cache_dir, f"{name}.pkl")
+
+
+def read_cache_meta(meta_file, frame_file, signature):
+    """
+    reads the cached metadata for a source
+    :param meta_file: the metadata file to read
+    :param frame_file: the dataframe file that must accompany the metadata, or None for a source read in chunks
+    :param signature: the columns and filters the cached dataframe must have been extracted with
+    :return: the cached metadata or None if nothing usable is cached
+    """
+
+    if not path.isfile(meta_file) or (frame_file is not None and not path.isfile(frame_file)):
+        return None
+
+    try:
+        with open(meta_file) as f:
+            meta = json.load(f)
+
+    except ValueError as e:
+        print(f"WARN: {e}")
+        return None
+
+    return meta if meta.get("signature") == signature else None
@@ -1,11 +1,17 @@
 
-import boto3
+import capacity
+import clients
+import export
 import json
+import metrics
+import random
+import serializers
+import throttle
+import time
 
-from boto3.dynamodb.types import TypeSerializer
 from botocore.exceptions import ClientError
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from os import environ
-from pathlib import Path
 
 # global initialization
 aws_profile = environ.get("AWS_PROFILE")
@@ -14,51 +20,150 @@ print(f"'aws_profile': {aws_profile}")
 # s3 initialization
 s3_bucket_name = environ.get("S3_BUCKET_NAME")
 s3_object_path = environ.get("S3_OBJECT_PATH")
-s3_resource = boto3.resource("s3") if s3_bucket_name else None
-s3_meta_client = s3_resource.meta.client if s3_resource else None
+s3_object_format = environ.get("S3_OBJECT_FORMAT", "json")
+s3_object_gzip = environ.get("S3_OBJECT_GZIP", "").lower() == "true"
+s3_object_parquet = environ.get("S3_OBJECT_PARQUET", "").lower() == "true"
 print(f"'s3_bucket_name': {s3_bucket_name}")
 print(f"'s3_object_path': {s3_object_path}")
+print(f"'s3_object_format': {s3_object_format}")
+print(f"'s3_object_gzip': {s3_object_gzip}")
+print(f"'s3_object_parquet': {s3_object_parquet}")
 
 # sns initialization
 sns_topic_arn = environ.get("SNS_TOPIC_ARN")
-sns_resource = boto3.resource('sns') if sns_topic_arn else None
-sns_topic = sns_resource.Topic(sns_topic_arn) if sns_resource else None
 print(f"'sns_topic_arn': {sns_topic_arn}")
 
 # dynamodb initialization
-dynamodb_client = boto3.client("dynamodb")
-serializer = TypeSerializer()
 
+# batch_write_item accepts at most 25 items per request
+batch_size = 25
 
-def load_json(records):
+# records are serialized a chunk at a time while the batches of the previous chunk are written
+serialize_size = batch_size * 40
+batch_attempts = 8
+backoff_base = 0.05
+backoff_cap = 2.0
+
+# dynamodb writers; the write rate defaults to the provisioned capacity of the table
+dynamodb_workers = int(environ.get("DYNAMODB_WORKERS", "1"))
+dynamodb_write_rate = float(environ["DYNAMODB_WRITE_RATE"]) if environ.get("DYNAMODB_WRITE_RATE") else None
+print(f"'dynamodb_workers': {dynamodb_workers}")
+print(f"'dynamodb_write_rate': {dynamodb_write_rate}")
+
+# dynamodb layout; 'daily' writes an item per day to CovidStats, 'monthly' an item per month to CovidStatsMonthly
+dynamodb_layout = environ.get("DYNAMODB_LAYOUT", "daily")
+print(f"'dynamodb_layout': {dynamodb_layout}")
+
+
+def load_json(records, fmt=None, compress=None):
     """
-    converts the records provided into json and writes them to S3
+    converts the records provided into json and streams them to S3
     :param records: the records to write to S3
-    :return: None
+    :param fmt: 'json' or 'ndjson', or None to use 'S3_OBJECT_FORMAT'
+    :param compress: True to gzip the records, or None to use 'S3_OBJECT_GZIP'
+    :return: the number of bytes uploaded, or None if nothing was uploaded
     """
 
-    if not s3_meta_client:
+    if not s3_bucket_name:
         print("WARN: S3 Bucket not initialized!")
         print("WARN: Ensure 'S3_BUCKET_NAME' is set as an Environment Variable")
-        return
+        return None
 
-    # convert records to json
-    json_rec = [i.to_json() for i in records]
-    json_bin = json.dumps(json_rec, default=str, indent=4, sort_keys=True)
+    with metrics.stage("s3.json") as stage:
+        # convert records to json in a spooled buffer
+        json_exp = export.JsonExport(fmt or s3_object_format, s3_object_gzip if compress is None else compress)
+        json_exp.write(records)
 
-    # write json to a file
-    src_file = f"{Path.cwd()}/main/resources/CovidStats.json"
-    dst_path = f"{s3_object_path}/" if s3_object_path else ""
-    dst_file = f"{dst_path}CovidStats.json"
+        dst_path = f"{s3_object_path}/" if s3_object_path else ""
+        dst_file = f"{dst_path}{json_exp.file_name('CovidStats')}"
+
+        try:
+            with capacity.request("s3.upload"):
+                size = json_exp.upload(clients.client("s3"), s3_bucket_name, dst_file)
+
+            stage.update(rows=json_exp.count, bytes=size)
+            print(f"INFO: Uploaded {json_exp.count} Record(s) as {size} byte(s) to s3://{s3_bucket_name}/{dst_file}")
+            return size
 
-    with open(src_file, "w") as f:
-        f.write(json_bin)
+        except ClientError as e:
+            print(f"ERROR: {str(e)}")
+            return None
+
+
+def load_parquet(batch, changed=None):
+    """
+    writes a CovidStatBatch to S3 as Parquet partitioned by year and month, then regenerates the manifest
+    :param batch: the CovidStatBatch holding every statistic
+    :param changed: a boolean mask of the statistics changed by this run, or None to rewrite every partition
+    :return: the keys of the partitions written, or None if nothing was written
+    """
+
+    if not s3_bucket_name:
+        print("WARN: S3 Bucket not initialized!")
+        print("WARN: Ensure 'S3_BUCKET_NAME' is set as an Environment Variable")
+        return None
+
+    dst_path = f"{s3_object_path}/" if s3_object_path else ""
+    keys = list()
 
     try:
-        s3_meta_client.upload_file(src_file, s3_bucket_name, dst_file)
+        # the months missing from the bucket are written with the changed months, as the delta snapshot of the
+        # statistics does not record the Parquet export, such as once it is enabled or after a failed upload
+        existing = parquet_keys(f"{dst_path}CovidStats/")
+        touched = None if changed is None else {(y, m) for y, m, _ in export.month_partitions(batch, changed)}
+
+        with metrics.stage("s3.parquet") as stage:
+            for year, month, part in export.month_partitions(batch):
+                key = f"{dst_path}CovidStats/year={year}/month={month:02d}/CovidStats.parquet"
+                if key in existing and touched is not None and (year, month) not in touched:
+                    continue
+
+                body = export.parquet_bytes(part)
+                try:
+                    with capacity.request("s3.put_object"):
+                        clients.client("s3").put_object(Bucket=s3_bucket_name, Key=key, Body=body)
+
+                except ClientError as e:
+                    print(f"ERROR: {str(e)}")
+                    continue
+
+                existing.add(key)
+                keys.append(key)
+                stage.update(rows=stage.get("rows", 0) + len(part), bytes=stage.get("bytes", 0) + len(body))
+
+        # list every partition in the bucket in the manifest; a month that failed is left out until it is written
+        clients.client("s3").put_object(
+            Bucket=s3_bucket_name,
+            Key=f"{dst_path}CovidStats.parquet.manifest.json",
+            Body=json.dumps(export.manifest(s3_bucket_name, sorted(existing), "PARQUET"), indent=4)
+        )
+
+    except ImportError as e:
+        print(f"ERROR: Parquet export requires pyarrow: {str(e)}")
+        return None
 
     except ClientError as e:
         print(f"ERROR: {str(e)}")
+        return None
+
+    print(f"INFO: Wrote {len(keys)} Parquet Partition(s) to s3://{s3_bucket_name}/{dst_path}CovidStats/")
+    return keys
+
+
+def parquet_keys(prefix):
+    """
+    lists the Parquet partitions in the S3 bucket
+    :param prefix: the key prefix the partitions are written under
+    :return: the keys of the partitions as a set
+    """
+
+    paginator = clients.client("s3").get_paginator("list_objects_v2")
+    return {
+        item["Key"]
+        for page in paginator.paginate(Bucket=s3_bucket_name, Prefix=prefix)
+        for item in page.get("Contents", [])
+        if item["Key"].endswith("/CovidStats.parquet")
+    }
 
 
 def load_all(dataclass, records):
@@ -73,9 +178,11 @@ def load_all(dataclass, records):
     res = list()
 
     try:
-        for r in records:
-            res.append(load_one(dataclass, r))
-            cnt += 1
+        with metrics.stage("dynamodb.write") as stage:
+            for r in records:
+                res.append(load_one(dataclass, r))
+                cnt += 1
+                stage["rows"] = cnt
 
         success_message = \
             f"SUCCESS! Loaded {cnt}/{len(records)} Record(s) into {dataclass.table_name}"
@@ -93,6 +200,260 @@ def load_all(dataclass, records):
     return res
 
 
+def load_batch(dataclass, records, workers=None, rate=None, publish=True, deadline=None, progress=None, bucket=None):
+    """
+    puts multiple records into DynamoDB with batch write item requests of up to 25 items
+    :param dataclass: the dataclass to write
+    :param records: the records to write, as a list or a CovidStatBatch; a CovidStatBatch is serialized in bulk
+    :param workers: the number of batches to write concurrently, or None to use 'DYNAMODB_WORKERS'
+    :param rate: the write capacity units per second to limit to, or None to use 'DYNAMODB_WRITE_RATE' or the table
+    :param publish: False to only print the outcome, for callers loading in parts that publish once at the end
+    :param deadline: the time.monotonic() after which no batch is started, or None to write every batch
+    :param progress: a dict to set 'done', the number of leading records written, and 'stopped', True if the
+        deadline stopped the writes; loads resuming from 'done' write every record once
+    :param bucket: the TokenBucket shared with concurrent loads of the same table, or None to limit this load alone
+    :return: the number of records written
+    """
+
+    if not hasattr(dataclass, "table_name"):
+        raise ValueError(f"ERROR: Provided 'dataclass': {dataclass} must have a field named 'table_name'")
+
+    if bucket is None:
+        rate = rate or dynamodb_write_rate or (table_write_rate(dataclass.table_name) if len(records) else None)
+        bucket = throttle.TokenBucket(rate) if rate else None
+
+    # the batches are serialized as the writers take them, so only the batches in flight are held as items
+    counts = {"duplicates": 0}
+    batches = serialize_batches(dataclass, records, counts)
+
+    with metrics.stage("dynamodb.write") as stage:
+        cnt, error, done = write_batches(dataclass.table_name, batches, workers or dynamodb_workers, bucket, deadline)
+        stage["rows"] = cnt
+
+    if counts["duplicates"]:
+        print(f"WARN: Skipped {counts['duplicates']} Record(s) with a duplicate key within their batch")
+
+    # only the batches taken by the writers are checked for duplicates, the others are counted as they are
+    total = len(records) - counts["duplicates"]
+
+    stopped = error is None and done * batch_size < len(records)
+    if progress is not None:
+        progress.update(done=min(done * batch_size, len(records)), stopped=stopped)
+
+    if stopped:
+        print(f"WARN: STOPPED! Loaded {cnt}/{total} Record(s) into {dataclass.table_name} before the deadline")
+
+    elif error is None:
+        success_message = \
+            f"SUCCESS! Loaded {cnt}/{total} Record(s) into {dataclass.table_name}"
+
+        # most delta runs have nothing to load, which is not worth notifying the subscribers of
+        print(f"INFO: {success_message}")
+        if publish and len(records):
+            publish_message("CGC0920: Data Load Success", success_message)
+
+    else:
+        failure_message = \
+            f"FAILURE! Loaded {cnt}/{total} Record(s) into {dataclass.table_name}\nError Message: {str(error)}"
+
+        print(f"ERROR: {failure_message}")
+        if publish:
+            publish_message("CGC0920: Data Load Failure", failure_message)
+
+    return cnt
+
+
+def serialize_batches(dataclass, records, counts):
+    """
+    serializes records into batches of items with a unique key, a chunk of records at a time
+    :param dataclass: the dataclass to serialize
+    :param records: the records to serialize, as a list or a CovidStatBatch
+    :param counts: a dict to add the number of 'duplicates' skipped to, as each batch is taken
+    :return: a generator of the batches of items
+    """
+
+    key_fields = getattr(dataclass, "key_fields", ("date",))
+    serialize = None if hasattr(records, "to_items") else serializers.get(dataclass)
+
+    for start in range(0, len(records), serialize_size):
+        with metrics.stage("serialize") as stage:
+            chunk = records[start:start + serialize_size]
+            items = chunk.to_items() if serialize is None else [serialize(r) for r in chunk]
+            stage["rows"] = len(items)
+
+        for i in range(0, len(items), batch_size):
+            batch = unique_items(items[i:i + batch_size], key_fields)
+            counts["duplicates"] += len(items[i:i + batch_size]) - len(batch)
+            yield batch
+
+
+def write_batches(table_name, batches, workers, bucket, deadline=None):
+    """
+    writes batches of items with a pool of workers, taking the next batch once one is written so only twice as
+    many batches as workers are held in flight; the remaining batches are not taken once one fails
+    :param table_name: the table to write to
+    :param batches: the batches of items to write, as a list or a generator
+    :param workers: the number of batches to write concurrently
+    :param bucket: the TokenBucket to limit the writes with, or None to not limit
+    :param deadline: the time.monotonic() after which no batch is started, or None to write every batch
+    :return: the number of items written, the error that stopped the writes, or None, and the number of leading
+        batches written in full, as a tuple
+    """
+
+    cnt = 0
+    error = None
+    done = 0
+    completed = set()
+    window = max(1, workers) * 2
+
+    def write(b):
+        """
+        :param b: the batch to write
+        :return: the number of items written, or None if the deadline has passed
+        """
+        if deadline is not None and time.monotonic() >= deadline:
+            return None
+
+        return write_batch(table_name, b, bucket)
+
+    pending = enumerate(batches)
+    stopping = False
+    futures = dict()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        while True:
+            # take the next batches while there is room in flight
+            while not stopping and len(futures) < window:
+                taken = next(pending, None)
+                if taken is None:
+                    stopping = True
+                    break
+
+                futures[executor.submit(write, taken[1])] = taken
+
+            if not futures:
+                break
+
+            finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in finished:
+                i, b = futures.pop(future)
+
+                try:
+                    written = future.result()
+                    if written is None:
+                        stopping = True
+                        continue
+
+                    cnt += written
+
+                    if written < len(b):
+                        raise ClientError(
+                            {"Error": {"Code": "UnprocessedItems",
+                                       "Message": f"{len(b) - written} item(s) unprocessed"}},
+                            "BatchWriteItem"
+                        )
+
+                    completed.add(i)
+                    while done in completed:
+                        done += 1
+
+                except ClientError as e:
+                    error = error or e
+                    stopping = True
+
+    return cnt, error, done
+
+
+def write_batch(table_name, items, bucket=None):
+    """
+    writes a batch of items, resubmitting unprocessed items with jittered exponential backoff
+    :param table_name: the table to write to
+    :param items: the items to write, at most 25
+    :param bucket: the TokenBucket to limit the writes with, or None to not limit
+    :return: the number of items written
+    """
+
+    pending = [{"PutRequest": {"Item": i}} for i in items]
+    capacity.profile_items(items)
+
+    for attempt in range(batch_attempts):
+        if attempt:
+            metrics.count("dynamodb.retries")
+
+        # each item of this table is under 1KB, so it is estimated at one write capacity unit
+        if bucket is not None:
+            bucket.acquire(len(pending))
+
+        try:
+            with capacity.request("dynamodb.batch_write_item"):
+                response = clients.client("dynamodb").batch_write_item(
+                    RequestItems={table_name: pending}, ReturnConsumedCapacity="TOTAL"
+                )
+
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ProvisionedThroughputExceededException":
+                metrics.count("dynamodb.throttled")
+                if bucket is not None:
+                    bucket.throttled()
+
+            raise e
+
+        estimated = len(pending)
+        pending = response.get("UnprocessedItems", {}).get(table_name, [])
+        consumed = sum(c.get("CapacityUnits", 0) for c in response.get("ConsumedCapacity", []))
+        metrics.count("dynamodb.consumed_capacity", consumed)
+        metrics.count("dynamodb.unprocessed", len(pending))
+
+        if bucket is not None:
+            bucket.settle(estimated, consumed or estimated - len(pending))
+            if pending:
+                bucket.throttled()
+
+            else:
+                bucket.succeeded()
+
+        if not pending:
+            return len(items)
+
+        delay = random.uniform(0, min(backoff_cap, backoff_base * 2 ** attempt))
+        print(f"WARN: {len(pending)} Item(s) unprocessed by {table_name}, retrying in {delay:.3f}s")
+        time.sleep(delay)
+
+    return len(items) - len(pending)
+
+
+def table_write_rate(table_name):
+    """
+    finds the provisioned write capacity of a table
+    :param table_name: the table to describe
+    :return: the write capacity units per second, or None for on-demand tables or if it could not be described
+    """
+
+    try:
+        table = clients.client("dynamodb").describe_table(TableName=table_name)["Table"]
+
+    except ClientError as e:
+        print(f"WARN: Could not describe {table_name}, writes will not be rate limited: {str(e)}")
+        return None
+
+    if table.get("BillingModeSummary", {}).get("BillingMode") == "PAY_PER_REQUEST":
+        return None
+
+    return table.get("ProvisionedThroughput", {}).get("WriteCapacityUnits") or None
+
+
+def unique_items(items, key_fields):
+    """
+    removes items with a duplicate key, keeping the last item for each key
+    :param items: the items to check
+    :param key_fields: the names of the fields that make up the key
+    :return: the items with unique keys
+    """
+
+    unique = {tuple(str(i.get(k)) for k in key_fields): i for i in items}
+    return list(unique.values())
+
+
 def load_one(dataclass, record):
     """
     puts a single item in a DynamoDB table using boto3
@@ -104,10 +465,17 @@ def load_one(dataclass, record):
     if not hasattr(dataclass, "table_name"):
         raise ValueError(f"ERROR: Provided 'dataclass': {dataclass} must have a field named 'table_name'")
 
-    item = {k: serializer.serialize(v) for k, v in dataclass.Schema().dump(record).items() if v != ""}
-    print(f"INFO: Loading[Table: {dataclass.table_name}, Item: {item}]")
+    item = serializers.get(dataclass)(record)
+    capacity.profile_items([item])
+
     try:
-        return dynamodb_client.put_item(TableName=dataclass.table_name, Item=item)
+        with capacity.request("dynamodb.put_item"):
+            response = clients.client("dynamodb").put_item(
+                TableName=dataclass.table_name, Item=item, ReturnConsumedCapacity="TOTAL"
+            )
+
+        metrics.count("dynamodb.consumed_capacity", response.get("ConsumedCapacity", {}).get("CapacityUnits", 0))
+        return response
 
     except ClientError as e:
         raise e
@@ -121,15 +489,15 @@ def publish_message(subject, message):
     :return: None
     """
 
-    if not sns_topic:
+    if not sns_topic_arn:
         print("WARN: SNS Topic not initialized!")
         print("WARN: Ensure 'SNS_TOPIC_ARN' is set as an Environment Variable")
         return
 
     try:
-        sns_topic.publish(Subject=subject, Message=message)
+        clients.client("sns").publish(TopicArn=sns_topic_arn, Subject=subject, Message=message)
 
     except ClientError as e:
         print(f"ERROR: Failed to Publish Message"
-              f"\n\tSNS Topic: {sns_topic}"
+              f"\n\tSNS Topic: {sns_topic_arn}"
               f"\n\tError Message: {str(e)}")
@@ -0,0 +1,274 @@
+import json
+import math
+import threading
+import time
+
+from contextlib import contextmanager
+from os import environ
+
+# messages below the log level are not printed; row dumps are printed at DEBUG
+log_level = environ.get("LOG_LEVEL", "INFO").upper()
+print(f"'log_level': {log_level}")
+
+# 'json' prints one record per run, 'emf' prints it in CloudWatch Embedded Metric Format, 'none' prints nothing
+metrics_format = environ.get("METRICS_FORMAT", "json").lower()
+metrics_namespace = environ.get("METRICS_NAMESPACE", "CGC0920")
+print(f"'metrics_format': {metrics_format}")
+print(f"'metrics_namespace': {metrics_namespace}")
+
+levels = {"DEBUG": 10, "INFO": 20, "WARN": 30, "ERROR": 40}
+
+# the units of the measures recorded by the stages, for the Embedded Metric Format
+units = {
+    "seconds": "Seconds",
+    "rows": "Count",
+    "bytes": "Bytes",
+    "rows_per_sec": "Count/Second",
+    "ms": "Milliseconds",
+    "peak_rss_mib": "Megabytes"
+}
+
+
+def enabled(level):
+    """
+    :param level: 'DEBUG', 'INFO', 'WARN' or 'ERROR'
+    :return: True if messages of the level are printed at the configured log level
+    """
+
+    return levels[level] >= levels.get(log_level, levels["INFO"])
+
+
+class Metrics:
+    """class to collect the stage timers and counters of one run"""
+
+    def __init__(self, clock=time.perf_counter):
+        """
+        initializes a Metrics instance
+        :param clock: the function providing the current time in seconds
+        """
+
+        self.clock = clock
+        self.counters = dict()
+        self.lock = threading.Lock()
+        self.samples = dict()
+        self.stages = dict()
+        self.start = clock()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        times a stage; its 'rows' and 'bytes' are set on the yielded dict, and repeated stages are added up
+        :param name: the name of the stage
+        :return: the dict of the measures of the stage
+        """
+
+        measures = dict()
+        start = self.clock()
+
+        try:
+            yield measures
+
+        finally:
+            measures["seconds"] = self.clock() - start
+
+            with self.lock:
+                totals = self.stages.setdefault(name, dict())
+                for key, value in measures.items():
+                    totals[key] = totals.get(key, 0) + (value or 0)
+
+    def count(self, name, value=1):
+        """
+        adds to a counter
+        :param name: the name of the counter
+        :param value: the amount to add
+        :return: None
+        """
+
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value):
+        """
+        adds a sample to a distribution, such as the latency of a request or the size of an item
+        :param name: the name of the distribution, ending in its unit such as '.ms' or '.bytes'
+        :param value: the sample
+        :return: None
+        """
+
+        with self.lock:
+            self.samples.setdefault(name, list()).append(value)
+
+    def record(self):
+        """
+        :return: the measures of the run as a dict, with the rows per second of every stage and a summary of
+            every distribution
+        """
+
+        with self.lock:
+            stages = {name: dict(measures) for name, measures in self.stages.items()}
+            counters = dict(self.counters)
+            samples = {name: sorted(values) for name, values in self.samples.items()}
+
+        for measures in stages.values():
+            if measures.get("rows") and measures["seconds"]:
+                measures["rows_per_sec"] = measures["rows"] / measures["seconds"]
+
+        record = {
+            "seconds": self.clock() - self.start,
+            "peak_rss_mib": peak_rss_mib(),
+            "stages": stages,
+            "counters": counters
+        }
+
+        if samples:
+            record["distributions"] = {name: summarize(values) for name, values in samples.items()}
+
+        return record
+
+    def emf(self, record=None):
+        """
+        flattens the record of the run into the CloudWatch Embedded Metric Format
+        :param record: the record to flatten, or None to record the run
+        :return: the EMF document as a dict
+        """
+
+        record = record or self.record()
+        values = {"seconds": record["seconds"], "peak_rss_mib": record["peak_rss_mib"]}
+
+        for name, measures in record["stages"].items():
+            values.update({f"{name}.{key}": value for key, value in measures.items()})
+
+        values.update(record["counters"])
+
+        # the percentiles of a distribution take the unit its name ends in
+        for name, summary in record.get("distributions", dict()).items():
+            values.update({f"{name}.{key}": value for key, value in summary.items()})
+
+        definitions = [{"Name": name, "Unit": unit(name)} for name, value in values.items() if value is not None]
+
+        document = {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [{
+                    "Namespace": metrics_namespace,
+                    "Dimensions": [["FunctionName"]],
+                    "Metrics": definitions
+                }]
+            },
+            "FunctionName": environ.get("AWS_LAMBDA_FUNCTION_NAME", "local")
+        }
+        document.update({name: value for name, value in values.items() if value is not None})
+        return document
+
+    def emit(self, fmt=None):
+        """
+        prints the measures of the run as a single line of JSON
+        :param fmt: 'json', 'emf' or 'none', or None to use 'METRICS_FORMAT'
+        :return: the printed document, or None if nothing was printed
+        """
+
+        fmt = fmt or metrics_format
+        if fmt == "none":
+            return None
+
+        document = self.emf() if fmt == "emf" else {"metrics": self.record()}
+        print(json.dumps(document, default=str))
+        return document
+
+
+def summarize(values):
+    """
+    summarizes the sorted samples of a distribution
+    :param values: the samples in ascending order
+    :return: the count, total, max, and the 50th, 95th and 99th percentiles by nearest rank, as a dict
+    """
+
+    def percentile(p):
+        """
+        :param p: the percentile to provide
+        :return: the smallest sample with at least p percent of the samples at or below it
+        """
+        return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+    return {
+        "count": len(values),
+        "total": sum(values),
+        "max": values[-1],
+        "p50": percentile(50),
+        "p95": percentile(95),
+        "p99": percentile(99)
+    }
+
+
+def unit(name):
+    """
+    :param name: the flattened name of a measure
+    :return: the Embedded Metric Format unit of the measure
+    """
+
+    parts = name.rsplit(".", 2)
+    if parts[-1] in ("total", "max", "p50", "p95", "p99") and len(parts) == 3:
+        return units.get(parts[-2], "Count")
+
+    return units.get(parts[-1], "Count")
+
+
+def peak_rss_mib():
+    """
+    :return: the peak resident memory of the process in MiB, or None where it cannot be read
+    """
+
+    try:
+        import resource
+
+    except ImportError:
+        return None
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# the run the stages record to; the handler starts a new one per invocation
+current = Metrics()
+
+
+def reset():
+    """
+    starts a new run
+    :return: the new Metrics instance
+    """
+
+    global current
+    current = Metrics()
+    return current
+
+
+def stage(name):
+    """
+    times a stage of the current run, see Metrics.stage
+    :param name: the name of the stage
+    :return: the context manager yielding the dict of the measures of the stage
+    """
+
+    return current.stage(name)
+
+
+def count(name, value=1):
+    """
+    adds to a counter of the current run
+    :param name: the name of the counter
+    :param value: the amount to add
+    :return: None
+    """
+
+    current.count(name, value)
+
+
+def observe(name, value):
+    """
+    adds a sample to a distribution of the current run, see Metrics.observe
+    :param name: the name of the distribution
+    :param value: the sample
+    :return: None
+    """
+
+    current.observe(name, value)
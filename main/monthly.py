@@ -0,0 +1,160 @@
+# -------------------------------
+# internal modules
+import classes
+import clients
+import export
+import load
+
+# -------------------------------
+# external modules
+import calendar
+import numpy as np
+import random
+import time
+
+from botocore.exceptions import ClientError
+
+# batch_get_item accepts at most 100 keys per request
+get_size = 100
+
+
+class CovidStatMonths:
+    """class to store the statistics of a CovidStatBatch packed into one item per month"""
+
+    table_name = "CovidStatsMonthly"
+    key_fields = ("month",)
+
+    # every value of a month is packed as little endian float64, one slot per day with NaN where missing
+    fields = ("idx",) + classes.CovidStatBatch.counts + classes.CovidStatBatch.rates
+    dtype = np.dtype("<f8")
+
+    def __init__(self, items):
+        """
+        initializes a CovidStatMonths instance
+        :param items: the packed DynamoDB item of each month
+        """
+
+        self.items = items
+
+    def __len__(self):
+        """
+        :return: the number of months
+        """
+
+        return len(self.items)
+
+    def __getitem__(self, key):
+        """
+        :param key: a slice of the months to provide
+        :return: a CovidStatMonths instance of the months
+        """
+
+        return CovidStatMonths(self.items[key])
+
+    def to_items(self):
+        """
+        :return: the packed DynamoDB item of each month
+        """
+
+        return self.items
+
+
+def pack(batch, changed=None):
+    """
+    packs a CovidStatBatch into one item per month
+    :param batch: the CovidStatBatch holding every statistic
+    :param changed: a boolean mask of the statistics changed by this run, or None to pack every month
+    :return: a CovidStatMonths instance of the months holding a changed statistic
+    """
+
+    items = list()
+    for year, month, part in export.month_partitions(batch, changed):
+        days = calendar.monthrange(year, month)[1]
+        slots = (part.date - part.date.astype("datetime64[M]")).astype(np.int64)
+
+        item = {"month": {"S": f"{year}-{month:02d}"}, "days": {"N": str(days)}}
+        for name in CovidStatMonths.fields:
+            values = np.asarray(getattr(part, name), dtype=np.float64)
+            if name in part.masks and part.masks[name] is not None:
+                values = np.where(part.masks[name], np.nan, values)
+
+            packed = np.full(days, np.nan, dtype=CovidStatMonths.dtype)
+            packed[slots] = values
+            item[name] = {"B": packed.tobytes()}
+
+        items.append(item)
+
+    return CovidStatMonths(items)
+
+
+def unpack(items):
+    """
+    unpacks items of months into a CovidStatBatch of the days they hold
+    :param items: the packed DynamoDB items, as written by pack
+    :return: the CovidStatBatch of the days, in date order
+    """
+
+    columns = {name: list() for name in CovidStatMonths.fields}
+    dates = list()
+
+    for item in sorted(items, key=lambda i: i["month"]["S"]):
+        first = np.datetime64(item["month"]["S"], "D")
+        for name in CovidStatMonths.fields:
+            columns[name].append(np.frombuffer(bytes(item[name]["B"]), dtype=CovidStatMonths.dtype))
+
+        dates.append(first + np.arange(int(item["days"]["N"])))
+
+    if not dates:
+        return classes.CovidStatBatch([], [])
+
+    values = {name: np.concatenate(arrays) for name, arrays in columns.items()}
+    dates = np.concatenate(dates)
+
+    # days without a statistic were packed with a missing idx
+    present = ~np.isnan(values["idx"])
+    values = {name: array[present] for name, array in values.items()}
+
+    derived = {name: values[name] for name in classes.CovidStatBatch.counts[3:] + classes.CovidStatBatch.rates}
+    return classes.CovidStatBatch(
+        values["idx"].astype(np.int64), dates[present],
+        values["cases"], values["deaths"], values["recovered"], derived
+    )
+
+
+def read(start, end=None):
+    """
+    reads the statistics of a date or a date range from the months holding them
+    :param start: the first date to read, as a date or an ISO string
+    :param end: the last date to read, or None to read only the first
+    :return: the CovidStatBatch of the dates, in date order; missing months and days are left out
+    """
+
+    start = np.datetime64(start, "D")
+    end = start if end is None else np.datetime64(end, "D")
+
+    months = np.arange(start.astype("datetime64[M]"), end.astype("datetime64[M]") + 1)
+    keys = [{"month": {"S": str(m)}} for m in months]
+
+    items = list()
+    for i in range(0, len(keys), get_size):
+        pending = {CovidStatMonths.table_name: {"Keys": keys[i:i + get_size]}}
+
+        # unprocessed keys are requested again with the jittered exponential backoff of the writes
+        for attempt in range(load.batch_attempts):
+            response = clients.client("dynamodb").batch_get_item(RequestItems=pending)
+            items.extend(response["Responses"].get(CovidStatMonths.table_name, []))
+
+            pending = response.get("UnprocessedKeys")
+            if not pending:
+                break
+
+            time.sleep(random.uniform(0, min(load.backoff_cap, load.backoff_base * 2 ** attempt)))
+
+        else:
+            raise ClientError(
+                {"Error": {"Code": "UnprocessedKeys", "Message": f"{len(keys[i:i + get_size])} month(s) unread"}},
+                "BatchGetItem"
+            )
+
+    batch = unpack(items)
+    return batch[(batch.date >= start) & (batch.date <= end)]
@@ -0,0 +1,75 @@
+# -------------------------------
+# internal modules
+import classes
+
+# -------------------------------
+# external modules
+import json
+
+from os import environ, path
+
+# the registry shipped beside this module is used unless another is configured
+datasets_config = environ.get("DATASETS_CONFIG") or path.join(path.dirname(path.abspath(__file__)), "datasets.json")
+print(f"'datasets_config': {datasets_config}")
+
+
+def load_datasets(config_file=None):
+    """
+    creates the Dataset instances described by a registry file
+    :param config_file: the JSON registry to read; None will cause the configured registry to be used
+    :return: the created Dataset instances in the order they are merged; the first is the primary
+    """
+
+    return [create_dataset(entry) for entry in read_config(config_file)["datasets"]]
+
+
+def load_county_dataset(config_file=None):
+    """
+    creates the county Dataset instance described by a registry file; it is too large to retain, so it is
+    extracted, transformed and loaded one chunk at a time rather than merged
+    :param config_file: the JSON registry to read; None will cause the configured registry to be used
+    :return: the created Dataset instance, or None if the registry has no 'county_dataset'
+    """
+
+    entry = read_config(config_file).get("county_dataset")
+    return create_dataset(entry) if entry is not None else None
+
+
+def read_config(config_file=None):
+    """
+    :param config_file: the JSON registry to read; None will cause the configured registry to be used
+    :return: the registry as a dict
+    """
+
+    with open(config_file or datasets_config) as f:
+        return json.load(f)
+
+
+def create_dataset(entry):
+    """
+    creates a Dataset instance from a registry entry
+    :param entry: the dict of Dataset attributes; 'name' is required and 'headers_key' defaults to 'headers_all'
+    :return: the created Dataset instance
+    """
+
+    if "name" not in entry:
+        raise ValueError(f"registry entry {entry} has no 'name'")
+
+    dataset = classes.Dataset(entry["name"])
+
+    # the extracted frame and its state are never configured
+    allowed = set(vars(dataset)) - {"name", "df", "modified"}
+
+    for key, value in entry.items():
+        if key == "name":
+            continue
+
+        if key not in allowed:
+            raise ValueError(f"'{key}' is not a configurable attribute of Dataset '{dataset.name}'")
+
+        setattr(dataset, key, value)
+
+    if dataset.headers_key is None:
+        dataset.headers_key = dataset.headers_all
+
+    return dataset
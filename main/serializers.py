@@ -0,0 +1,107 @@
+import datetime
+import decimal
+import marshmallow
+
+
+# compiled serializers by dataclass
+compiled = dict()
+
+
+def get(dataclass):
+    """
+    provides the serializer of a dataclass, compiling it on first use
+    :param dataclass: the marshmallow dataclass to serialize
+    :return: a function converting a record of the dataclass into a DynamoDB item
+    """
+
+    if dataclass not in compiled:
+        compiled[dataclass] = compile_serializer(dataclass)
+
+    return compiled[dataclass]
+
+
+def compile_serializer(dataclass):
+    """
+    compiles a serializer producing the same DynamoDB items as dumping the dataclass Schema through a TypeSerializer
+    :param dataclass: the marshmallow dataclass to serialize
+    :return: a function converting a record of the dataclass into a DynamoDB item
+    """
+
+    converters = [
+        (field.data_key or name, field.attribute or name, compile_field(field.attribute or name, field))
+        for name, field in dataclass.Schema().dump_fields.items()
+    ]
+
+    def serialize(record):
+        """
+        :param record: the record to convert
+        :return: the DynamoDB item
+        """
+        item = dict()
+        for name, attribute, convert in converters:
+            value = getattr(record, attribute, marshmallow.missing)
+            if value is marshmallow.missing:
+                continue
+
+            if value is None:
+                item[name] = {"NULL": True}
+                continue
+
+            value = convert(value, record)
+            if value is not marshmallow.missing:
+                item[name] = value
+
+        return item
+
+    return serialize
+
+
+def compile_field(attribute, field):
+    """
+    compiles the conversion of a single field, with a fast path for int, str, date, and finite decimal
+    :param attribute: the attribute of the record holding the field
+    :param field: the marshmallow field
+    :return: a function converting a value of the field into a DynamoDB attribute value, or missing to omit it
+    """
+
+    field_type = type(field)
+
+    if field_type is marshmallow.fields.Integer:
+        return lambda value, record: {"N": str(int(value))}
+
+    if field_type is marshmallow.fields.String:
+        return lambda value, record: {"S": str(value)} if value != "" else marshmallow.missing
+
+    if field_type is marshmallow.fields.Decimal and field.places is not None and not field.as_string:
+        places, rounding = field.places, field.rounding
+
+        def convert_decimal(value, record):
+            """
+            :param value: the value to convert
+            :param record: the record holding the value
+            :return: the DynamoDB attribute value
+            """
+            num = decimal.Decimal(str(value))
+            if not num.is_finite():
+                return {"NULL": True}
+
+            return {"N": str(num.quantize(places, rounding=rounding))}
+
+        return convert_decimal
+
+    if field_type is marshmallow.fields.Date and (field.format or "iso") in ("iso", "iso8601"):
+        return lambda value, record: {"S": datetime.date.isoformat(value)}
+
+    from boto3.dynamodb.types import TypeSerializer
+    serializer = TypeSerializer()
+
+    def convert(value, record):
+        """
+        :param value: the value to convert
+        :param record: the record holding the value
+        :return: the DynamoDB attribute value, or missing to omit it
+        """
+        value = field.serialize(attribute, record)
+        return serializer.serialize(value) if value != "" else marshmallow.missing
+
+    return convert
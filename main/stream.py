@@ -0,0 +1,84 @@
+import queue
+import threading
+
+
+# marks the end of the items produced
+done = object()
+
+
+class Failure:
+    """class to carry an exception raised by the producer over to the consumer"""
+
+    def __init__(self, error):
+        """
+        initializes a Failure instance
+        :param error: the exception raised by the producer
+        """
+
+        self.error = error
+
+
+def prefetch(items, depth):
+    """
+    produces the items of an iterable in a background thread while the caller consumes them, holding at most depth
+    items in between; the producer waits once the queue is full, so a slow consumer bounds the memory held
+    :param items: the iterable to produce; it is only iterated by the background thread
+    :param depth: the number of items to hold in between, or 0 to produce each item when it is consumed
+    :return: a generator of the items; an exception raised by the producer is raised by the generator
+    """
+
+    if depth <= 0:
+        yield from items
+        return
+
+    pending = queue.Queue(maxsize=depth)
+    stopped = threading.Event()
+
+    def produce():
+        """
+        puts every item in the queue, then the end marker
+        :return: None
+        """
+        try:
+            for item in items:
+                if not put(item):
+                    return
+
+            put(done)
+
+        except Exception as e:
+            put(Failure(e))
+
+    def put(item):
+        """
+        :param item: the item to put in the queue, waiting while it is full
+        :return: False if the consumer stopped before the item could be put
+        """
+        while not stopped.is_set():
+            try:
+                pending.put(item, timeout=0.1)
+                return True
+
+            except queue.Full:
+                continue
+
+        return False
+
+    producer = threading.Thread(target=produce, name="prefetch", daemon=True)
+    producer.start()
+
+    try:
+        while True:
+            item = pending.get()
+            if item is done:
+                return
+
+            if isinstance(item, Failure):
+                raise item.error
+
+            yield item
+
+    finally:
+        # a consumer leaving early releases the producer waiting on a full queue
+        stopped.set()
+        producer.join()
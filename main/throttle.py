@@ -0,0 +1,82 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """class to limit the rate of DynamoDB writes to a number of capacity units per second"""
+
+    def __init__(self, rate, burst=1.0, clock=time.monotonic, sleep=time.sleep):
+        """
+        initializes a TokenBucket instance
+        :param rate: the capacity units per second to allow; also the most the rate recovers to
+        :param burst: the seconds of unused capacity the bucket may hold
+        :param clock: the function providing the current time in seconds
+        :param sleep: the function to wait a number of seconds with
+        """
+        self.ceiling = float(rate)
+        self.floor = max(1.0, self.ceiling / 16)
+        self.rate = self.ceiling
+        self.burst = burst
+        self.tokens = self.ceiling * burst
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self, units):
+        """
+        waits until the units can be spent; a request larger than the bucket waits for a full bucket and goes into debt
+        :param units: the capacity units about to be consumed
+        :return: the seconds waited
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                self.refill()
+                needed = min(units, self.rate * self.burst)
+                if self.tokens >= needed:
+                    self.tokens -= units
+                    return waited
+
+                delay = (needed - self.tokens) / self.rate
+
+            self.sleep(delay)
+            waited += delay
+
+    def settle(self, estimated, consumed):
+        """
+        corrects the bucket with the capacity a request actually consumed
+        :param estimated: the capacity units acquired for the request
+        :param consumed: the capacity units reported by ReturnConsumedCapacity
+        :return: None
+        """
+        with self.lock:
+            self.tokens += estimated - consumed
+
+    def throttled(self):
+        """
+        halves the rate after DynamoDB left items unprocessed or rejected a request
+        :return: None
+        """
+        with self.lock:
+            self.refill()
+            self.rate = max(self.floor, self.rate / 2)
+            self.tokens = min(self.tokens, self.rate * self.burst)
+
+    def succeeded(self):
+        """
+        raises the rate back towards the ceiling after a request was fully processed
+        :return: None
+        """
+        with self.lock:
+            self.refill()
+            self.rate = min(self.ceiling, self.rate + self.floor)
+
+    def refill(self):
+        """
+        adds the tokens earned since the last update, up to the burst; callers must hold the lock
+        :return: None
+        """
+        now = self.clock()
+        self.tokens = min(self.rate * self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
@@ -2,11 +2,12 @@
 # -------------------------------
 # internal modules
 import classes
+import metrics
 
 # -------------------------------
 # external modules
+import numpy as np
 import pandas as pd
-from dateutil.parser import parse
 
 
 def transform(ds1, ds2):
@@ -17,40 +18,183 @@ def transform(ds1, ds2):
     :return: created CovidStat instances
     """
 
-    ds1_df = ds1.df if ds1 is not None else None
-    ds2_df = ds2.df if ds2 is not None else None
-    tar_df = ds1_df
+    return transform_batch(ds1, ds2).to_stats()
 
-    # merge dataframes
-    if ds1_df is None:
-        raise ValueError("'ds1.df' could not be extracted")
 
-    if ds2_df is None:
-        print("WARN: 'ds2.df' could not be extracted")
+def transform_batch(ds1, ds2):
+    """
+    transforms the dataframes provided into a CovidStatBatch instance
+    :param ds1: the primary Dataset Instance to use; None will cause a ValueError
+    :param ds2: the secondary Dataset Instance to use; None will cause ds1 to be used solely
+    :return: the created CovidStatBatch instance
+    """
+
+    return to_batch(merge([ds1, ds2]))
+
+
+def merge(datasets, dropped=None):
+    """
+    joins the dataframes provided on their match fields, normalized into a sorted 'date' index
+    :param datasets: the Dataset Instances to use; the first is the primary and None will cause a ValueError,
+    the others are skipped when None or not extracted
+    :param dropped: a list to add the rows dropped for a match field that cannot be parsed to, as a dataframe per
+        dataset with the 'dataset' it is from, or None to only warn of them
+    :return: the merged dataframe
+    """
+
+    names = [ds.name if ds is not None else f"ds{i + 1}" for i, ds in enumerate(datasets)]
+
+    primary = datasets[0] if datasets else None
+    if primary is None or primary.df is None:
+        raise ValueError(f"'{names[0] if names else 'ds1'}.df' could not be extracted")
+
+    others = list()
+    for name, dataset in zip(names[1:], datasets[1:]):
+        if dataset is None or dataset.df is None:
+            print(f"WARN: '{name}.df' could not be extracted")
+
+        elif dataset.match_field is None:
+            print(f"WARN: '{name}.match_field' is not set, skipping '{name}.df'")
+
+        else:
+            others.append(dataset)
+
+    # without a second frame to join the primary is used as it was extracted
+    if not others or primary.match_field is None:
+        tar_df = primary.df if primary.columns is None else primary.df.rename(columns=primary.columns)
+        if metrics.enabled("DEBUG"):
+            print(f"'tar_df':\n{tar_df}")
+
+        return tar_df
+
+    # every frame is indexed by its normalized key once, so each join is a sorted merge of the indexes
+    taken = {"date"}
+    frames = list()
+    for dataset in [primary] + others:
+        frames.append(keyed_frame(dataset, taken, dropped))
+
+    tar_df = frames[0]
+    for frame in frames[1:]:
+        tar_df = tar_df.join(frame, how="inner")
+
+    tar_df.index = tar_df.index.to_numpy().astype("datetime64[D]")
+    tar_df = tar_df.rename_axis("date").reset_index()
+
+    if metrics.enabled("DEBUG"):
+        print(f"'tar_df':\n{tar_df}")
+
+    return tar_df
+
+
+def keyed_frame(dataset, taken, dropped=None):
+    """
+    indexes a dataframe by its match field as a sorted key of days since the epoch, dropping the rows without
+    a valid key; plain integers join without the frequency inference a DatetimeIndex does on every join
+    :param dataset: the Dataset Instance to use
+    :param taken: the column names used by earlier frames; colliding names are suffixed by the dataset name
+    :param dropped: a list to add the rows without a valid key to, or None to only warn of them
+    :return: the keyed dataframe
+    """
 
-    elif ds1.match_field is not None and ds2.match_field is not None:
-        tar_df = pd.merge(ds1_df, ds2_df, left_on=ds1.match_field, right_on=ds2.match_field)
+    df = dataset.df
+    key = parse_days(df[dataset.match_field])
+    invalid = np.isnat(key)
 
-    print(f"'tar_df':\n{tar_df}")
+    if invalid.any():
+        print(f"WARN: could not parse '{dataset.match_field}' for {invalid.sum()} row(s) of '{dataset.name}.df'")
+        if dropped is not None:
+            dropped.append(df[invalid].assign(dataset=dataset.name))
 
-    # convert dataframe to CovidStat instances
-    stats = list()
-    for i, r in tar_df.iterrows():
-        cs = classes.CovidStat(i)
-        cs.cases = r["cases"] if "cases" in r else None
-        cs.deaths = r["deaths"] if "deaths" in r else None
-        cs.recovered = r["Recovered"] if "Recovered" in r else None
+    df = df.drop(columns=dataset.match_field)
+    if dataset.columns is not None:
+        df = df.rename(columns=dataset.columns)
 
-        try:
-            cs.date = parse_date(r["date"]) if "date" in r else None
+    df = df.rename(columns={c: f"{c}_{dataset.name}" for c in df.columns if c in taken})
+    taken.update(df.columns)
 
-        except TypeError:
-            print(f"WARN: could not parse 'date' for row #{i} of 'tar_df'\n\t'date': {r['date']}")
-            continue
+    df = df.set_axis(pd.Index(key.view(np.int64)), axis=0)[~invalid]
+    return df if df.index.is_monotonic_increasing else df.sort_index(kind="stable")
 
-        stats.append(cs)
 
-    return stats
+def parse_days(values):
+    """
+    parses values into days, taking the NumPy ISO 8601 parser and falling back to pandas for other formats
+    :param values: the Series of values to parse
+    :return: the datetime64[D] array, with NaT for the values that could not be parsed
+    """
+
+    try:
+        return values.to_numpy(dtype=object).astype("datetime64[D]")
+
+    except ValueError:
+        return pd.to_datetime(values, errors="coerce").dt.normalize().to_numpy().astype("datetime64[D]")
+
+
+def to_batch(tar_df):
+    """
+    converts a merged dataframe into a CovidStatBatch instance
+    :param tar_df: the merged dataframe to convert
+    :return: the created CovidStatBatch instance
+    """
+
+    # parse every date at once; rows that cannot be parsed are dropped together
+    dates = None
+    if "date" in tar_df:
+        dates = pd.to_datetime(tar_df["date"], format="%Y-%m-%d", errors="coerce")
+        invalid = dates.isna()
+
+        if invalid.any():
+            print(f"WARN: could not parse 'date' for {invalid.sum()} row(s) of 'tar_df'\n"
+                  f"\t'date': {tar_df.loc[invalid, 'date'].tolist()[:10]}")
+            tar_df = tar_df[~invalid]
+            dates = dates[~invalid]
+
+    # convert dataframe columns to a CovidStatBatch instance in one pass
+    cases, deaths = tar_df.get("cases"), tar_df.get("deaths")
+    return classes.CovidStatBatch(
+        tar_df.index, dates, cases, deaths, tar_df.get("Recovered"), derive(dates, cases, deaths)
+    )
+
+
+def derive(dates, cases, deaths):
+    """
+    computes the daily counts and rates of cumulative counts by calendar day; a day is missing a value when the
+    day before it, or any day of its window, is missing
+    :param dates: the date of each statistic, or None if unknown
+    :param cases: the cumulative cases of each statistic, or None if unknown
+    :param deaths: the cumulative deaths of each statistic, or None if unknown
+    :return: a dict of the new cases and deaths, their 7 and 14 day averages, and the growth rate of each statistic;
+        the growth rate is the change of the 7 day average of new cases from the week before
+    """
+
+    if dates is None or len(dates) == 0:
+        return dict()
+
+    days = pd.DatetimeIndex(np.asarray(dates, dtype="datetime64[D]"))
+    frame = pd.DataFrame({
+        name: np.full(len(days), np.nan) if values is None
+        else pd.to_numeric(np.asarray(values), errors="coerce").astype(np.float64)
+        for name, values in (("new_cases", cases), ("new_deaths", deaths))
+    }, index=days)
+
+    # one row per calendar day, with the days between the first and last filled as missing
+    daily = frame[~frame.index.duplicated(keep="last")].sort_index().asfreq("D").diff()
+
+    rates = dict()
+    for name in ("new_cases", "new_deaths"):
+        for window in (7, 14):
+            rates[f"{name}_avg{window}"] = daily[name].rolling(window).mean()
+
+    growth = rates["new_cases_avg7"] / rates["new_cases_avg7"].shift(7) - 1
+    rates["growth_rate"] = growth.where(np.isfinite(growth))
+
+    # map each day back onto its statistics; rates are kept to 4 places without negative zero
+    positions = daily.index.get_indexer(days)
+    derived = {name: daily[name].to_numpy()[positions] for name in daily}
+    for name, values in rates.items():
+        derived[name] = np.round(values.to_numpy()[positions], 4) + 0.0
+
+    return derived
 
 
 def parse_date(date_string):
@@ -59,9 +203,162 @@ def parse_date(date_string):
     :param date_string: the string representation of a date
     :return: the parsed date or None
     """
+    from dateutil.parser import parse  # only needed for the rare row parsed on its own
+
     try:
         return parse(date_string)
 
     except (OverflowError, ValueError) as e:
         print(f"WARN: {e}")
         return None
+
+
+def county_batch(df, since=None):
+    """
+    converts a chunk of a county dataframe into a CountyCovidStatBatch instance; the NYT leaves the fips empty
+    for places such as New York City and unknown counties, so those are keyed by 'state:county' instead
+    :param df: the chunk with date, county, state, fips, cases and deaths columns
+    :param since: the first date to keep as a datetime64, or None to keep every date
+    :return: the created CountyCovidStatBatch instance
+    """
+
+    dates = parse_days(df["date"])
+    keep = ~np.isnat(dates)
+
+    if not keep.all():
+        print(f"WARN: could not parse 'date' for {(~keep).sum()} row(s) of the county chunk")
+
+    if since is not None:
+        keep &= dates >= np.datetime64(since, "D")
+
+    df = df[keep]
+    county = labels(df["county"])
+    state = labels(df["state"])
+
+    return classes.CountyCovidStatBatch(
+        df.index, dates[keep], county_fips(df["fips"], state, county), county, state, df.get("cases"), df.get("deaths")
+    )
+
+
+def country_batch(df, country):
+    """
+    converts the records of a country of the JHU combined dataset into a CountryCovidStatBatch instance; countries
+    reported by province, such as Canada, are summed by date, with a day missing a count only when every province is
+    :param df: the records of the country with Date, Confirmed, Deaths and Recovered columns
+    :param country: the country of the records
+    :return: the created CountryCovidStatBatch instance, in date order
+    """
+
+    dates = parse_days(df["Date"])
+    keep = ~np.isnat(dates)
+
+    if not keep.all():
+        print(f"WARN: could not parse 'Date' for {(~keep).sum()} row(s) of '{country}'")
+
+    counts = pd.DataFrame({
+        name: pd.to_numeric(df[column], errors="coerce").to_numpy()[keep] if column in df else np.nan
+        for name, column in (("cases", "Confirmed"), ("deaths", "Deaths"), ("recovered", "Recovered"))
+    }, index=pd.DatetimeIndex(dates[keep], name="date"))
+
+    days = counts.groupby(level="date").sum(min_count=1)
+    cases, deaths = days["cases"].to_numpy(), days["deaths"].to_numpy()
+
+    return classes.CountryCovidStatBatch(
+        np.arange(len(days)), days.index, country, cases, deaths, days["recovered"].to_numpy(),
+        derive(days.index, cases, deaths)
+    )
+
+
+def county_fips(fips, state, county):
+    """
+    normalizes fips into 5 digit strings; pandas reads them as floats, dropping the leading 0, once one is empty
+    :param fips: the Series of fips to normalize
+    :param state: the states of the fips
+    :param county: the counties of the fips
+    :return: the fips as an object array, with 'state:county' where the fips is empty
+    """
+
+    numeric = pd.to_numeric(fips, errors="coerce").to_numpy()
+    missing = np.isnan(numeric)
+
+    result = np.empty(len(numeric), dtype=object)
+    result[~missing] = np.char.zfill(numeric[~missing].astype(np.int64).astype(str), 5)
+    result[missing] = [f"{s}:{c}" for s, c in zip(state[missing], county[missing])]
+    return result
+
+
+def labels(values):
+    """
+    :param values: the Series of labels to convert
+    :return: the labels as an object array, with None where missing
+    """
+
+    return values.astype(object).where(values.notna(), None).to_numpy()
+
+
+def rollup_partial(batch):
+    """
+    sums a chunk of county statistics by date and state; rollup combines the partial sums of every chunk
+    :param batch: the CountyCovidStatBatch of counties to sum
+    :return: a dataframe of date, state, code, cases and deaths, with NaN for sums of missing counts only
+    """
+
+    fips = pd.Series(batch.fips, dtype=object)
+    df = pd.DataFrame({
+        "date": batch.date,
+        "state": batch.state,
+        "code": fips.str.slice(0, 2).where(fips.str.isdigit(), None),
+        "cases": count_values(batch, "cases"),
+        "deaths": count_values(batch, "deaths")
+    })
+
+    keys = ["date", "state"]
+    return df.groupby(keys, sort=False)[["cases", "deaths"]].sum(min_count=1).join(
+        df.groupby(keys, sort=False)["code"].first()
+    ).reset_index()
+
+
+def rollup(partials, level):
+    """
+    combines the partial sums of every chunk into state or national statistics
+    :param partials: the dataframes from rollup_partial
+    :param level: 'state' or 'national'
+    :return: the CountyCovidStatBatch of the statistics; a state is keyed by the first 2 digits of the fips of
+    its counties, or by its name if none has a fips, and the nation by 'US'
+    """
+
+    if level not in ("state", "national"):
+        raise ValueError(f"'level' must be 'state' or 'national': {level}")
+
+    if not partials:
+        return classes.CountyCovidStatBatch([], [], [])
+
+    df = pd.concat(partials, ignore_index=True)
+    states = df.groupby(["date", "state"])[["cases", "deaths"]].sum(min_count=1).reset_index()
+
+    if level == "state":
+        fips = states["state"].map(df.groupby("state")["code"].first()).fillna(states["state"])
+        return classes.CountyCovidStatBatch(
+            np.arange(len(states)), states["date"], fips, None, states["state"], states["cases"], states["deaths"]
+        )
+
+    nation = states.groupby("date")[["cases", "deaths"]].sum(min_count=1).reset_index()
+    return classes.CountyCovidStatBatch(
+        np.arange(len(nation)), nation["date"], np.full(len(nation), "US", dtype=object), None, None,
+        nation["cases"], nation["deaths"]
+    )
+
+
+def count_values(batch, name):
+    """
+    :param batch: the batch holding the count
+    :param name: the name of the count
+    :return: the values of the count as floats, with NaN where missing
+    """
+
+    values = getattr(batch, name).astype(np.float64)
+    mask = batch.masks[name]
+    if mask is not None:
+        values[mask] = np.nan
+
+    return values
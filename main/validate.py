@@ -0,0 +1,148 @@
+# -------------------------------
+# internal modules
+import clients
+import load
+import metrics
+
+# -------------------------------
+# external modules
+import json
+import numpy as np
+import pandas as pd
+
+from botocore.exceptions import ClientError
+from datetime import date
+from os import environ, makedirs, path
+
+# quarantine initialization; rejected rows are written to a local directory when set, otherwise to S3
+quarantine_dir = environ.get("QUARANTINE_DIR")
+print(f"'quarantine_dir': {quarantine_dir}")
+
+# the rules in the order they are reported; a row failing several is quarantined under the first
+rules = ("date", "duplicate_date", "negative", "non_monotonic")
+
+# the counts of the merged dataframe; recovered is not checked as cumulative since the US recoveries of the
+# Johns Hopkins dataset fall to 0 once they were no longer reported
+count_columns = ("cases", "deaths", "Recovered")
+cumulative_columns = ("cases", "deaths")
+
+
+def validate(tar_df, columns=count_columns, cumulative=cumulative_columns, dropped=None):
+    """
+    checks every row of a merged dataframe against the rules at once: unparseable dates, dates seen on an earlier
+    row, negative counts, and cumulative counts below those of the day before; missing days are only counted
+    :param tar_df: the merged dataframe to validate
+    :param columns: the count columns to check; columns absent from the dataframe are skipped
+    :param cumulative: the columns of columns that may not decrease from day to day
+    :param dropped: the rows the merge dropped for a date that cannot be parsed, as collected by transform.merge;
+        they are rejected under the 'date' rule
+    :return: the clean dataframe, the rejected rows with the 'rule' they failed, and the report of the run holding
+        the number of rows failing each rule and the days missing between the first and the last
+    """
+
+    columns = [c for c in columns if c in tar_df]
+    counts = dict.fromkeys(rules + ("missing_day",), 0)
+    report = {"counts": counts, "missing_days": []}
+
+    # the rows dropped by the merge never reach the merged dataframe, so they are rejected as they were extracted
+    unparsed = pd.concat(dropped, ignore_index=True).assign(rule="date") if dropped else None
+    if unparsed is not None:
+        counts["date"] += len(unparsed)
+
+    if "date" not in tar_df:
+        report_counts(counts)
+        rejected = tar_df.iloc[:0].assign(rule="")
+        return tar_df, rejected if unparsed is None else pd.concat([unparsed, rejected], ignore_index=True), report
+
+    days = pd.to_datetime(tar_df["date"], format="%Y-%m-%d", errors="coerce").to_numpy(dtype="datetime64[D]")
+    values = tar_df[columns].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+
+    invalid = np.isnat(days)
+    duplicate = pd.Series(days).duplicated(keep="first").to_numpy() & ~invalid
+    negative = (values < 0).any(axis=1)
+
+    # compare each day with the nearest earlier day holding a count, in date order
+    decreasing = np.zeros(len(days), dtype=bool)
+    eligible = np.flatnonzero(~invalid & ~duplicate)
+    order = eligible[np.argsort(days[eligible], kind="stable")]
+    for i in [columns.index(c) for c in cumulative if c in columns]:
+        ordered = pd.Series(values[order, i])
+        decreasing[order] |= (ordered < ordered.ffill().shift()).to_numpy()
+
+    failed = (invalid, duplicate, negative, decreasing)
+    for rule, mask in zip(rules, failed):
+        counts[rule] += int(mask.sum())
+
+    rejected = np.logical_or.reduce(failed)
+
+    # missing days are reported, there is no row to reject
+    present = np.unique(days[~invalid])
+    if len(present):
+        missing = np.setdiff1d(np.arange(present[0], present[-1] + 1), present)
+        counts["missing_day"] = len(missing)
+        report["missing_days"] = np.datetime_as_string(missing).tolist()
+
+    report_counts(counts)
+
+    quarantined = tar_df[rejected].assign(rule=np.select(failed, rules, "")[rejected])
+    if unparsed is not None:
+        quarantined = pd.concat([unparsed, quarantined], ignore_index=True)
+
+    return tar_df[~rejected], quarantined, report
+
+
+def report_counts(counts):
+    """
+    prints and counts the rows failing each rule
+    :param counts: the number of rows failing each rule
+    :return: None
+    """
+
+    for rule, value in counts.items():
+        if value:
+            print(f"WARN: {value} row(s) of 'tar_df' failed the '{rule}' rule")
+            metrics.count(f"validate.{rule}", value)
+
+
+def quarantine(rejected, report, name="CovidStats"):
+    """
+    writes the rejected rows with the report of the run, to 'QUARANTINE_DIR' when set, otherwise to S3
+    :param rejected: the rejected rows as returned by validate
+    :param report: the report as returned by validate
+    :param name: the name the output is prefixed with
+    :return: the path or S3 key written, or None if nothing was written
+    """
+
+    if rejected.empty and not report["missing_days"]:
+        return None
+
+    body = json.dumps({
+        **report,
+        "rows": json.loads(rejected.to_json(orient="records", date_format="iso"))
+    }, indent=4)
+    file_name = f"{name}.{date.today().isoformat()}.json"
+
+    if quarantine_dir:
+        makedirs(quarantine_dir, exist_ok=True)
+        dst_file = path.join(quarantine_dir, file_name)
+        with open(dst_file, "w") as f:
+            f.write(body)
+
+        print(f"INFO: Quarantined {len(rejected)} Row(s) to {dst_file}")
+        return dst_file
+
+    if not load.s3_bucket_name:
+        print("WARN: S3 Bucket not initialized, rejected rows are not quarantined!")
+        return None
+
+    dst_path = f"{load.s3_object_path}/" if load.s3_object_path else ""
+    dst_file = f"{dst_path}Quarantine/{file_name}"
+
+    try:
+        clients.client("s3").put_object(Bucket=load.s3_bucket_name, Key=dst_file, Body=body)
+        print(f"INFO: Quarantined {len(rejected)} Row(s) to s3://{load.s3_bucket_name}/{dst_file}")
+        return dst_file
+
+    except ClientError as e:
+        print(f"ERROR: {str(e)}")
+        return None
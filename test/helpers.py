@@ -0,0 +1,49 @@
+# internal modules
+import classes
+import clients
+import load
+
+# external modules
+import boto3
+import numpy
+
+from unittest import mock
+
+
+def mock_bucket(test):
+    """
+    creates a bucket in the S3 stand-in and points the exports at it until the test ends; called by the setUp of a
+    test class decorated with mock_aws, as moto only starts its stand-in for the methods of the decorated class
+    :param test: the TestCase to create the bucket for
+    :return: the S3 client of the stand-in
+    """
+
+    client = boto3.client("s3", region_name="us-east-1")
+    client.create_bucket(Bucket="covid-stats-test")
+
+    for patcher in (mock.patch.dict(clients.cache, {"s3": client}),
+                    mock.patch.object(load, "s3_bucket_name", "covid-stats-test"),
+                    mock.patch.object(load, "s3_object_path", "Data")):
+        patcher.start()
+        test.addCleanup(patcher.stop)
+
+    return client
+
+
+def create_batch(cases, deaths=None, recovered=None, start="2020-09-11", idx=None, dates=None, derived=None):
+    """
+    creates a CovidStatBatch on consecutive days
+    :param cases: the cases of each statistic
+    :param deaths: the deaths of each statistic, or None if unknown
+    :param recovered: the recovered of each statistic, or None if unknown
+    :param start: the date of the first statistic
+    :param idx: the idx of each statistic, or None to number them from 0
+    :param dates: the date of each statistic, or None for consecutive days from start
+    :param derived: a dict of the new counts and rates of each statistic, or None if unknown
+    :return: the created CovidStatBatch
+    """
+
+    size = len(cases)
+    idx = numpy.arange(size) if idx is None else idx
+    dates = numpy.datetime64(start) + numpy.arange(size) if dates is None else dates
+    return classes.CovidStatBatch(idx, dates, cases, deaths, recovered, derived)
@@ -0,0 +1,180 @@
+# internal modules
+import backfill
+import classes
+import clients
+import load
+import monthly
+
+# external modules
+import boto3
+import helpers
+import os
+import tempfile
+import unittest
+
+from botocore.exceptions import ClientError
+from moto import mock_aws
+from unittest import mock
+
+
+class TestBackfill(unittest.TestCase):
+    """class containing unit tests for backfill.py"""
+
+    def test_plan(self):
+        """
+        :return: pass or fail if a date range is split into consecutive shards covering it exactly
+        """
+        print("test_plan")
+        shards = backfill.plan("2020-01-01", "2020-01-10", 4)
+        self.assertEqual([(s["start"], s["end"]) for s in shards], [
+            ("2020-01-01", "2020-01-04"), ("2020-01-05", "2020-01-08"), ("2020-01-09", "2020-01-10")
+        ])
+        self.assertEqual([s["shard"] for s in shards], [0, 1, 2])
+
+        with self.assertRaises(ValueError):
+            backfill.plan("2020-01-10", "2020-01-01", 4)
+
+    def test_retry_shards(self):
+        """
+        :return: pass or fail if only the failed shards are retried and their summaries replaced
+        """
+        print("test_retry_shards")
+        summaries = [dict(s, status="SUCCESS") for s in backfill.plan("2020-01-01", "2020-01-10", 4)]
+        summaries[1]["status"] = "FAILURE"
+
+        shards = backfill.retry_shards(summaries)
+        self.assertEqual(shards, [{"shard": 1, "start": "2020-01-05", "end": "2020-01-08"}])
+
+        merged = backfill.merge_summaries(summaries, [dict(shards[0], status="SUCCESS")])
+        self.assertEqual([s["status"] for s in merged], ["SUCCESS"] * 3)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            summary_file = os.path.join(tmp, "summary.json")
+            backfill.write_summary(summary_file, merged)
+            self.assertEqual(backfill.read_summary(summary_file), merged)
+
+
+@mock_aws
+class TestBackfillLoad(unittest.TestCase):
+    """class containing unit tests for the shard loads in backfill.py against a local DynamoDB stand-in"""
+
+    def setUp(self):
+        """creates the CovidStats table in the DynamoDB stand-in"""
+        self.client = boto3.client("dynamodb", region_name="us-east-1")
+        self.client.create_table(
+            TableName=classes.CovidStat.table_name,
+            AttributeDefinitions=[{"AttributeName": "date", "AttributeType": "S"}],
+            KeySchema=[{"AttributeName": "date", "KeyType": "HASH"}],
+            BillingMode="PAY_PER_REQUEST"
+        )
+        patcher = mock.patch.dict(clients.cache, {"dynamodb": self.client})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_backfill1(self):
+        """
+        :return: pass or fail if the shards load every statistic within the range only
+        """
+        print("test_backfill1")
+        shards = backfill.plan("2020-01-03", "2020-01-30", 7)
+        summaries = backfill.backfill(helpers.create_batch(range(40), start="2020-01-01"), shards, workers=3)
+
+        self.assertEqual([s["status"] for s in summaries], ["SUCCESS"] * 4)
+        self.assertEqual([s["records"] for s in summaries], [7, 7, 7, 7])
+        self.assertEqual(self.client.scan(TableName=classes.CovidStat.table_name)["Count"], 28)
+
+    def test_backfill2(self):
+        """
+        :return: pass or fail if a failing shard is reported alone and loads once retried
+        """
+        print("test_backfill2")
+        batch = helpers.create_batch(range(20), start="2020-01-01")
+        shards = backfill.plan("2020-01-01", "2020-01-20", 5)
+        write_batch = load.write_batch
+
+        def failing(table_name, items, bucket=None):
+            if items[0]["date"]["S"] == "2020-01-06":
+                raise ClientError({"Error": {"Code": "InternalServerError", "Message": "failed"}}, "BatchWriteItem")
+
+            return write_batch(table_name, items, bucket)
+
+        with mock.patch.object(load, "write_batch", failing):
+            summaries = backfill.backfill(batch, shards, workers=2)
+
+        self.assertEqual([s["status"] for s in summaries], ["SUCCESS", "FAILURE", "SUCCESS", "SUCCESS"])
+        self.assertEqual(self.client.scan(TableName=classes.CovidStat.table_name)["Count"], 15)
+
+        retried = backfill.backfill(batch, backfill.retry_shards(summaries))
+        self.assertEqual([s["shard"] for s in retried], [1])
+        self.assertEqual(self.client.scan(TableName=classes.CovidStat.table_name)["Count"], 20)
+
+    def test_backfill3(self):
+        """
+        :return: pass or fail if the shards loaded at once share one limit of the table's capacity
+        """
+        print("test_backfill3")
+        shards = backfill.plan("2020-01-01", "2020-01-20", 5)
+        write_batch = load.write_batch
+        buckets = list()
+
+        def recorded(table_name, items, bucket=None):
+            buckets.append(bucket)
+            return write_batch(table_name, items, None)
+
+        with mock.patch.object(load, "write_batch", recorded), mock.patch.object(load, "dynamodb_write_rate", 5):
+            summaries = backfill.backfill(helpers.create_batch(range(20), start="2020-01-01"), shards, workers=4)
+
+        self.assertEqual([s["status"] for s in summaries], ["SUCCESS"] * 4)
+        self.assertEqual(len(buckets), 4)
+        self.assertEqual(len({id(b) for b in buckets}), 1)
+        self.assertEqual(buckets[0].ceiling, 5)
+
+    def test_backfill4(self):
+        """
+        :return: pass or fail if the shards fill the table of the monthly layout with every month they touch whole
+        """
+        print("test_backfill4")
+        self.client.create_table(
+            TableName=monthly.CovidStatMonths.table_name,
+            AttributeDefinitions=[{"AttributeName": "month", "AttributeType": "S"}],
+            KeySchema=[{"AttributeName": "month", "KeyType": "HASH"}],
+            BillingMode="PAY_PER_REQUEST"
+        )
+        shards = backfill.plan("2020-01-01", "2020-02-09", 10)
+
+        with mock.patch.object(load, "dynamodb_layout", "monthly"):
+            summaries = backfill.backfill(helpers.create_batch(range(40), start="2020-01-01"), shards, workers=2)
+
+        self.assertEqual([s["status"] for s in summaries], ["SUCCESS"] * 4)
+        self.assertEqual([s["records"] for s in summaries], [1, 1, 1, 2])
+        self.assertEqual(self.client.scan(TableName=monthly.CovidStatMonths.table_name)["Count"], 2)
+        self.assertEqual(self.client.scan(TableName=classes.CovidStat.table_name)["Count"], 0)
+
+    def test_handler(self):
+        """
+        :return: pass or fail if a fanned out invocation loads the shard of its event only, limited to its part of
+            the table's capacity
+        """
+        print("test_handler")
+        events = backfill.plan_events(backfill.plan("2020-01-01", "2020-01-20", 10))
+        self.assertEqual([e["shards"] for e in events], [2, 2])
+
+        batch = helpers.create_batch(range(20), start="2020-01-01")
+        write_batch = load.write_batch
+        buckets = list()
+
+        def recorded(table_name, items, bucket=None):
+            buckets.append(bucket)
+            return write_batch(table_name, items, None)
+
+        with mock.patch.object(backfill, "transform_all", return_value=batch), \
+                mock.patch.object(load, "write_batch", recorded), mock.patch.object(load, "dynamodb_write_rate", 10):
+            summary = backfill.handler(events[1], None)
+
+        self.assertEqual((summary["status"], summary["loaded"]), ("SUCCESS", 10))
+        self.assertEqual(buckets[0].ceiling, 5)
+        items = self.client.scan(TableName=classes.CovidStat.table_name)["Items"]
+        self.assertEqual(min(i["date"]["S"] for i in items), "2020-01-11")
+
+if __name__ == '__main__':
+    unittest.main()
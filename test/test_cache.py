@@ -0,0 +1,94 @@
+# internal modules
+import cache
+import classes
+import transform
+
+# external modules
+import os
+import pandas
+import tempfile
+import unittest
+
+from os import path
+
+
+class TestCache(unittest.TestCase):
+    """class containing unit tests for cache.py"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_stage_cache1(self):
+        """
+        :return: pass or fail if a result is returned as it was stored and a missing key returns None
+        """
+        print("test_stage_cache1")
+        stage_cache = cache.StageCache(self.directory.name)
+        stage_cache.put("key", {"df": pandas.DataFrame({"cases": [1, 2]}), "loaded": False})
+
+        result = stage_cache.get("key")
+        self.assertEqual(result["df"]["cases"].tolist(), [1, 2])
+        self.assertFalse(result["loaded"])
+        self.assertIsNone(stage_cache.get("other"))
+
+    def test_stage_cache2(self):
+        """
+        :return: pass or fail if the least recently used results are evicted beyond the size
+        """
+        print("test_stage_cache2")
+        stage_cache = cache.StageCache(self.directory.name, max_bytes=2500)
+
+        for i, key in enumerate(["a", "b"]):
+            stage_cache.put(key, b"x" * 1000)
+            os.utime(stage_cache.file(key), (i, i))
+
+        # reading 'a' makes 'b' the least recently used
+        stage_cache.get("a")
+        stage_cache.put("c", b"x" * 1000)
+
+        self.assertIsNotNone(stage_cache.get("a"))
+        self.assertIsNone(stage_cache.get("b"))
+        self.assertIsNotNone(stage_cache.get("c"))
+
+    def test_stage_cache3(self):
+        """
+        :return: pass or fail if an unreadable result is discarded
+        """
+        print("test_stage_cache3")
+        stage_cache = cache.StageCache(self.directory.name)
+
+        with open(stage_cache.file("key"), "wb") as f:
+            f.write(b"not a pickle")
+
+        self.assertIsNone(stage_cache.get("key"))
+        self.assertFalse(path.exists(stage_cache.file("key")))
+
+    def test_stage_key(self):
+        """
+        :return: pass or fail if the key only changes when the content or the code changes
+        """
+        print("test_stage_key")
+        key = cache.stage_key([create_dataset([1, 2])], [transform])
+
+        self.assertEqual(key, cache.stage_key([create_dataset([1, 2])], [transform]))
+        self.assertNotEqual(key, cache.stage_key([create_dataset([1, 3])], [transform]))
+        self.assertNotEqual(key, cache.stage_key([create_dataset([1, 2])], [transform, classes]))
+        self.assertNotEqual(key, cache.stage_key([classes.Dataset("ds")], [transform]))
+
+
+def create_dataset(cases):
+    """
+    :param cases: the cases of the dataset
+    :return: a Dataset instance holding the cases
+    """
+    dataset = classes.Dataset("ds")
+    dataset.match_field = "date"
+    dataset.df = pandas.DataFrame({"date": ["2020-09-11", "2020-09-12"], "cases": cases})
+    return dataset
+
+
+if __name__ == '__main__':
+    unittest.main()
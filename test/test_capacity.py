@@ -0,0 +1,95 @@
+# internal modules
+import capacity
+import classes
+import clients
+import load
+import metrics
+
+# external modules
+import boto3
+import pandas
+import unittest
+
+from moto import mock_aws
+from test_load import CovidStatTest, create_unique_instances
+from unittest import mock
+
+
+class TestCapacity(unittest.TestCase):
+    """class containing unit tests for capacity.py"""
+
+    def test_item_size(self):
+        """
+        :return: pass or fail if items are sized by their names and values as DynamoDB bills them
+        """
+        print("test_item_size")
+        self.assertEqual(capacity.item_size({"date": {"S": "2020-09-11"}}), 14)
+        self.assertEqual(capacity.item_size({"cases": {"N": "6000000"}}), 5 + 2)
+        self.assertEqual(capacity.item_size({"rate": {"N": "-0.1250"}}), 4 + 3)
+        self.assertEqual(capacity.item_size({"b": {"B": b"12345678"}, "n": {"NULL": True}}), 1 + 8 + 1 + 1)
+        self.assertEqual(capacity.item_size({"l": {"L": [{"S": "ab"}, {"BOOL": True}]}}), 1 + 3 + 3 + 2)
+
+        self.assertEqual(capacity.write_units({"b": {"B": bytes(1024)}}), 2)
+        self.assertEqual(capacity.read_units({"b": {"B": bytes(1024)}}), 0.5)
+
+    def test_dry_run(self):
+        """
+        :return: pass or fail if a dry run estimates the requests and units of a load without calling AWS
+        """
+        print("test_dry_run")
+        batch = classes.CovidStatBatch(
+            range(60), pandas.date_range("2020-03-01", periods=60), range(60), range(60), None
+        )
+
+        with mock.patch.object(clients, "client", side_effect=AssertionError("no AWS in a dry run")):
+            result = capacity.dry_run(classes.CovidStat, batch, rate=5)
+
+        self.assertEqual(result["table"], "CovidStats")
+        self.assertEqual(result["items"], 60)
+        self.assertEqual(result["requests"], 3)
+        self.assertEqual(result["write_units"], 60)
+        self.assertEqual(result["read_units"], 30)
+        self.assertEqual(result["seconds"], 12)
+        self.assertEqual(result["bytes"], sum(capacity.item_size(i) for i in batch.to_items()))
+
+
+@mock_aws
+class TestCapacityProfile(unittest.TestCase):
+    """class containing unit tests for profiling loads in capacity.py against a local DynamoDB stand-in"""
+
+    def setUp(self):
+        """creates the CovidStatsTest table in the DynamoDB stand-in and enables profiling"""
+        self.client = boto3.client("dynamodb", region_name="us-east-1")
+        self.client.create_table(
+            TableName=CovidStatTest.table_name,
+            AttributeDefinitions=[{"AttributeName": "date", "AttributeType": "S"}],
+            KeySchema=[{"AttributeName": "date", "KeyType": "HASH"}],
+            BillingMode="PAY_PER_REQUEST"
+        )
+
+        for patcher in (mock.patch.dict(clients.cache, {"dynamodb": self.client}),
+                        mock.patch.object(capacity, "profile_enabled", True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_profile(self):
+        """
+        :return: pass or fail if a profiled load records its request latencies, item sizes and consumed capacity
+        """
+        print("test_profile")
+        run = metrics.reset()
+        records = create_unique_instances(30)
+
+        self.assertEqual(load.load_batch(CovidStatTest, records[:25], publish=False), 25)
+        load.load_one(CovidStatTest, records[25])
+
+        record = run.record()
+        self.assertEqual(record["distributions"]["dynamodb.batch_write_item.ms"]["count"], 1)
+        self.assertEqual(record["distributions"]["dynamodb.put_item.ms"]["count"], 1)
+        self.assertEqual(record["distributions"]["dynamodb.item.bytes"]["count"], 26)
+        self.assertEqual(record["counters"]["dynamodb.estimated_capacity"], 26)
+        self.assertGreater(record["counters"]["dynamodb.consumed_capacity"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
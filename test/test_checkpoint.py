@@ -0,0 +1,84 @@
+# internal modules
+import checkpoint
+import delta
+
+# external modules
+import helpers
+import pandas
+import unittest
+
+from moto import mock_aws
+from unittest import mock
+
+
+class TestCheckpoint(unittest.TestCase):
+    """class containing unit tests for checkpoint.py"""
+
+    def test_fingerprint(self):
+        """
+        :return: pass or fail if the fingerprint of the input changes with any statistic to load
+        """
+        print("test_fingerprint")
+        prints = pandas.Series(["a1", "b2"], index=["2020-09-11", "2020-09-12"])
+        self.assertEqual(checkpoint.fingerprint(prints), checkpoint.fingerprint(prints.copy()))
+        self.assertNotEqual(checkpoint.fingerprint(prints), checkpoint.fingerprint(prints.iloc[:1]))
+        self.assertNotEqual(checkpoint.fingerprint(prints), checkpoint.fingerprint(prints.replace("b2", "b3")))
+
+    def test_resume(self):
+        """
+        :return: pass or fail if a load only resumes from a checkpoint of the same input
+        """
+        print("test_resume")
+        state = {"run_id": "run", "fingerprint": "abc", "records": 50}
+        self.assertEqual(checkpoint.resume(state, "abc"), 50)
+        self.assertEqual(checkpoint.resume(state, "xyz"), 0)
+        self.assertEqual(checkpoint.resume(None, "abc"), 0)
+
+    def test_deadline(self):
+        """
+        :return: pass or fail if the deadline keeps back the reserve from the remaining time of the context
+        """
+        print("test_deadline")
+        context = mock.Mock()
+        context.get_remaining_time_in_millis.return_value = 10000
+
+        with mock.patch.object(checkpoint.time, "monotonic", return_value=100.0):
+            self.assertEqual(checkpoint.deadline(context, 3000), 107.0)
+            self.assertEqual(checkpoint.deadline(context, 20000), 100.0)
+
+        self.assertIsNone(checkpoint.deadline(None))
+
+
+@mock_aws
+class TestCheckpointState(unittest.TestCase):
+    """class containing unit tests for the checkpoint state in checkpoint.py against a local S3 stand-in"""
+
+    def setUp(self):
+        """creates a bucket in the S3 stand-in"""
+        self.client = helpers.mock_bucket(self)
+
+    def test_checkpoint(self):
+        """
+        :return: pass or fail if a written checkpoint reads back until it is cleared
+        """
+        print("test_checkpoint")
+        self.assertIsNone(checkpoint.read_checkpoint())
+
+        prints = delta.fingerprints(helpers.create_batch([10, 20], [1, 2]))
+        fingerprint = checkpoint.fingerprint(prints)
+        checkpoint.write_checkpoint("run", fingerprint, 25)
+
+        state = checkpoint.read_checkpoint()
+        self.assertEqual(state["run_id"], "run")
+        self.assertEqual(checkpoint.resume(state, fingerprint), 25)
+        self.assertEqual(
+            self.client.list_objects_v2(Bucket="covid-stats-test")["Contents"][0]["Key"],
+            "Data/CovidStats.checkpoint.json"
+        )
+
+        checkpoint.clear_checkpoint()
+        self.assertIsNone(checkpoint.read_checkpoint())
+
+
+if __name__ == '__main__':
+    unittest.main()
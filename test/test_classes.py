@@ -3,9 +3,13 @@ import classes
 
 # external modules
 import datetime
+import helpers
+import numpy
 import pandas
 import unittest
 
+from boto3.dynamodb.types import TypeSerializer
+
 
 class TestClasses(unittest.TestCase):
     """class containing unit tests for classes.py"""
@@ -61,6 +65,144 @@ class TestClasses(unittest.TestCase):
         expected = f"CovidStat[idx: 1, date: {now}, cases: 1, deaths: 1, recovered: 1]"
         self.assertEqual(obj.to_string(), expected)
 
+    def test_CovidStatBatchConstructor(self):
+        """
+        :return: pass or fail if the constructor stores the columns with masks for the missing counts
+        """
+        print("test_CovidStatBatchConstructor")
+        batch = create_partial_batch()
+        self.assertEqual(len(batch), 3)
+        self.assertEqual(batch.table_name, "CovidStats")
+        self.assertEqual(batch.cases.dtype, numpy.int64)
+        self.assertEqual(batch.date.dtype, numpy.dtype("datetime64[D]"))
+        self.assertIsNone(batch.masks["cases"])
+        self.assertEqual(batch.masks["recovered"].tolist(), [False, True, False])
+        self.assertTrue(batch.masks["deaths"].all())
+
+    def test_CovidStatBatchSlicing(self):
+        """
+        :return: pass or fail if positions provide views and slices or masks provide batches
+        """
+        print("test_CovidStatBatchSlicing")
+        batch = create_partial_batch()
+
+        view = batch[-1]
+        self.assertIsInstance(view, classes.CovidStat)
+        self.assertEqual(view.idx, 7)
+        self.assertEqual(view.date, datetime.datetime(2020, 9, 13))
+        self.assertEqual(view.cases, 30)
+        self.assertIsNone(view.deaths)
+        self.assertEqual(view.recovered, 3)
+
+        part = batch[1:]
+        self.assertIsInstance(part, classes.CovidStatBatch)
+        self.assertEqual(part.idx.tolist(), [6, 7])
+        self.assertEqual(part.column("recovered"), [None, 3])
+
+        part = batch[batch.cases > 10]
+        self.assertEqual(part.column("cases"), [20, 30])
+
+        with self.assertRaises(IndexError):
+            _ = batch[3]
+
+    def test_CovidStatBatchToJson(self):
+        """
+        :return: pass or fail if to_json and to_stats match the JSON of each view
+        """
+        print("test_CovidStatBatchToJson")
+        batch = create_partial_batch()
+        expected = [view.to_json() for view in batch]
+        self.assertEqual(batch.to_json(), expected)
+        self.assertEqual([stat.to_json() for stat in batch.to_stats()], expected)
+        self.assertEqual(expected[1]["date"], datetime.datetime(2020, 9, 12))
+        self.assertIsNone(expected[1]["recovered"])
+
+    def test_CovidStatBatchToItems(self):
+        """
+        :return: pass or fail if to_items matches the DynamoDB items of the CovidStat schema
+        """
+        print("test_CovidStatBatchToItems")
+        batch = create_partial_batch()
+        serializer = TypeSerializer()
+        schema = classes.CovidStat.Schema()
+        expected = [{k: serializer.serialize(v) for k, v in schema.dump(view).items()} for view in batch]
+        self.assertEqual(batch.to_items(), expected)
+
+    def test_CovidStatBatchRates(self):
+        """
+        :return: pass or fail if derived counts and rates survive slicing and match the CovidStat schema as items
+        """
+        print("test_CovidStatBatchRates")
+        batch = create_partial_batch()
+        derived = classes.CovidStatBatch(batch.idx, batch.date, batch.cases, None, None, {
+            "new_cases": [None, 10, 10],
+            "new_cases_avg7": [float("nan"), 10.0, 9.1235],
+            "growth_rate": [0.0, -0.5, 1.25]
+        })
+
+        part = derived[1:]
+        self.assertEqual(part.column("new_cases"), [10, 10])
+        self.assertEqual(part.rate("new_cases_avg7"), [10.0, 9.1235])
+        self.assertEqual(derived[0].new_cases_avg7, None)
+        self.assertEqual(derived.to_json()[2]["growth_rate"], 1.25)
+
+        serializer = TypeSerializer()
+        schema = classes.CovidStat.Schema()
+        expected = [{k: serializer.serialize(v) for k, v in schema.dump(view).items()} for view in derived]
+        self.assertEqual(derived.to_items(), expected)
+        self.assertEqual(expected[2]["new_cases_avg7"], {"N": "9.1235"})
+
+    def test_CountryCovidStatBatch(self):
+        """
+        :return: pass or fail if country statistics are keyed by country and date and match the CountryCovidStat schema
+        """
+        print("test_CountryCovidStatBatch")
+        batch = create_partial_batch()
+        countries = classes.CountryCovidStatBatch(batch.idx, batch.date, "US", batch.cases, batch.deaths, None, {
+            "new_cases_avg7": [float("nan"), 10.0, 9.1235]
+        })
+
+        self.assertEqual(classes.CountryCovidStat.key_fields, ("country", "date"))
+        self.assertEqual(countries[1:].country.tolist(), ["US", "US"])
+        self.assertIsInstance(countries[0], classes.CountryCovidStat)
+        self.assertEqual(countries.to_json()[0]["country"], "US")
+
+        serializer = TypeSerializer()
+        schema = classes.CountryCovidStat.Schema()
+        expected = [{k: serializer.serialize(v) for k, v in schema.dump(stat).items()} for stat in countries]
+        self.assertEqual(countries.to_items(), expected)
+
+    def test_CountyCovidStatBatchSlicing(self):
+        """
+        :return: pass or fail if a CountyCovidStatBatch keeps its labels when sliced and provides CountyCovidStats
+        """
+        print("test_CountyCovidStatBatchSlicing")
+        batch = create_county_batch()
+
+        part = batch[batch.cases > 1]
+        self.assertIsInstance(part, classes.CountyCovidStatBatch)
+        self.assertEqual(part.fips.tolist(), ["01003", "US"])
+        self.assertEqual(part.column("deaths"), [None, 4])
+
+        stat = batch[-1]
+        self.assertIsInstance(stat, classes.CountyCovidStat)
+        self.assertEqual((stat.fips, stat.county, stat.state, stat.cases), ("US", None, None, 3))
+
+        with self.assertRaises(IndexError):
+            _ = batch[3]
+
+    def test_CountyCovidStatBatchToItems(self):
+        """
+        :return: pass or fail if to_items matches the DynamoDB items of the CountyCovidStat schema
+        """
+        print("test_CountyCovidStatBatchToItems")
+        batch = create_county_batch()
+        serializer = TypeSerializer()
+        schema = classes.CountyCovidStat.Schema()
+        expected = [{k: serializer.serialize(v) for k, v in schema.dump(stat).items()} for stat in batch]
+        self.assertEqual(batch.to_items(), expected)
+        self.assertEqual(classes.CountyCovidStat.key_fields, ("fips", "date"))
+
     def test_DatasetConstructor(self):
         """
         :return: pass or fail if the constructor is working as expected
@@ -97,5 +239,29 @@ class TestClasses(unittest.TestCase):
         self.assertEqual(obj.source_url, source_url)
 
 
+def create_partial_batch():
+    """
+    creates a CovidStatBatch with a missing recovered count and no deaths
+    :return: the created CovidStatBatch
+    """
+    return helpers.create_batch([10, 20, 30], recovered=[1.0, float("nan"), 3.0], idx=[5, 6, 7])
+
+
+def create_county_batch():
+    """
+    creates a CountyCovidStatBatch of two counties and the nation, with a missing deaths count
+    :return: the created CountyCovidStatBatch
+    """
+    return classes.CountyCovidStatBatch(
+        [0, 1, 2],
+        ["2020-09-11", "2020-09-11", "2020-09-11"],
+        ["01001", "01003", "US"],
+        ["Autauga", "Baldwin", None],
+        ["Alabama", "Alabama", None],
+        [1, 2, 3],
+        [1.0, float("nan"), 4.0]
+    )
+
+
 if __name__ == '__main__':
     unittest.main()
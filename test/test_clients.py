@@ -0,0 +1,55 @@
+# internal modules
+import clients
+
+# external modules
+import os
+import unittest
+
+from unittest import mock
+
+
+class TestClients(unittest.TestCase):
+    """class containing unit tests for clients.py"""
+
+    def setUp(self):
+        """starts each test without clients and with a region"""
+        patcher = mock.patch.dict(os.environ, {"AWS_DEFAULT_REGION": "us-east-1"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        clients.reset()
+        self.addCleanup(clients.reset)
+
+    def test_client1(self):
+        """
+        :return: pass or fail if a client is created once and reused
+        """
+        print("test_client1")
+        self.assertEqual(clients.cache, dict())
+        dynamodb = clients.client("dynamodb")
+        self.assertIs(clients.client("dynamodb"), dynamodb)
+        self.assertIs(clients.cache["dynamodb"], dynamodb)
+
+    def test_client2(self):
+        """
+        :return: pass or fail if every client shares one session and uses the tuned connection pool
+        """
+        print("test_client2")
+        s3 = clients.client("s3")
+        sns = clients.client("sns")
+        self.assertIsNot(s3, sns)
+        self.assertIs(clients.get_session(), clients.session)
+        self.assertEqual(s3.meta.config.max_pool_connections, clients.max_pool_connections)
+
+    def test_reset(self):
+        """
+        :return: pass or fail if reset creates a new client on the next use
+        """
+        print("test_reset")
+        s3 = clients.client("s3")
+        clients.reset()
+        self.assertIsNone(clients.session)
+        self.assertIsNot(clients.client("s3"), s3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+# internal modules
+import classes
+import countries
+import extract
+import load
+
+# external modules
+import pandas
+import tempfile
+import unittest
+
+from unittest import mock
+
+
+class TestCountries(unittest.TestCase):
+    """class containing unit tests for countries.py"""
+
+    def test_narrow(self):
+        """
+        :return: pass or fail if one widened extract provides the records of the dataset alone and of each country
+        """
+        print("test_narrow")
+
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as f:
+            f.write("Date,Country/Region,Province/State,Confirmed,Recovered,Deaths\n"
+                    "2020-03-01,US,,5,1,0\n2020-03-01,Canada,Ontario,1,0,0\n2020-03-01,Canada,Quebec,2,0,0\n"
+                    "2020-03-02,US,,7,2,1\n2020-03-02,France,,4,0,0\n")
+            f.flush()
+
+            alone = create_dataset(f.name)
+            extract.extract_dataset(alone)
+
+            dataset = create_dataset(f.name)
+            with mock.patch.object(countries, "countries", ["Canada", "Italy"]):
+                original = countries.widen(dataset)
+                self.assertEqual(dataset.filter_val, ["US", "Canada", "Italy"])
+
+                extract.extract_dataset(dataset)
+                partitions = countries.narrow(dataset, original)
+
+        self.assertEqual((dataset.headers_key, dataset.filter_val), (alone.headers_key, alone.filter_val))
+        self.assertTrue(dataset.df.equals(alone.df))
+        self.assertEqual(list(partitions), ["Canada"])
+        self.assertEqual(partitions["Canada"]["Confirmed"].tolist(), [1, 2])
+
+    def test_load_countries(self):
+        """
+        :return: pass or fail if every country is transformed and loaded, with threads when processes are unavailable,
+            and only the statistics changed since the snapshot are loaded again
+        """
+        print("test_load_countries")
+        partitions = {
+            "US": create_country(["2020-03-01", "2020-03-02"]),
+            "Canada": create_country(["2020-03-01", "2020-03-01", "2020-03-02"])
+        }
+
+        loaded = list()
+
+        def load_batch(dataclass, batch, publish=True, deadline=None):
+            """
+            :return: the number of records written, which is every record
+            """
+            loaded.extend((dataclass.table_name, c) for c in batch.country.tolist())
+            return len(batch)
+
+        with mock.patch.object(countries, "ProcessPoolExecutor", side_effect=OSError("no shared memory")), \
+                mock.patch.object(load, "load_batch", load_batch):
+            results, prints = countries.load_countries(partitions, dict(), workers=2)
+
+            self.assertEqual(results, {"US": (2, 2), "Canada": (2, 2)})
+            self.assertEqual(sorted(loaded), [("CountryCovidStats", "Canada")] * 2 + [("CountryCovidStats", "US")] * 2)
+            self.assertEqual(sorted(prints.index), ["Canada|2020-03-01", "Canada|2020-03-02",
+                                                    "US|2020-03-01", "US|2020-03-02"])
+
+            partitions["US"] = create_country(["2020-03-01", "2020-03-02", "2020-03-03"])
+            results, prints = countries.load_countries(partitions, prints.to_dict(), workers=2)
+
+        # the new day changes the rates of no other day, so it is loaded alone
+        self.assertEqual(results, {"US": (1, 1), "Canada": (0, 0)})
+        self.assertEqual(prints.index.tolist(), ["US|2020-03-03"])
+
+
+def create_dataset(url):
+    """
+    creates a dataset of a JHU combined style source filtered to the US
+    :param url: the source_url to set
+    :return: the created Dataset
+    """
+
+    dataset = classes.Dataset("jh_dataset")
+    dataset.source_url = url
+    dataset.headers_key = ["Date", "Country/Region", "Recovered"]
+    dataset.filter_key = "Country/Region"
+    dataset.filter_val = "US"
+    dataset.match_field = "Date"
+    return dataset
+
+
+def create_country(dates):
+    """
+    creates the records of a country as split from the JHU combined dataset
+    :param dates: the date of each record
+    :return: the created dataframe
+    """
+
+    return pandas.DataFrame({
+        "Date": dates,
+        "Confirmed": list(range(1, len(dates) + 1)),
+        "Recovered": [0] * len(dates),
+        "Deaths": [0] * len(dates)
+    })
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+# internal modules
+import delta
+
+# external modules
+import helpers
+import json
+import unittest
+
+from moto import mock_aws
+
+
+class TestDelta(unittest.TestCase):
+    """class containing unit tests for delta.py"""
+
+    def test_fingerprints(self):
+        """
+        :return: pass or fail if the fingerprints are indexed by date and only differ when the values differ
+        """
+        print("test_fingerprints")
+        prints = delta.fingerprints(helpers.create_batch([10, 20, 10], [10, 20, 10], [1, None, 1]))
+        self.assertEqual(prints.index.tolist(), ["2020-09-11", "2020-09-12", "2020-09-13"])
+        self.assertEqual(prints.iloc[0], prints.iloc[2])
+        self.assertNotEqual(prints.iloc[0], prints.iloc[1])
+
+        # a missing count must not match a count of 0
+        self.assertNotEqual(
+            delta.fingerprints(helpers.create_batch([10], [10], [None])).iloc[0],
+            delta.fingerprints(helpers.create_batch([10], [10], [0])).iloc[0]
+        )
+
+    def test_changed1(self):
+        """
+        :return: pass or fail if every statistic is changed without a snapshot
+        """
+        print("test_changed1")
+        prints = delta.fingerprints(helpers.create_batch([10, 20, 30], [10, 20, 30], [1, 2, 3]))
+        self.assertEqual(delta.changed(prints, dict()).tolist(), [True, True, True])
+
+    def test_changed2(self):
+        """
+        :return: pass or fail if only new or changed statistics are changed against a snapshot
+        """
+        print("test_changed2")
+        snapshot = delta.fingerprints(helpers.create_batch([10, 20], [10, 20], [1, 2])).to_dict()
+        prints = delta.fingerprints(helpers.create_batch([10, 21, 30], [10, 21, 30], [1, 2, 3]))
+        self.assertEqual(delta.changed(prints, snapshot).tolist(), [False, True, True])
+
+    def test_changed3(self):
+        """
+        :return: pass or fail if only the last statistic of a duplicate date is changed
+        """
+        print("test_changed3")
+        batch = helpers.create_batch([10, 20], [10, 20], [1, 2])
+        batch.date[1] = batch.date[0]
+        prints = delta.fingerprints(batch)
+        self.assertEqual(delta.changed(prints, dict()).tolist(), [False, True])
+
+
+@mock_aws
+class TestDeltaSnapshot(unittest.TestCase):
+    """class containing unit tests for the snapshots in delta.py against a local S3 stand-in"""
+
+    def setUp(self):
+        """creates a bucket in the S3 stand-in"""
+        self.client = helpers.mock_bucket(self)
+
+    def test_read_snapshot(self):
+        """
+        :return: pass or fail if a missing snapshot reads as empty
+        """
+        print("test_read_snapshot")
+        self.assertEqual(delta.read_snapshot(), dict())
+
+    def test_write_snapshot(self):
+        """
+        :return: pass or fail if a written snapshot merges with the previous snapshot and reads back
+        """
+        print("test_write_snapshot")
+        prints = delta.fingerprints(helpers.create_batch([10, 20], [10, 20], [1, 2]))
+        delta.write_snapshot(prints, {"2020-01-01": "0", "2020-09-11": "0"})
+
+        snapshot = delta.read_snapshot()
+        self.assertEqual(snapshot, {"2020-01-01": "0", **prints.to_dict()})
+
+        body = self.client.get_object(Bucket="covid-stats-test", Key="Data/CovidStats.fingerprints.json")["Body"]
+        self.assertEqual(json.loads(body.read()), snapshot)
+
+        # the snapshot of another table is kept apart
+        self.assertEqual(delta.read_snapshot("CovidStatsMonthly"), dict())
+        delta.write_snapshot(prints, dict(), "CovidStatsMonthly")
+        self.assertEqual(delta.read_snapshot("CovidStatsMonthly"), prints.to_dict())
+        self.assertEqual(delta.read_snapshot(), snapshot)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+# internal modules
+import export
+
+# external modules
+import gzip
+import helpers
+import io
+import json
+import numpy
+import unittest
+
+
+class TestExport(unittest.TestCase):
+    """class containing unit tests for export.py"""
+
+    def test_JsonExport1(self):
+        """
+        :return: pass or fail if a compact JSON array matches the original indented export once parsed
+        """
+        print("test_JsonExport1")
+        batch = helpers.create_batch(range(5), range(5), start="2020-03-01")
+        json_exp = export.JsonExport(chunk_size=2)
+        json_exp.write(batch)
+        size = json_exp.close()
+
+        body = json_exp.buffer.read()
+        self.assertEqual(len(body), size)
+        self.assertEqual(json_exp.count, 5)
+        self.assertEqual(json_exp.file_name("CovidStats"), "CovidStats.json")
+        self.assertEqual(json.loads(body), json.loads(json.dumps(batch.to_json(), default=str, indent=4)))
+
+    def test_JsonExport2(self):
+        """
+        :return: pass or fail if NDJSON holds one record per line, also when written from CovidStat instances
+        """
+        print("test_JsonExport2")
+        stats = helpers.create_batch(range(3), range(3), start="2020-03-01").to_stats()
+        json_exp = export.JsonExport("ndjson", chunk_size=2)
+        json_exp.write(stats)
+        json_exp.close()
+
+        lines = json_exp.buffer.read().decode("utf-8").splitlines()
+        self.assertEqual(json_exp.file_name("CovidStats"), "CovidStats.ndjson")
+        self.assertEqual([json.loads(i)["idx"] for i in lines], [0, 1, 2])
+
+    def test_JsonExport3(self):
+        """
+        :return: pass or fail if gzip compresses the encoded records
+        """
+        print("test_JsonExport3")
+        batch = helpers.create_batch(range(500), range(500), start="2020-03-01")
+        json_exp = export.JsonExport(compress=True)
+        json_exp.write(batch)
+        size = json_exp.close()
+
+        body = json_exp.buffer.read()
+        self.assertEqual(json_exp.file_name("CovidStats"), "CovidStats.json.gz")
+        self.assertLess(size, len(gzip.decompress(body)))
+        self.assertEqual(len(json.loads(gzip.decompress(body))), 500)
+
+    def test_JsonExport4(self):
+        """
+        :return: pass or fail if no records encode an empty JSON array and an unknown format is rejected
+        """
+        print("test_JsonExport4")
+        json_exp = export.JsonExport()
+        json_exp.write([])
+        json_exp.close()
+        self.assertEqual(json_exp.buffer.read(), b"[]")
+
+        with self.assertRaises(ValueError):
+            export.JsonExport("csv")
+
+    def test_month_partitions(self):
+        """
+        :return: pass or fail if only the months holding a changed statistic are provided
+        """
+        print("test_month_partitions")
+        batch = helpers.create_batch(range(45), range(45), start="2020-03-01")
+        self.assertEqual([(y, m, len(p)) for y, m, p in export.month_partitions(batch)], [(2020, 3, 31), (2020, 4, 14)])
+
+        changed = numpy.zeros(45, dtype=bool)
+        changed[40] = True
+        partitions = export.month_partitions(batch, changed)
+        self.assertEqual([(y, m) for y, m, _ in partitions], [(2020, 4)])
+        self.assertEqual(partitions[0][2].idx.tolist(), list(range(31, 45)))
+
+    def test_parquet_bytes(self):
+        """
+        :return: pass or fail if Parquet holds the columns with dates and missing counts intact
+        """
+        print("test_parquet_bytes")
+        import pyarrow.parquet
+
+        batch = helpers.create_batch(range(3), range(3), start="2020-03-01")
+        table = pyarrow.parquet.read_table(io.BytesIO(export.parquet_bytes(batch)))
+        self.assertEqual(table.column_names, [
+            "idx", "date", "cases", "deaths", "recovered", "new_cases", "new_deaths",
+            "new_cases_avg7", "new_cases_avg14", "new_deaths_avg7", "new_deaths_avg14", "growth_rate"
+        ])
+        self.assertEqual(str(table.schema.field("date").type), "date32[day]")
+        self.assertEqual(table.column("cases").to_pylist(), [0, 1, 2])
+        self.assertEqual(table.column("recovered").to_pylist(), [None, None, None])
+        self.assertEqual(table.column("growth_rate").to_pylist(), [None, None, None])
+
+    def test_manifest(self):
+        """
+        :return: pass or fail if the manifest matches the layout of QuickSightManifest.json
+        """
+        print("test_manifest")
+        manifest = export.manifest("bucket", ["Data/a.parquet", "Data/b.parquet"], "PARQUET")
+        self.assertEqual(manifest["fileLocations"][0]["URIs"], [
+            "https://bucket.s3.amazonaws.com/Data/a.parquet",
+            "https://bucket.s3.amazonaws.com/Data/b.parquet"
+        ])
+        self.assertEqual(manifest["globalUploadSettings"]["format"], "PARQUET")
+
+
+if __name__ == '__main__':
+    unittest.main()
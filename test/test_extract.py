@@ -1,9 +1,16 @@
 # internal modules
+import classes
 import extract
 
 # external modules
+import http.server
+import tempfile
+import threading
+import time
 import unittest
 
+from urllib.parse import parse_qs, urlparse
+
 
 data_sample_url = "resources/DataSample.csv"
 
@@ -47,6 +54,297 @@ class TestExtract(unittest.TestCase):
         df = extract.extract(data_sample_url, columns=["date", "cases"], filter_key="date", filter_val="2020-03-01")
         self.assertEqual(df.shape, expected)
 
+    def test_extract5(self):
+        """
+        :return: pass or fail if the extract method reads in chunks with columns, filter_key, and filter_val
+        """
+        print("test_extract5")
+        expected = extract.extract(data_sample_url, columns=["cases", "deaths"], filter_key="deaths", filter_val=3)
+        df = extract.extract(data_sample_url, ["cases", "deaths"], "deaths", 3, chunksize=4)
+        self.assertEqual(df.shape, (1, 1))
+        self.assertEqual(df.columns.tolist(), expected.columns.tolist())
+        self.assertEqual(df["cases"].tolist(), expected["cases"].tolist())
+
+    def test_extract6(self):
+        """
+        :return: pass or fail if the extract method provides None when the chunks exceed the memory limit
+        """
+        print("test_extract6")
+        self.assertIsNotNone(extract.extract(data_sample_url, chunksize=4, memory_limit=1024 * 1024))
+        self.assertIsNone(extract.extract(data_sample_url, chunksize=4, memory_limit=1024))
+
+    def test_extract7(self):
+        """
+        :return: pass or fail if the extract method retains the records matching any of a list of filter_val
+        """
+        print("test_extract7")
+        df = extract.extract(data_sample_url, ["cases", "deaths"], "deaths", [3, 12], chunksize=4)
+        expected = extract.extract(data_sample_url, ["cases", "deaths"], "deaths", [3, 12])
+        self.assertEqual(df["cases"].tolist(), expected["cases"].tolist())
+        self.assertEqual(df["cases"].tolist(), [88, 161, 228])
+
+    def test_partition(self):
+        """
+        :return: pass or fail if a source filtered to several values is split into the records of each value
+        """
+        print("test_partition")
+
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as f:
+            f.write("Date,Country/Region,Province/State,Confirmed\n"
+                    "2020-03-01,US,,5\n2020-03-01,Canada,Ontario,1\n2020-03-01,Canada,Quebec,2\n"
+                    "2020-03-02,US,,7\n2020-03-02,France,,4\n")
+            f.flush()
+
+            df = extract.extract(f.name, ["Date", "Country/Region", "Confirmed"], "Country/Region", ["US", "Canada"], 2)
+
+        partitions = extract.partition(df, "Country/Region")
+        self.assertEqual(list(partitions), ["US", "Canada"])
+        self.assertEqual(partitions["US"].columns.tolist(), ["Date", "Confirmed"])
+        self.assertEqual(partitions["US"]["Confirmed"].tolist(), [5, 7])
+        self.assertEqual(partitions["Canada"]["Confirmed"].tolist(), [1, 2])
+
+
+class TestExtractDataset(unittest.TestCase):
+    """class containing unit tests for the cached extraction in extract.py"""
+
+    @classmethod
+    def setUpClass(cls):
+        """starts a local HTTP server serving the data sample"""
+        cls.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), DataSampleHandler)
+        cls.server_url = f"http://127.0.0.1:{cls.server.server_address[1]}/DataSample.csv"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        """stops the local HTTP server"""
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        """resets the requests seen by the local HTTP server"""
+        DataSampleHandler.requests = list()
+
+    def test_extract_dataset1(self):
+        """
+        :return: pass or fail if the extract_dataset method works without a cache_dir
+        """
+        print("test_extract_dataset1")
+        dataset = create_dataset(data_sample_url)
+        df = extract.extract_dataset(dataset)
+        self.assertEqual(df.shape, (31, 3))
+        self.assertIs(dataset.df, df)
+        self.assertTrue(dataset.modified)
+
+    def test_extract_dataset2(self):
+        """
+        :return: pass or fail if the extract_dataset method reuses the cached dataframe when not modified
+        """
+        print("test_extract_dataset2")
+        with tempfile.TemporaryDirectory() as cache_dir:
+            dataset = create_dataset(self.server_url)
+            extract.extract_dataset(dataset, cache_dir)
+            self.assertEqual(dataset.df.shape, (31, 3))
+            self.assertTrue(dataset.modified)
+
+            dataset = create_dataset(self.server_url)
+            extract.extract_dataset(dataset, cache_dir)
+            self.assertEqual(dataset.df.shape, (31, 3))
+            self.assertFalse(dataset.modified)
+
+        self.assertEqual(len(DataSampleHandler.requests), 2)
+        self.assertIsNone(DataSampleHandler.requests[0].get("If-None-Match"))
+        self.assertEqual(DataSampleHandler.requests[1].get("If-None-Match"), DataSampleHandler.etag)
+
+    def test_extract_dataset3(self):
+        """
+        :return: pass or fail if the extract_dataset method downloads again when the filters change
+        """
+        print("test_extract_dataset3")
+        with tempfile.TemporaryDirectory() as cache_dir:
+            dataset = create_dataset(self.server_url)
+            extract.extract_dataset(dataset, cache_dir)
+
+            dataset = create_dataset(self.server_url)
+            dataset.filter_key = "date"
+            dataset.filter_val = "2020-03-01"
+            extract.extract_dataset(dataset, cache_dir)
+            self.assertEqual(dataset.df.shape, (1, 2))
+            self.assertTrue(dataset.modified)
+
+        self.assertIsNone(DataSampleHandler.requests[1].get("If-None-Match"))
+
+    def test_extract_dataset4(self):
+        """
+        :return: pass or fail if the extract_dataset method provides None when the source is missing
+        """
+        print("test_extract_dataset4")
+        with tempfile.TemporaryDirectory() as cache_dir:
+            dataset = create_dataset(self.server_url.replace("DataSample", "Missing"))
+            self.assertIsNone(extract.extract_dataset(dataset, cache_dir))
+            self.assertIsNone(dataset.df)
+
+    def test_extract_dataset5(self):
+        """
+        :return: pass or fail if the extract_dataset method stops reading a slow source at its timeout without a cache
+        """
+        print("test_extract_dataset5")
+        dataset = create_dataset(f"{self.server_url}?delay=2")
+
+        started = time.monotonic()
+        self.assertIsNone(extract.extract_dataset(dataset, None, 0.3))
+        self.assertLess(time.monotonic() - started, 1.5)
+
+        dataset = create_dataset(self.server_url)
+        self.assertEqual(extract.extract_dataset(dataset).shape, (31, 3))
+        self.assertTrue(dataset.modified)
+
+    def test_open_source(self):
+        """
+        :return: pass or fail if a source read in chunks is only skipped once its validators are written
+        """
+        print("test_open_source")
+        with tempfile.TemporaryDirectory() as cache_dir:
+            dataset = create_dataset(self.server_url)
+            source, validators = extract.open_source(dataset, cache_dir)
+            with source:
+                rows = sum(read for read, _ in extract.read_chunks(source, None, None, None, 10))
+
+            self.assertEqual(rows, 31)
+            self.assertTrue(dataset.modified)
+
+            # an unfinished run does not write the validators, so the next run reads the source again
+            source, _ = extract.open_source(dataset, cache_dir)
+            source.close()
+            self.assertTrue(dataset.modified)
+
+            extract.write_validators(cache_dir, validators)
+            self.assertEqual(extract.open_source(dataset, cache_dir), (None, None))
+            self.assertFalse(dataset.modified)
+
+        self.assertIsNone(DataSampleHandler.requests[1].get("If-None-Match"))
+        self.assertEqual(DataSampleHandler.requests[2].get("If-None-Match"), DataSampleHandler.etag)
+
+    def test_forget(self):
+        """
+        :return: pass or fail if a forgotten source is read again as modified, so an unfinished load is resumed
+        """
+        print("test_forget")
+        with tempfile.TemporaryDirectory() as cache_dir:
+            dataset = create_dataset(self.server_url)
+            extract.extract_dataset(dataset, cache_dir)
+            extract.extract_dataset(dataset, cache_dir)
+            self.assertFalse(dataset.modified)
+
+            extract.forget([dataset], cache_dir)
+            extract.extract_dataset(dataset, cache_dir)
+            self.assertTrue(dataset.modified)
+            self.assertEqual(dataset.df.shape, (31, 3))
+
+        self.assertIsNone(DataSampleHandler.requests[2].get("If-None-Match"))
+
+    def test_extract_all1(self):
+        """
+        :return: pass or fail if the extract_all method extracts slow sources concurrently
+        """
+        print("test_extract_all1")
+        delay = 0.5
+
+        started = time.monotonic()
+        for dataset in [create_dataset(f"{self.server_url}?delay={delay}") for _ in range(2)]:
+            extract.extract_dataset(dataset)
+
+        serial = time.monotonic() - started
+
+        datasets = [create_dataset(f"{self.server_url}?delay={delay}") for _ in range(2)]
+        started = time.monotonic()
+        dfs = extract.extract_all(datasets)
+        concurrent = time.monotonic() - started
+
+        print(f"serial: {serial:.3f}s, concurrent: {concurrent:.3f}s")
+        self.assertEqual([df.shape for df in dfs], [(31, 3), (31, 3)])
+        self.assertGreaterEqual(serial, 2 * delay)
+        self.assertLess(concurrent, 1.5 * delay)
+
+    def test_extract_all2(self):
+        """
+        :return: pass or fail if the extract_all method provides None for a source that runs past its timeout
+        """
+        print("test_extract_all2")
+        slow = create_dataset(f"{self.server_url}?delay=2")
+        slow.timeout = 0.3
+        fast = create_dataset(self.server_url)
+
+        started = time.monotonic()
+        dfs = extract.extract_all([slow, fast], timeout=5)
+        self.assertLess(time.monotonic() - started, 1.5)
+
+        self.assertIsNone(dfs[0])
+        self.assertIsNone(slow.df)
+        self.assertEqual(fast.df.shape, (31, 3))
+
+    def test_extract_all3(self):
+        """
+        :return: pass or fail if the extract_all method provides None for a source that fails
+        """
+        print("test_extract_all3")
+        missing = create_dataset(self.server_url.replace("DataSample", "Missing"))
+        local = create_dataset(data_sample_url)
+
+        dfs = extract.extract_all([missing, local])
+        self.assertIsNone(dfs[0])
+        self.assertEqual(dfs[1].shape, (31, 3))
+
+
+class DataSampleHandler(http.server.BaseHTTPRequestHandler):
+    """class to serve the data sample with an ETag from a local HTTP server"""
+
+    etag = '"data-sample"'
+    requests = list()
+
+    def do_GET(self):
+        """serves the data sample, or 304 when the client already holds the current version"""
+        DataSampleHandler.requests.append(self.headers)
+
+        url = urlparse(self.path)
+        if url.path != "/DataSample.csv":
+            self.send_error(404)
+            return
+
+        time.sleep(float(parse_qs(url.query).get("delay", ["0"])[0]))
+
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        with open(data_sample_url, "rb") as f:
+            body = f.read()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", self.etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """silences the request log"""
+
+
+def create_dataset(url):
+    """
+    creates a dataset for the data sample at the provided url
+    :param url: the source_url to set
+    :return: the created Dataset
+    """
+
+    dataset = classes.Dataset("sample")
+    dataset.headers_all = ["date", "cases", "deaths"]
+    dataset.headers_key = dataset.headers_all
+    dataset.match_field = "date"
+    dataset.source_url = url
+    return dataset
+
 
 if __name__ == '__main__':
     unittest.main()
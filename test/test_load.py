@@ -1,12 +1,25 @@
 # internal modules
+import classes
+import clients
+import delta
 import load
+import metrics
 
 # external modules
+import boto3
 import datetime
+import gzip
+import helpers
+import json
 import marshmallow_dataclass
+import numpy
 import random
 import unittest
 
+from botocore.exceptions import ClientError
+from moto import mock_aws
+from unittest import mock
+
 
 epoch = datetime.datetime.utcfromtimestamp(0)
 
@@ -44,6 +57,330 @@ class TestLoad(unittest.TestCase):
         self.assertEqual(len(load_response), size)
 
 
+@mock_aws
+class TestLoadBatch(unittest.TestCase):
+    """class containing unit tests for the batched load in load.py against a local DynamoDB stand-in"""
+
+    def setUp(self):
+        """creates the CovidStatsTest table in the DynamoDB stand-in"""
+        self.client = boto3.client("dynamodb", region_name="us-east-1")
+        self.client.create_table(
+            TableName=CovidStatTest.table_name,
+            AttributeDefinitions=[{"AttributeName": "date", "AttributeType": "S"}],
+            KeySchema=[{"AttributeName": "date", "KeyType": "HASH"}],
+            BillingMode="PAY_PER_REQUEST"
+        )
+        patcher = mock.patch.dict(clients.cache, {"dynamodb": self.client})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_load_batch1(self):
+        """
+        :return: pass or fail if the load_batch method writes every record across several batches
+        """
+        print("test_load_batch1")
+        size = 60
+        records = create_unique_instances(size)
+
+        self.assertEqual(load.load_batch(CovidStatTest, records), size)
+        self.assertEqual(self.client.scan(TableName=CovidStatTest.table_name)["Count"], size)
+
+    def test_load_batch2(self):
+        """
+        :return: pass or fail if the load_batch method keeps the last record for a duplicate key within a batch
+        """
+        print("test_load_batch2")
+        records = create_unique_instances(3)
+        records[2].date = records[0].date
+
+        self.assertEqual(load.load_batch(CovidStatTest, records), 2)
+        item = self.client.get_item(TableName=CovidStatTest.table_name, Key={"date": {"S": str(records[0].date)}})
+        self.assertEqual(item["Item"]["cases"]["N"], str(records[2].cases))
+
+    def test_load_batch3(self):
+        """
+        :return: pass or fail if the load_batch method resubmits unprocessed items
+        """
+        print("test_load_batch3")
+        records = create_unique_instances(5)
+        write = self.client.batch_write_item
+
+        def partial_write(RequestItems, **kwargs):
+            requests = RequestItems[CovidStatTest.table_name]
+            write(RequestItems={CovidStatTest.table_name: requests[:2]})
+            return {"UnprocessedItems": {CovidStatTest.table_name: requests[2:]} if len(requests) > 2 else {}}
+
+        with mock.patch.object(self.client, "batch_write_item", side_effect=partial_write) as batch_write_item, \
+                mock.patch.object(load.time, "sleep") as sleep:
+            self.assertEqual(load.load_batch(CovidStatTest, records), 5)
+
+        self.assertEqual(batch_write_item.call_count, 3)
+        self.assertEqual(sleep.call_count, 2)
+        self.assertEqual(self.client.scan(TableName=CovidStatTest.table_name)["Count"], 5)
+
+    def test_load_batch4(self):
+        """
+        :return: pass or fail if the load_batch method reports the records written when items stay unprocessed
+        """
+        print("test_load_batch4")
+        records = create_unique_instances(30)
+
+        def stuck_write(RequestItems, **kwargs):
+            return {"UnprocessedItems": RequestItems}
+
+        with mock.patch.object(self.client, "batch_write_item", side_effect=stuck_write), \
+                mock.patch.object(load.time, "sleep"), \
+                mock.patch.object(load, "publish_message") as publish_message:
+            self.assertEqual(load.load_batch(CovidStatTest, records), 0)
+
+        subject, message = publish_message.call_args[0]
+        self.assertEqual(subject, "CGC0920: Data Load Failure")
+        self.assertTrue(message.startswith("FAILURE! Loaded 0/30 Record(s) into CovidStatsTest"))
+
+    def test_load_batch5(self):
+        """
+        :return: pass or fail if the load_batch method writes every record with concurrent workers and a rate limit
+        """
+        print("test_load_batch5")
+        size = 130
+        records = create_unique_instances(size)
+
+        with mock.patch.object(load.throttle.TokenBucket, "acquire", autospec=True, return_value=0) as acquire:
+            self.assertEqual(load.load_batch(CovidStatTest, records, workers=4, rate=50), size)
+
+        self.assertEqual(acquire.call_count, 6)
+        self.assertEqual(self.client.scan(TableName=CovidStatTest.table_name)["Count"], size)
+
+    def test_load_batch6(self):
+        """
+        :return: pass or fail if the load_batch method records its stages and the consumed capacity
+        """
+        print("test_load_batch6")
+        size = 30
+        run = metrics.reset()
+
+        self.assertEqual(load.load_batch(CovidStatTest, create_unique_instances(size)), size)
+
+        record = run.record()
+        self.assertEqual(record["stages"]["serialize"]["rows"], size)
+        self.assertEqual(record["stages"]["dynamodb.write"]["rows"], size)
+        self.assertGreater(record["counters"]["dynamodb.consumed_capacity"], 0)
+        self.assertEqual(record["counters"]["dynamodb.unprocessed"], 0)
+
+    def test_load_batch7(self):
+        """
+        :return: pass or fail if the load_batch method stops at the deadline with the leading records written
+        """
+        print("test_load_batch7")
+        records = create_unique_instances(60)
+        progress = dict()
+
+        with mock.patch.object(load, "time") as clock:
+            clock.monotonic.side_effect = [0, 0, 100]
+            self.assertEqual(load.load_batch(CovidStatTest, records, workers=1, deadline=50, progress=progress), 50)
+
+        self.assertEqual(progress, {"done": 50, "stopped": True})
+
+        progress = dict()
+        self.assertEqual(load.load_batch(CovidStatTest, records[50:], progress=progress), 10)
+        self.assertEqual(progress, {"done": 10, "stopped": False})
+        self.assertEqual(self.client.scan(TableName=CovidStatTest.table_name)["Count"], 60)
+
+    def test_load_batch8(self):
+        """
+        :return: pass or fail if the load_batch method serializes a chunk at a time and holds a bounded window
+        """
+        print("test_load_batch8")
+        size = load.serialize_size + 50
+        run = metrics.reset()
+
+        self.assertEqual(load.load_batch(CovidStatTest, create_unique_instances(size), workers=2), size)
+        self.assertEqual(run.record()["stages"]["serialize"]["rows"], size)
+
+        taken = list()
+        written = list()
+
+        def batches():
+            for i in range(20):
+                # batches are only taken once there is room in the window of twice the workers
+                self.assertLessEqual(len(taken) - len(written), 4)
+                taken.append(i)
+                yield [{"date": {"S": f"2020-01-{i + 1:02d}"}}]
+
+        def write_batch(table_name, items, bucket):
+            written.append(items)
+            return len(items)
+
+        with mock.patch.object(load, "write_batch", write_batch):
+            self.assertEqual(load.write_batches(CovidStatTest.table_name, batches(), 2, None), (20, None, 20))
+
+    def test_load_batch9(self):
+        """
+        :return: pass or fail if the load_batch method reports every record when a load of several batches fails
+        """
+        print("test_load_batch9")
+        records = create_unique_instances(130)
+
+        def failed_write(RequestItems, **kwargs):
+            raise ClientError({"Error": {"Code": "ValidationException", "Message": "failed"}}, "BatchWriteItem")
+
+        with mock.patch.object(self.client, "batch_write_item", side_effect=failed_write), \
+                mock.patch.object(load, "publish_message") as publish_message, \
+                mock.patch("builtins.print") as printed:
+            self.assertEqual(load.load_batch(CovidStatTest, records, workers=1), 0)
+
+        subject, message = publish_message.call_args[0]
+        self.assertEqual(subject, "CGC0920: Data Load Failure")
+        self.assertTrue(message.startswith("FAILURE! Loaded 0/130 Record(s) into CovidStatsTest"))
+        self.assertFalse(any("duplicate" in str(c) for c in printed.call_args_list))
+
+    def test_load_batch10(self):
+        """
+        :return: pass or fail if the load_batch method logs a load with no records without publishing it
+        """
+        print("test_load_batch10")
+        with mock.patch.object(load, "publish_message") as publish_message, \
+                mock.patch("builtins.print") as printed:
+            self.assertEqual(load.load_batch(CovidStatTest, []), 0)
+
+        publish_message.assert_not_called()
+        self.assertIn(mock.call("INFO: SUCCESS! Loaded 0/0 Record(s) into CovidStatsTest"), printed.call_args_list)
+
+        with mock.patch.object(load, "publish_message") as publish_message:
+            load.load_batch(CovidStatTest, create_unique_instances(3))
+
+        self.assertEqual(publish_message.call_args[0][0], "CGC0920: Data Load Success")
+
+    def test_table_write_rate(self):
+        """
+        :return: pass or fail if the table_write_rate method provides the provisioned capacity only
+        """
+        print("test_table_write_rate")
+        self.assertIsNone(load.table_write_rate(CovidStatTest.table_name))
+        self.assertIsNone(load.table_write_rate("MissingTable"))
+
+        self.client.create_table(
+            TableName="ProvisionedTable",
+            AttributeDefinitions=[{"AttributeName": "date", "AttributeType": "S"}],
+            KeySchema=[{"AttributeName": "date", "KeyType": "HASH"}],
+            ProvisionedThroughput={"ReadCapacityUnits": 5, "WriteCapacityUnits": 5}
+        )
+        self.assertEqual(load.table_write_rate("ProvisionedTable"), 5)
+
+
+@mock_aws
+class TestLoadJson(unittest.TestCase):
+    """class containing unit tests for the S3 export in load.py against a local S3 stand-in"""
+
+    def setUp(self):
+        """creates a bucket in the S3 stand-in"""
+        self.client = helpers.mock_bucket(self)
+
+    def test_load_json1(self):
+        """
+        :return: pass or fail if the load_json method uploads the records as a JSON array to the original key
+        """
+        print("test_load_json1")
+        records = [create_covid_stat(i) for i in range(3)]
+        size = load.load_json(records)
+
+        body = self.client.get_object(Bucket="covid-stats-test", Key="Data/CovidStats.json")["Body"].read()
+        self.assertEqual(size, len(body))
+        self.assertEqual(json.loads(body), json.loads(json.dumps([r.to_json() for r in records], default=str)))
+
+    def test_load_json2(self):
+        """
+        :return: pass or fail if the load_json method uploads gzip NDJSON to a key with matching extensions
+        """
+        print("test_load_json2")
+        records = [create_covid_stat(i) for i in range(3)]
+        size = load.load_json(records, "ndjson", True)
+
+        obj = self.client.get_object(Bucket="covid-stats-test", Key="Data/CovidStats.ndjson.gz")
+        body = obj["Body"].read()
+        self.assertEqual(size, len(body))
+        self.assertEqual(obj["ContentType"], "application/gzip")
+        self.assertEqual(len(gzip.decompress(body).splitlines()), 3)
+
+    def test_load_parquet1(self):
+        """
+        :return: pass or fail if the load_parquet method rewrites only the changed months and lists every month
+        """
+        print("test_load_parquet1")
+        dates = numpy.datetime64("2020-03-01") + numpy.arange(45)
+        batch = classes.CovidStatBatch(range(45), dates, range(45), range(45), None)
+        changed = numpy.zeros(45, dtype=bool)
+        changed[40] = True
+
+        self.assertEqual(len(load.load_parquet(batch)), 2)
+        keys = load.load_parquet(batch, changed)
+        self.assertEqual(keys, ["Data/CovidStats/year=2020/month=04/CovidStats.parquet"])
+
+        body = self.client.get_object(Bucket="covid-stats-test", Key="Data/CovidStats.parquet.manifest.json")["Body"]
+        self.assertEqual(json.loads(body.read())["fileLocations"][0]["URIs"], [
+            "https://covid-stats-test.s3.amazonaws.com/Data/CovidStats/year=2020/month=03/CovidStats.parquet",
+            "https://covid-stats-test.s3.amazonaws.com/Data/CovidStats/year=2020/month=04/CovidStats.parquet"
+        ])
+
+    def test_load_parquet2(self):
+        """
+        :return: pass or fail if the months missing from the bucket are written with the changed months, such as
+            once the export is enabled after a delta snapshot was taken, and a failed month is left out of the manifest
+        """
+        print("test_load_parquet2")
+        batch = helpers.create_batch(range(45), range(45), start="2020-03-01")
+        snapshot = delta.fingerprints(batch[:40]).to_dict()
+        changed = delta.changed(delta.fingerprints(batch), snapshot)
+        put_object = self.client.put_object
+
+        def failing(**kwargs):
+            if "month=03" in kwargs["Key"]:
+                raise ClientError({"Error": {"Code": "InternalError", "Message": "failed"}}, "PutObject")
+
+            return put_object(**kwargs)
+
+        with mock.patch.object(self.client, "put_object", side_effect=failing):
+            keys = load.load_parquet(batch, changed)
+
+        self.assertEqual(keys, ["Data/CovidStats/year=2020/month=04/CovidStats.parquet"])
+        body = self.client.get_object(Bucket="covid-stats-test", Key="Data/CovidStats.parquet.manifest.json")["Body"]
+        self.assertEqual(json.loads(body.read())["fileLocations"][0]["URIs"], [
+            "https://covid-stats-test.s3.amazonaws.com/Data/CovidStats/year=2020/month=04/CovidStats.parquet"
+        ])
+
+        # the next run with no change repairs the failed month alone
+        keys = load.load_parquet(batch, numpy.zeros(45, dtype=bool))
+        self.assertEqual(keys, ["Data/CovidStats/year=2020/month=03/CovidStats.parquet"])
+
+def create_covid_stat(idx):
+    """
+    creates a CovidStat instance on a day from 2020-03-01
+    :param idx: the idx, and days after 2020-03-01, to set
+    :return: the created CovidStat instance
+    """
+    inst = classes.CovidStat(idx)
+    inst.date = datetime.datetime(2020, 3, 1) + datetime.timedelta(days=idx)
+    inst.cases = idx * 100
+    inst.deaths = idx
+    inst.recovered = None
+    return inst
+
+
+def create_unique_instances(size):
+    """
+    creates CovidStatTest instances with random values on distinct days
+    :param size: the number of instances to create
+    :return: the created CovidStatTest instances
+    """
+    records = list()
+    for i in range(size):
+        inst = create_random_instance()
+        inst.date = datetime.datetime(2020, 1, 1) + datetime.timedelta(days=i)
+        records.append(inst)
+
+    return records
+
+
 def create_random_instance():
     """
     creates a CovidStatTest instance with random values
@@ -0,0 +1,118 @@
+# internal modules
+import metrics
+
+# external modules
+import contextlib
+import io
+import json
+import unittest
+
+from unittest import mock
+
+
+class TestMetrics(unittest.TestCase):
+    """class containing unit tests for metrics.py"""
+
+    def test_stage(self):
+        """
+        :return: pass or fail if repeated stages add up their seconds and measures
+        """
+        print("test_stage")
+        clock = iter([0.0, 1.0, 3.0, 4.0, 5.0, 10.0])
+        run = metrics.Metrics(clock=lambda: next(clock))
+
+        for rows in (100, 300):
+            with run.stage("merge") as stage:
+                stage["rows"] = rows
+
+        record = run.record()
+        self.assertEqual(record["stages"]["merge"], {"rows": 400, "seconds": 3.0, "rows_per_sec": 400 / 3.0})
+        self.assertEqual(record["seconds"], 10.0)
+
+    def test_count(self):
+        """
+        :return: pass or fail if counters add up and start at 0
+        """
+        print("test_count")
+        run = metrics.Metrics()
+        run.count("dynamodb.consumed_capacity", 25)
+        run.count("dynamodb.consumed_capacity", 0.5)
+        run.count("dynamodb.throttled")
+        self.assertEqual(run.record()["counters"], {"dynamodb.consumed_capacity": 25.5, "dynamodb.throttled": 1})
+
+    def test_observe(self):
+        """
+        :return: pass or fail if distributions are summarized by nearest rank percentiles and carry their units
+        """
+        print("test_observe")
+        run = metrics.Metrics()
+        self.assertNotIn("distributions", run.record())
+
+        for ms in range(100, 0, -1):
+            run.observe("dynamodb.batch_write_item.ms", ms)
+
+        summary = run.record()["distributions"]["dynamodb.batch_write_item.ms"]
+        self.assertEqual(summary, {"count": 100, "total": 5050, "max": 100, "p50": 50, "p95": 95, "p99": 99})
+
+        document = run.emf()
+        definitions = {d["Name"]: d["Unit"] for d in document["_aws"]["CloudWatchMetrics"][0]["Metrics"]}
+        self.assertEqual(document["dynamodb.batch_write_item.ms.p99"], 99)
+        self.assertEqual(definitions["dynamodb.batch_write_item.ms.p99"], "Milliseconds")
+        self.assertEqual(definitions["dynamodb.batch_write_item.ms.count"], "Count")
+
+    def test_emf(self):
+        """
+        :return: pass or fail if the record is flattened into the Embedded Metric Format with units
+        """
+        print("test_emf")
+        run = metrics.Metrics()
+
+        with run.stage("s3.json") as stage:
+            stage.update(rows=10, bytes=2048)
+
+        run.count("dynamodb.consumed_capacity", 5)
+        document = run.emf()
+
+        definitions = {d["Name"]: d["Unit"] for d in document["_aws"]["CloudWatchMetrics"][0]["Metrics"]}
+        self.assertEqual(definitions["s3.json.bytes"], "Bytes")
+        self.assertEqual(definitions["s3.json.seconds"], "Seconds")
+        self.assertEqual(definitions["s3.json.rows_per_sec"], "Count/Second")
+        self.assertEqual(definitions["dynamodb.consumed_capacity"], "Count")
+        self.assertEqual(document["s3.json.bytes"], 2048)
+        self.assertEqual(document["FunctionName"], "local")
+
+        # every metric has a value in the document
+        self.assertTrue(all(name in document for name in definitions))
+
+    def test_emit(self):
+        """
+        :return: pass or fail if a run is printed as a single line of JSON, or not at all
+        """
+        print("test_emit")
+        run = metrics.Metrics()
+        output = io.StringIO()
+
+        with contextlib.redirect_stdout(output):
+            self.assertIsNone(run.emit("none"))
+            run.emit("json")
+
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertIn("stages", json.loads(lines[0])["metrics"])
+
+    def test_enabled(self):
+        """
+        :return: pass or fail if only messages at or above the log level are enabled
+        """
+        print("test_enabled")
+
+        with mock.patch.object(metrics, "log_level", "INFO"):
+            self.assertFalse(metrics.enabled("DEBUG"))
+            self.assertTrue(metrics.enabled("WARN"))
+
+        with mock.patch.object(metrics, "log_level", "DEBUG"):
+            self.assertTrue(metrics.enabled("DEBUG"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+# internal modules
+import clients
+import load
+import monthly
+
+# external modules
+import boto3
+import helpers
+import numpy
+import pandas
+import unittest
+
+from moto import mock_aws
+from unittest import mock
+
+
+class TestMonthly(unittest.TestCase):
+    """class containing unit tests for monthly.py"""
+
+    def test_pack(self):
+        """
+        :return: pass or fail if a month is packed into one item with a slot per day
+        """
+        print("test_pack")
+        months = monthly.pack(create_months_batch())
+        self.assertEqual([i["month"]["S"] for i in months.to_items()], ["2020-08", "2020-09", "2020-10"])
+        self.assertEqual(months.to_items()[1]["days"], {"N": "30"})
+        self.assertEqual(len(months.to_items()[1]["cases"]["B"]), 30 * 8)
+
+        changed = numpy.zeros(len(create_months_batch()), dtype=bool)
+        changed[-1] = True
+        months = monthly.pack(create_months_batch(), changed)
+        self.assertEqual([i["month"]["S"] for i in months.to_items()], ["2020-10"])
+
+    def test_unpack(self):
+        """
+        :return: pass or fail if unpacked months hold the same statistics, with missing days and counts intact
+        """
+        print("test_unpack")
+        batch = create_months_batch()
+        unpacked = monthly.unpack(monthly.pack(batch).to_items()[::-1])
+        self.assertEqual(unpacked.to_json(), batch.to_json())
+
+
+@mock_aws
+class TestMonthlyLoad(unittest.TestCase):
+    """class containing unit tests for the monthly layout in monthly.py against a local DynamoDB stand-in"""
+
+    def setUp(self):
+        """creates the CovidStatsMonthly table in the DynamoDB stand-in"""
+        self.client = boto3.client("dynamodb", region_name="us-east-1")
+        self.client.create_table(
+            TableName=monthly.CovidStatMonths.table_name,
+            AttributeDefinitions=[{"AttributeName": "month", "AttributeType": "S"}],
+            KeySchema=[{"AttributeName": "month", "KeyType": "HASH"}],
+            BillingMode="PAY_PER_REQUEST"
+        )
+        patcher = mock.patch.dict(clients.cache, {"dynamodb": self.client})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_read(self):
+        """
+        :return: pass or fail if a date and a date range read back from the months loaded
+        """
+        print("test_read")
+        batch = create_months_batch()
+        self.assertEqual(load.load_batch(monthly.CovidStatMonths, monthly.pack(batch), publish=False), 3)
+
+        self.assertEqual(monthly.read("2020-09-02").to_json(), batch[2:3].to_json())
+        self.assertEqual(monthly.read("2020-08-31", "2020-10-01").to_json(), batch[1:].to_json())
+        self.assertEqual(len(monthly.read("2021-01-01", "2021-02-01")), 0)
+
+
+def create_months_batch():
+    """
+    creates a CovidStatBatch across three months, with a missing day, a missing count and derived values
+    :return: the created CovidStatBatch
+    """
+    dates = pandas.to_datetime(["2020-08-30", "2020-08-31", "2020-09-02", "2020-09-30", "2020-10-01"])
+    return helpers.create_batch(
+        [10, 20, 40, 50, 60], [1, 2, 3, None, 5], dates=dates,
+        derived={"new_cases": [None, 10, None, 10, 10], "growth_rate": [0.5, None, -0.25, 0.0, 1.5]}
+    )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+# internal modules
+import registry
+
+# external modules
+import json
+import tempfile
+import unittest
+
+
+class TestRegistry(unittest.TestCase):
+    """class containing unit tests for registry.py"""
+
+    def test_load_datasets1(self):
+        """
+        :return: pass or fail if the shipped registry describes the NYT primary and the filtered JHU dataset
+        """
+        print("test_load_datasets1")
+        ny_dataset, jh_dataset = registry.load_datasets()
+
+        self.assertEqual(ny_dataset.name, "ny_dataset")
+        self.assertEqual(ny_dataset.match_field, "date")
+        self.assertEqual(ny_dataset.headers_key, ["date", "cases", "deaths"])
+
+        self.assertEqual(jh_dataset.name, "jh_dataset")
+        self.assertEqual(jh_dataset.match_field, "Date")
+        self.assertEqual(jh_dataset.headers_key, ["Date", "Country/Region", "Recovered"])
+        self.assertEqual((jh_dataset.filter_key, jh_dataset.filter_val), ("Country/Region", "US"))
+        self.assertEqual(jh_dataset.memory_limit, 32 * 1024 * 1024)
+
+    def test_load_datasets2(self):
+        """
+        :return: pass or fail if a configured registry is read in order with its column mappings
+        """
+        print("test_load_datasets2")
+
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as f:
+            json.dump({"datasets": [
+                {"name": "ds1", "headers_all": ["date", "cases"], "match_field": "date"},
+                {"name": "ds2", "headers_all": ["Day", "Tests"], "match_field": "Day", "columns": {"Tests": "tests"}}
+            ]}, f)
+            f.flush()
+
+            ds1, ds2 = registry.load_datasets(f.name)
+
+        self.assertEqual(ds1.headers_key, ["date", "cases"])
+        self.assertEqual(ds2.columns, {"Tests": "tests"})
+        self.assertTrue(ds2.modified)
+        self.assertIsNone(ds2.df)
+
+    def test_load_county_dataset(self):
+        """
+        :return: pass or fail if the county dataset is read in chunks, and is None when not in the registry
+        """
+        print("test_load_county_dataset")
+        county_dataset = registry.load_county_dataset()
+        self.assertEqual(county_dataset.headers_key, ["date", "county", "state", "fips", "cases", "deaths"])
+        self.assertIsNotNone(county_dataset.chunksize)
+
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as f:
+            json.dump({"datasets": []}, f)
+            f.flush()
+
+            self.assertIsNone(registry.load_county_dataset(f.name))
+
+    def test_create_dataset(self):
+        """
+        :return: pass or fail if entries without a name or with unknown attributes are rejected
+        """
+        print("test_create_dataset")
+
+        with self.assertRaises(ValueError):
+            registry.create_dataset({"source_url": "https://example.com/data.csv"})
+
+        with self.assertRaises(ValueError):
+            registry.create_dataset({"name": "ds1", "source": "https://example.com/data.csv"})
+
+        with self.assertRaises(ValueError):
+            registry.create_dataset({"name": "ds1", "df": None})
+
+
+if __name__ == '__main__':
+    unittest.main()
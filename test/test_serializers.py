@@ -0,0 +1,115 @@
+# internal modules
+import classes
+import serializers
+
+# external modules
+import datetime
+import decimal
+import marshmallow
+import marshmallow_dataclass
+import unittest
+
+from boto3.dynamodb.types import TypeSerializer
+from test_load import CovidStatTest, create_random_instance
+
+
+@marshmallow_dataclass.dataclass
+class CovidStatFallback:
+    """class to test the fields serialized without a fast path"""
+
+    table_name = "CovidStatsFallback"
+
+    date: marshmallow_dataclass.NewType("date", str, marshmallow.fields.Date)
+    ratio: decimal.Decimal
+    tags: list
+    when: datetime.datetime
+
+    def __init__(self):
+        """constructs a CovidStatFallback instance"""
+
+
+class TestSerializers(unittest.TestCase):
+    """class containing unit tests for serializers.py"""
+
+    def assertConforms(self, dataclass, records):
+        """
+        asserts the compiled serializer matches dumping the Schema through a TypeSerializer
+        :param dataclass: the dataclass of the records
+        :param records: the records to serialize
+        :return: None
+        """
+        schema = dataclass.Schema()
+        serializer = TypeSerializer()
+        serialize = serializers.get(dataclass)
+
+        for record in records:
+            expected = {k: serializer.serialize(v) for k, v in schema.dump(record).items() if v != ""}
+            self.assertEqual(serialize(record), expected)
+
+    def test_get(self):
+        """
+        :return: pass or fail if the serializer is compiled once per dataclass
+        """
+        print("test_get")
+        self.assertIs(serializers.get(classes.CovidStat), serializers.get(classes.CovidStat))
+        self.assertIsNot(serializers.get(classes.CovidStat), serializers.get(CovidStatTest))
+
+    def test_conformance1(self):
+        """
+        :return: pass or fail if CovidStat instances, with and without missing counts, serialize as before
+        """
+        print("test_conformance1")
+        complete = classes.CovidStat(1)
+        complete.date = datetime.datetime(2020, 9, 18)
+        complete.cases = 6000000
+        complete.deaths = 190000
+        complete.recovered = 2000000
+
+        partial = classes.CovidStat(2)
+        partial.date = datetime.datetime(2020, 9, 19)
+        partial.cases = 6100000
+        partial.deaths = None
+        partial.recovered = None
+
+        batch = classes.CovidStatBatch([3, 4], ["2020-09-20", "2020-09-21"], [1, 2], [3, 4], [5.0, float("nan")])
+        self.assertConforms(classes.CovidStat, [complete, partial, classes.CovidStat(5)] + list(batch))
+
+    def test_conformance2(self):
+        """
+        :return: pass or fail if CovidStatTest instances, with float and datetime values, serialize as before
+        """
+        print("test_conformance2")
+        empty = create_random_instance()
+        empty.date = ""
+        self.assertConforms(CovidStatTest, [create_random_instance() for _ in range(10)] + [empty])
+
+    def test_conformance3(self):
+        """
+        :return: pass or fail if fields without a fast path serialize as before
+        """
+        print("test_conformance3")
+        record = CovidStatFallback()
+        record.date = datetime.date(2020, 9, 18)
+        record.ratio = decimal.Decimal("0.25")
+        record.tags = ["a", "b"]
+        record.when = datetime.datetime(2020, 9, 18, 10, 30)
+        self.assertConforms(CovidStatFallback, [record])
+
+    def test_conformance4(self):
+        """
+        :return: pass or fail if CovidStat instances with derived rates serialize as before
+        """
+        print("test_conformance4")
+        record = classes.CovidStat(1)
+        record.date = datetime.date(2020, 9, 18)
+        record.cases = 6000000
+        record.new_cases = 40000
+        record.new_cases_avg7 = 38123.4286
+        record.new_deaths_avg14 = 0.1
+        record.growth_rate = -0.0312
+        self.assertConforms(classes.CovidStat, [record])
+        self.assertEqual(serializers.get(classes.CovidStat)(record)["new_deaths_avg14"], {"N": "0.1000"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+# internal modules
+import stream
+
+# external modules
+import threading
+import unittest
+
+
+class TestStream(unittest.TestCase):
+    """class containing unit tests for stream.py"""
+
+    def test_prefetch1(self):
+        """
+        :return: pass or fail if every item is consumed in order, with and without a depth
+        """
+        print("test_prefetch1")
+        self.assertEqual(list(stream.prefetch(range(10), 2)), list(range(10)))
+        self.assertEqual(list(stream.prefetch(range(10), 0)), list(range(10)))
+
+    def test_prefetch2(self):
+        """
+        :return: pass or fail if the producer holds at most depth items ahead of the consumer
+        """
+        print("test_prefetch2")
+        produced = list()
+        ready = threading.Event()
+
+        def items():
+            for i in range(10):
+                produced.append(i)
+                if i == 3:
+                    ready.set()
+                yield i
+
+        generator = stream.prefetch(items(), 2)
+        self.assertEqual(next(generator), 0)
+        ready.wait(1)
+
+        # one item consumed, two queued and one waiting to be put
+        self.assertLessEqual(len(produced), 4)
+        generator.close()
+
+    def test_prefetch3(self):
+        """
+        :return: pass or fail if an exception of the producer is raised to the consumer after the items before it
+        """
+        print("test_prefetch3")
+
+        def items():
+            yield 1
+            raise OSError("connection reset")
+
+        consumed = list()
+        with self.assertRaises(OSError):
+            for i in stream.prefetch(items(), 2):
+                consumed.append(i)
+
+        self.assertEqual(consumed, [1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+# internal modules
+import throttle
+
+# external modules
+import unittest
+
+
+class TestThrottle(unittest.TestCase):
+    """class containing unit tests for throttle.py"""
+
+    def setUp(self):
+        """creates a TokenBucket on a fake clock that advances when it sleeps"""
+        self.now = 0.0
+        self.bucket = throttle.TokenBucket(5, clock=lambda: self.now, sleep=self.advance)
+
+    def advance(self, seconds):
+        """
+        advances the fake clock
+        :param seconds: the seconds to advance by
+        :return: None
+        """
+        self.now += seconds
+
+    def test_acquire1(self):
+        """
+        :return: pass or fail if units within the burst are acquired without waiting
+        """
+        print("test_acquire1")
+        self.assertEqual(self.bucket.acquire(5), 0)
+        self.assertEqual(self.now, 0)
+
+    def test_acquire2(self):
+        """
+        :return: pass or fail if acquiring more than the rate keeps the average at the rate
+        """
+        print("test_acquire2")
+        for _ in range(4):
+            self.bucket.acquire(25)
+
+        # 100 units at 5 per second, less the 5 units held at the start
+        self.assertAlmostEqual(self.now, 15)
+
+    def test_settle(self):
+        """
+        :return: pass or fail if consuming less than estimated refunds the difference
+        """
+        print("test_settle")
+        self.bucket.acquire(5)
+        self.bucket.settle(5, 2)
+        self.assertEqual(self.bucket.acquire(3), 0)
+        self.assertGreater(self.bucket.acquire(1), 0)
+
+    def test_throttled(self):
+        """
+        :return: pass or fail if throttling halves the rate down to a floor and success recovers it to the ceiling
+        """
+        print("test_throttled")
+        for _ in range(10):
+            self.bucket.throttled()
+
+        self.assertEqual(self.bucket.rate, 1)
+
+        for _ in range(10):
+            self.bucket.succeeded()
+
+        self.assertEqual(self.bucket.rate, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
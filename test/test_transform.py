@@ -80,6 +80,166 @@ class TestTransform(unittest.TestCase):
         except ValueError as e:
             self.assertEqual(str(e), "'ds1.df' could not be extracted")
 
+    def test_transform4(self):
+        """
+        :return: pass or fail if the transform method drops rows with unparseable dates and maps the columns
+        """
+        print("test_transform4")
+        ds1_headers = ["date", "cases", "deaths"]
+        ds1 = create_dataset("ds1", ds1_headers, "date")
+        ds1.df = pandas.DataFrame({
+            "date": ["2020-09-11", "not a date", None, "2020-09-18"],
+            "cases": [10, 11, 12, 13],
+            "deaths": [1, 2, 3, 4]
+        })
+
+        result = transform.transform(ds1, None)
+        self.assertEqual([stat.idx for stat in result], [0, 3])
+        self.assertEqual([str(stat.date) for stat in result], ["2020-09-11 00:00:00", "2020-09-18 00:00:00"])
+        self.assertEqual([stat.cases for stat in result], [10, 13])
+        self.assertEqual([stat.deaths for stat in result], [1, 4])
+        self.assertEqual([stat.recovered for stat in result], [None, None])
+
+    def test_transform5(self):
+        """
+        :return: pass or fail if the merge joins any number of datasets on their normalized dates
+        """
+        print("test_transform5")
+        ds1 = create_dataset("ds1", ["date", "cases"], "date")
+        ds1.df = pandas.DataFrame({"date": ["2020-09-13", "2020-09-11", "2020-9-12"], "cases": [13, 11, 12]})
+
+        ds2 = create_dataset("ds2", ["Date", "Recovered"], "Date")
+        ds2.df = pandas.DataFrame({"Date": ["2020-09-11", "2020-09-12", "2020-09-13"], "Recovered": [1, 2, 3]})
+
+        ds3 = create_dataset("ds3", ["Day", "Deaths", "cases"], "Day")
+        ds3.columns = {"Deaths": "deaths"}
+        ds3.df = pandas.DataFrame({"Day": ["2020-09-12", "2020-09-13"], "Deaths": [20, 30], "cases": [0, 0]})
+
+        tar_df = transform.merge([ds1, ds2, ds3])
+        self.assertEqual(tar_df.columns.tolist(), ["date", "cases", "Recovered", "deaths", "cases_ds3"])
+        self.assertEqual([str(d.date()) for d in tar_df["date"]], ["2020-09-12", "2020-09-13"])
+
+        result = transform.to_batch(tar_df).to_stats()
+        self.assertEqual([stat.cases for stat in result], [12, 13])
+        self.assertEqual([stat.deaths for stat in result], [20, 30])
+        self.assertEqual([stat.recovered for stat in result], [2, 3])
+
+    def test_transform6(self):
+        """
+        :return: pass or fail if the merge skips secondary datasets that were not extracted
+        """
+        print("test_transform6")
+        ds1 = create_dataset("ds1", ["date", "cases"], "date")
+        ds1.df = pandas.DataFrame({"date": ["2020-09-11", "2020-09-12"], "cases": [11, 12]})
+
+        ds2 = create_dataset("ds2", ["Date", "Recovered"], "Date")
+        ds3 = create_dataset("ds3", ["Day", "Recovered"], "Day")
+        ds3.df = pandas.DataFrame({"Day": ["2020-09-12"], "Recovered": [2]})
+
+        tar_df = transform.merge([ds1, ds2, ds3])
+        self.assertEqual(tar_df["cases"].tolist(), [12])
+        self.assertEqual(tar_df["Recovered"].tolist(), [2])
+
+        with self.assertRaises(ValueError):
+            transform.merge([ds2, ds1])
+
+    def test_derive(self):
+        """
+        :return: pass or fail if daily counts and rates follow calendar days, missing across gaps and short windows
+        """
+        print("test_derive")
+        days = [f"2020-09-{d:02}" for d in list(range(1, 16)) + [17, 18]]
+        cases = [d * d for d in list(range(1, 16)) + [17, 18]]
+        tar_df = pandas.DataFrame({"date": days[::-1], "cases": cases[::-1], "deaths": [7] * len(days)})
+
+        batch = transform.to_batch(tar_df)
+        stats = sorted(batch.to_stats(), key=lambda s: s.date)
+        self.assertEqual([s.new_cases for s in stats[:3]], [None, 3, 5])
+        self.assertEqual([s.new_cases for s in stats[-2:]], [None, 35])
+        self.assertEqual([s.new_deaths for s in stats[:2]], [None, 0])
+        self.assertEqual([s.new_cases_avg7 for s in stats[6:9]], [None, 9.0, 11.0])
+        self.assertIsNone(stats[13].new_cases_avg14)
+        self.assertEqual(stats[14].new_cases_avg14, 16.0)
+        self.assertEqual(stats[14].growth_rate, round(23 / 9 - 1, 4))
+        self.assertEqual(stats[14].new_deaths_avg14, 0.0)
+        self.assertIsNone(stats[-1].new_cases_avg7)
+
+    def test_county_batch(self):
+        """
+        :return: pass or fail if county chunks are keyed by 5 digit fips, or by state and county without one
+        """
+        print("test_county_batch")
+        df = create_counties()
+
+        batch = transform.county_batch(df)
+        self.assertEqual(batch.idx.tolist(), [0, 1, 2, 3, 4])
+        self.assertEqual(batch.fips.tolist(), ["01001", "Alabama:Unknown", "New York:New York City", "01001",
+                                               "Alabama:Unknown"])
+        self.assertEqual(batch.column("deaths"), [1, None, 10, None, None])
+
+        since = transform.county_batch(df, "2020-03-02")
+        self.assertEqual(since.idx.tolist(), [3, 4])
+
+    def test_country_batch(self):
+        """
+        :return: pass or fail if the provinces of a country are summed by date, with the rates derived by day
+        """
+        print("test_country_batch")
+        df = pandas.DataFrame({
+            "Date": ["2020-03-02", "2020-03-01", "2020-03-01", "2020-03-02", "2020-03-03", "not a date"],
+            "Confirmed": [4, 1, 2, 5, 12, 1],
+            "Deaths": [1.0, None, None, None, 2.0, 1.0],
+            "Recovered": [None, None, None, None, 3.0, None]
+        })
+
+        batch = transform.country_batch(df, "Canada")
+        self.assertEqual(batch.idx.tolist(), [0, 1, 2])
+        self.assertEqual(batch.country.tolist(), ["Canada", "Canada", "Canada"])
+        self.assertEqual(batch.column("cases"), [3, 9, 12])
+        self.assertEqual(batch.column("deaths"), [None, 1, 2])
+        self.assertEqual(batch.column("recovered"), [None, None, 3])
+        self.assertEqual(batch.column("new_cases"), [None, 6, 3])
+        self.assertEqual(batch[1].to_json()["country"], "Canada")
+
+    def test_rollup(self):
+        """
+        :return: pass or fail if the partial sums of several chunks roll up to states and the nation
+        """
+        print("test_rollup")
+        batch = transform.county_batch(create_counties())
+        partials = [transform.rollup_partial(batch[:2]), transform.rollup_partial(batch[2:])]
+
+        states = transform.rollup(partials, "state")
+        self.assertEqual(states.fips.tolist(), ["01", "New York", "01"])
+        self.assertEqual(states.state.tolist(), ["Alabama", "New York", "Alabama"])
+        self.assertEqual(states.column("cases"), [7, 100, 10])
+        self.assertEqual(states.column("deaths"), [1, 10, None])
+
+        nation = transform.rollup(partials, "national")
+        self.assertEqual(nation.fips.tolist(), ["US", "US"])
+        self.assertEqual(nation.column("cases"), [107, 10])
+        self.assertEqual(nation.column("deaths"), [11, None])
+
+        self.assertEqual(len(transform.rollup([], "state")), 0)
+        with self.assertRaises(ValueError):
+            transform.rollup(partials, "county")
+
+
+def create_counties():
+    """
+    creates a chunk of NYT us-counties.csv style rows, with empty fips and deaths as in the source
+    :return: the created dataframe
+    """
+
+    return pandas.DataFrame({
+        "date": ["2020-03-01", "2020-03-01", "2020-03-01", "2020-03-02", "2020-03-02", "not a date"],
+        "county": ["Autauga", "Unknown", "New York City", "Autauga", "Unknown", "Autauga"],
+        "state": ["Alabama", "Alabama", "New York", "Alabama", "Alabama", "Alabama"],
+        "fips": [1001.0, None, None, 1001.0, None, 1001.0],
+        "cases": [5, 2, 100, 7, 3, 7],
+        "deaths": [1.0, None, 10.0, None, None, 1.0]
+    })
+
 
 def create_dataset(name, headers, match):
     """
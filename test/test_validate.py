@@ -0,0 +1,151 @@
+# internal modules
+import classes
+import transform
+import validate
+
+# external modules
+import helpers
+import json
+import os
+import pandas
+import tempfile
+import unittest
+
+from moto import mock_aws
+from unittest import mock
+
+
+class TestValidate(unittest.TestCase):
+    """class containing unit tests for validate.py"""
+
+    def test_validate1(self):
+        """
+        :return: pass or fail if each rule rejects its rows under the first rule failed, and missing days are only
+            reported
+        """
+        print("test_validate1")
+        clean, rejected, report = validate.validate(create_merged())
+
+        self.assertEqual(clean["date"].tolist(), ["2020-09-11", "2020-09-12", "2020-09-16"])
+        self.assertEqual(rejected["rule"].tolist(), ["date", "duplicate_date", "negative", "non_monotonic"])
+        self.assertEqual(rejected["date"].tolist(), ["2020-9-x", "2020-09-11", "2020-09-13", "2020-09-14"])
+        self.assertEqual(report["counts"], {
+            "date": 1, "duplicate_date": 1, "negative": 1, "non_monotonic": 2, "missing_day": 1
+        })
+        self.assertEqual(report["missing_days"], ["2020-09-15"])
+
+        # recovered counts that are no longer reported are not a decrease
+        tar_df = create_merged().assign(Recovered=[5, 5, 6, 5, 7, 8, 0])
+        self.assertEqual(validate.validate(tar_df)[2]["counts"]["non_monotonic"], 2)
+
+    def test_validate2(self):
+        """
+        :return: pass or fail if a clean frame passes whole, with missing counts and absent columns skipped
+        """
+        print("test_validate2")
+        tar_df = pandas.DataFrame({
+            "date": pandas.to_datetime(["2020-09-12", "2020-09-11", "2020-09-13"]),
+            "cases": [20, 10, None]
+        })
+        clean, rejected, report = validate.validate(tar_df)
+        self.assertEqual(len(clean), 3)
+        self.assertTrue(rejected.empty)
+        self.assertEqual(sum(report["counts"].values()), 0)
+        self.assertIsNone(validate.quarantine(rejected, report))
+
+    def test_validate3(self):
+        """
+        :return: pass or fail if the rows the merge drops for a date that cannot be parsed are rejected as dates
+        """
+        print("test_validate3")
+        ny_dataset = create_dataset("ny_dataset", "date", pandas.DataFrame({
+            "date": ["2020-09-11", "bad", "2020-09-12", "2020-09-13"], "cases": [10, 15, 20, 30]
+        }))
+        jh_dataset = create_dataset("jh_dataset", "Date", pandas.DataFrame({
+            "Date": ["2020-09-11", "2020-09-12", "2020-09-13"], "Recovered": [1, 2, 3]
+        }))
+
+        dropped = list()
+        merged = transform.merge([ny_dataset, jh_dataset], dropped)
+        clean, rejected, report = validate.validate(merged, dropped=dropped)
+
+        self.assertEqual(len(clean), 3)
+        self.assertEqual(report["counts"]["date"], 1)
+        self.assertEqual(rejected[["date", "cases", "dataset", "rule"]].to_dict("records"), [
+            {"date": "bad", "cases": 15, "dataset": "ny_dataset", "rule": "date"}
+        ])
+
+    def test_quarantine(self):
+        """
+        :return: pass or fail if rejected rows are written to a local directory with the report
+        """
+        print("test_quarantine")
+        _, rejected, report = validate.validate(create_merged())
+
+        with tempfile.TemporaryDirectory() as directory:
+            with mock.patch.object(validate, "quarantine_dir", directory):
+                dst_file = validate.quarantine(rejected, report)
+
+            self.assertEqual(os.path.dirname(dst_file), directory)
+            with open(dst_file) as f:
+                body = json.load(f)
+
+        self.assertEqual(body["counts"]["negative"], 1)
+        self.assertEqual([row["rule"] for row in body["rows"]], rejected["rule"].tolist())
+
+
+@mock_aws
+class TestValidateQuarantine(unittest.TestCase):
+    """class containing unit tests for the quarantine in validate.py against a local S3 stand-in"""
+
+    def setUp(self):
+        """creates a bucket in the S3 stand-in"""
+        self.client = helpers.mock_bucket(self)
+
+        patcher = mock.patch.object(validate, "quarantine_dir", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_quarantine(self):
+        """
+        :return: pass or fail if rejected rows are written to S3 next to the exports
+        """
+        print("test_quarantine")
+        _, rejected, report = validate.validate(create_merged())
+        key = validate.quarantine(rejected, report)
+        self.assertTrue(key.startswith("Data/Quarantine/CovidStats."))
+
+        body = json.loads(self.client.get_object(Bucket="covid-stats-test", Key=key)["Body"].read())
+        self.assertEqual(body["missing_days"], ["2020-09-15"])
+        self.assertEqual(len(body["rows"]), 4)
+
+
+def create_merged():
+    """
+    creates a merged dataframe holding a row failing each rule and a missing day
+    :return: the created dataframe
+    """
+    return pandas.DataFrame({
+        "date": ["2020-09-11", "2020-9-x", "2020-09-12", "2020-09-11", "2020-09-13", "2020-09-14", "2020-09-16"],
+        "cases": [10, 11, 20, 12, 30, 25, 40],
+        "deaths": [1, 1, 2, 1, -3, 3, None]
+    })
+
+
+def create_dataset(name, match, df):
+    """
+    creates an extracted dataset with the provided parameters
+    :param name: the name to set
+    :param match: the match_field to set
+    :param df: the extracted dataframe to set
+    :return: the created Dataset
+    """
+
+    dataset = classes.Dataset(name)
+    dataset.match_field = match
+    dataset.df = df
+    return dataset
+
+
+if __name__ == '__main__':
+    unittest.main()